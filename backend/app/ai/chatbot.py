@@ -9,54 +9,37 @@ goals) via a system prompt and has access to an Exa web search tool so it
 can autonomously look up real-time market data, news, prices, and financial
 information when it decides it needs to.
 
+The agent graph is compiled once per process (see _get_advisor_agent); the
+per-user system prompt travels in the input state and is prepended as a
+SystemMessage before every model call.
+
 Architecture:
   LangGraph create_react_agent  ->  ChatGoogleGenerativeAI (Gemini)
                                  ->  ExaSearchResults (web search tool)
 
 Input:  user message, conversation history, user financial context
-Output: AI-generated response string (with source citations)
+Output: AI-generated response string (with source citations), or a stream of
+        token / tool-progress events from stream_chat_response
 """
 
 import os
-from dotenv import load_dotenv
+from collections import defaultdict
+from typing import AsyncIterator, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
 
-from .exa_search import get_exa_search_tool
-
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-
-
-# ---------------------------------------------------------------------------
-# LLM & tool initialization (done once at module load)
-# ---------------------------------------------------------------------------
-
-def _create_llm():
-    """Create and return the ChatGoogleGenerativeAI (Gemini) LLM instance."""
-    if not GEMINI_API_KEY:
-        return None
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.7,
-    )
-
-
-def _get_tools() -> list:
-    """Collect all available tools for the agent."""
-    tools = []
-    exa_tool = get_exa_search_tool()
-    if exa_tool:
-        tools.append(exa_tool)
-    return tools
+from . import registry
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
 
+# The Gemini model and Exa tool are built on first use and shared (see ai/registry.py)
+CHAT_TEMPERATURE = 0.7
 
-_llm = _create_llm()
-_tools = _get_tools()
+# Token budget for the investments + goals part of the system prompt (see _render_investments)
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1200"))
+# Largest positions still listed one per line once a portfolio is over budget
+CHAT_TOP_HOLDINGS = int(os.getenv("CHAT_TOP_HOLDINGS", "15"))
 
 
 # ---------------------------------------------------------------------------
@@ -108,45 +91,150 @@ def _convert_history(history: list) -> list:
     return messages
 
 
+# ---------------------------------------------------------------------------
+# Agent (compiled once, shared by the chatbot and recommendations)
+# ---------------------------------------------------------------------------
+
+class AdvisorState(AgentState):
+    """ReAct agent state plus the per-request system prompt."""
+    system_prompt: str
+
+
+def _with_system_prompt(state: AdvisorState) -> list:
+    """Model input: the request's system prompt followed by the conversation."""
+    return [SystemMessage(content=state["system_prompt"]), *state["messages"]]
+
+
+def _get_advisor_agent(llm):
+    return registry.get_agent(
+        "advisor",
+        llm,
+        lambda model: create_react_agent(
+            model=model,
+            tools=registry.get_tools(),
+            prompt=_with_system_prompt,
+            state_schema=AdvisorState,
+        ),
+    )
+
+
 # ---------------------------------------------------------------------------
 # System prompts
 # ---------------------------------------------------------------------------
 
-def _build_system_prompt(user_context: dict) -> str:
+def _investment_line(inv: dict) -> str:
+    return (
+        f"  - {inv.get('name', 'Unknown')}: ₹{inv.get('amount', 0):,.2f} "
+        f"({inv.get('type', 'N/A')}, {inv.get('frequency', 'N/A')}, "
+        f"Expected Return: {inv.get('expected_return', 0)}%)"
+    )
+
+
+def _goal_line(goal: dict) -> str:
+    progress = 0
+    if goal.get("target_amount", 0) > 0:
+        progress = round(
+            (goal.get("current_amount", 0) / goal["target_amount"]) * 100, 1
+        )
+    return (
+        f"  - {goal.get('name', 'Unknown')}: Target ₹{goal.get('target_amount', 0):,.2f}, "
+        f"Current ₹{goal.get('current_amount', 0):,.2f} ({progress}% done), "
+        f"Priority: {goal.get('priority', 'Medium')}, By: {goal.get('target_date', 'N/A')}"
+    )
+
+
+def _render_goals(goals: list, token_budget: int) -> str:
+    """One line per goal, in order, until token_budget; the rest as a single count line."""
+    if not goals:
+        return "None"
+    lines, used = [], 0
+    for i, goal in enumerate(goals):
+        line = _goal_line(goal)
+        used += estimate_tokens(line) + 1
+        if used > token_budget and lines:
+            rest = goals[i:]
+            lines.append(
+                f"  - ...and {len(rest)} more goals "
+                f"(Target ₹{sum(g.get('target_amount', 0) for g in rest):,.2f} combined)"
+            )
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _render_investments(investments: list, token_budget: int) -> str:
+    """
+    Investment lines for the system prompt, within token_budget.
+
+    Portfolios that fit are listed in full, one line per investment. Larger
+    ones (e.g. hundreds of synced Zerodha holdings) are rendered as a
+    breakdown by type, the CHAT_TOP_HOLDINGS largest positions by amount
+    (fewer if the budget runs out) and one line summarizing the rest.
+    """
+    if not investments:
+        return "None"
+    lines = [_investment_line(inv) for inv in investments]
+    if sum(estimate_tokens(line) + 1 for line in lines) <= token_budget:
+        return "\n".join(lines)
+
+    total = sum(inv.get("amount", 0) for inv in investments) or 1
+    by_type = defaultdict(lambda: {"count": 0, "amount": 0.0, "weighted_return": 0.0})
+    for inv in investments:
+        bucket = by_type[inv.get("type") or "N/A"]
+        bucket["count"] += 1
+        bucket["amount"] += inv.get("amount", 0)
+        bucket["weighted_return"] += inv.get("amount", 0) * (inv.get("expected_return") or 0)
+
+    out = [f"By type ({len(investments)} investments):"]
+    for inv_type, bucket in sorted(by_type.items(), key=lambda item: -item[1]["amount"]):
+        avg_return = bucket["weighted_return"] / bucket["amount"] if bucket["amount"] else 0
+        out.append(
+            f"  - {inv_type}: ₹{bucket['amount']:,.2f} ({bucket['amount'] / total * 100:.1f}%), "
+            f"{bucket['count']} holdings, Avg Expected Return: {avg_return:.1f}%"
+        )
+
+    ranked = sorted(investments, key=lambda inv: -(inv.get("amount") or 0))
+    # Room for the "Largest positions" header and the tail line
+    used = sum(estimate_tokens(line) + 1 for line in out) + 40
+    top = []
+    for inv in ranked[:CHAT_TOP_HOLDINGS]:
+        line = _investment_line(inv)
+        used += estimate_tokens(line) + 1
+        if used > token_budget:
+            break
+        top.append(line)
+    if top:
+        out.append(f"Largest {len(top)} positions:")
+        out.extend(top)
+
+    rest = ranked[len(top):]
+    if rest:
+        rest_amount = sum(inv.get("amount", 0) for inv in rest)
+        out.append(
+            f"  - ...and {len(rest)} smaller positions: ₹{rest_amount:,.2f} "
+            f"({rest_amount / total * 100:.1f}% of the portfolio, included in the type totals above)"
+        )
+    return "\n".join(out)
+
+
+def _build_system_prompt(user_context: dict, context_token_budget: Optional[int] = None) -> str:
     """
     Builds a system prompt that gives the agent full context about the user's
     financial situation so it can provide personalized advice.
+
+    Investments and goals share context_token_budget (CHAT_CONTEXT_TOKEN_BUDGET
+    by default): goals get up to a quarter, investments the rest.
     """
     profile = user_context.get("profile", {})
     investments = user_context.get("investments", [])
     goals = user_context.get("goals", [])
 
-    investments_summary = "None"
-    if investments:
-        inv_lines = []
-        for inv in investments:
-            inv_lines.append(
-                f"  - {inv.get('name', 'Unknown')}: ₹{inv.get('amount', 0):,.2f} "
-                f"({inv.get('type', 'N/A')}, {inv.get('frequency', 'N/A')}, "
-                f"Expected Return: {inv.get('expected_return', 0)}%)"
-            )
-        investments_summary = "\n".join(inv_lines)
-
-    goals_summary = "None"
-    if goals:
-        goal_lines = []
-        for goal in goals:
-            progress = 0
-            if goal.get("target_amount", 0) > 0:
-                progress = round(
-                    (goal.get("current_amount", 0) / goal["target_amount"]) * 100, 1
-                )
-            goal_lines.append(
-                f"  - {goal.get('name', 'Unknown')}: Target ₹{goal.get('target_amount', 0):,.2f}, "
-                f"Current ₹{goal.get('current_amount', 0):,.2f} ({progress}% done), "
-                f"Priority: {goal.get('priority', 'Medium')}, By: {goal.get('target_date', 'N/A')}"
-            )
-        goals_summary = "\n".join(goal_lines)
+    if context_token_budget is None:
+        context_token_budget = CHAT_CONTEXT_TOKEN_BUDGET
+    goals_summary = _render_goals(goals, context_token_budget // 4)
+    investments_summary = _render_investments(
+        investments, context_token_budget - estimate_tokens(goals_summary)
+    )
 
     monthly_income = profile.get("monthly_income", 0)
     monthly_expenses = profile.get("monthly_expenses", 0)
@@ -222,14 +310,184 @@ Remember: You're their trusted financial friend. Be proactive in using your sear
     return system_prompt
 
 
+def _build_recommendations_prompt(
+    risk_level: str,
+    investment_type: str,
+    user_context: dict,
+    context_token_budget: Optional[int] = None,
+) -> str:
+    """
+    System prompt for generate_investment_recommendations. The portfolio and goals
+    are rendered once, within the same context_token_budget as _build_system_prompt.
+    """
+    profile = user_context.get("profile", {})
+    investments = user_context.get("investments", [])
+    goals = user_context.get("goals", [])
+
+    if context_token_budget is None:
+        context_token_budget = CHAT_CONTEXT_TOKEN_BUDGET
+    goals_summary = _render_goals(goals, context_token_budget // 4)
+    portfolio_summary = (
+        _render_investments(investments, context_token_budget - estimate_tokens(goals_summary))
+        if investments else "No existing investments."
+    )
+
+    total_invested = sum(inv.get("amount", 0) for inv in investments)
+    monthly_income = profile.get("monthly_income", 0)
+    monthly_expenses = profile.get("monthly_expenses", 0)
+    monthly_savings = monthly_income - monthly_expenses
+
+    system_prompt = f"""You are an expert investment advisor AI. You have access to a web search tool
+to gather real-time market data.
+
+CRITICAL: Use the search tool to find specific, current funds, prices, and market trends.
+Do NOT make up fund names or prices. Only recommend options you find through search or know exist.
+Add "India" or "Indian market" to your search queries for better relevance.
+
+═══════════════════════════════════════
+USER PREFERENCES
+═══════════════════════════════════════
+- Risk Tolerance: {risk_level}
+- Investment Type Requested: {investment_type}
+
+═══════════════════════════════════════
+USER'S FINANCIAL PROFILE
+═══════════════════════════════════════
+- Name: {profile.get('full_name', 'User')}
+- Age: {profile.get('age', 'Not specified')}
+- Risk Profile: {profile.get('risk_profile', 'Moderate')}
+- Monthly Income: ₹{monthly_income:,.2f}
+- Monthly Expenses: ₹{monthly_expenses:,.2f}
+- Monthly Savings: ₹{monthly_savings:,.2f}
+- Total Currently Invested: ₹{total_invested:,.2f}
+
+CURRENT PORTFOLIO:
+{portfolio_summary}
+
+FINANCIAL GOALS:
+{goals_summary}
+
+═══════════════════════════════════════
+INSTRUCTIONS
+═══════════════════════════════════════
+
+1. **Search first**: Use the web search tool to find the latest data on {investment_type} options in India.
+
+2. **Recommend 5 specific options** with current returns/performance data.
+
+3. **Suggest specific amounts** to invest based on their ₹{monthly_savings:,.2f} monthly savings.
+
+4. **Diversity**: Ensure the 5 options provide a balanced portfolio.
+
+5. **Cite sources** as: **[Source Name](URL)** using the URLs from search.
+
+6. **Be honest**: Include appropriate disclaimers about market risks. Use ₹ for all currency.
+
+═══════════════════════════════════════
+USER'S CURRENT SITUATION
+═══════════════════════════════════════
+- Profile: {profile.get('risk_profile', 'Moderate')}
+- Monthly Savings: ₹{monthly_savings:,.2f}
+- Existing Investments: {len(investments)} holdings, ₹{total_invested:,.2f} (see CURRENT PORTFOLIO)
+- Goals: {len(goals)} (see FINANCIAL GOALS)
+"""
+
+    return system_prompt
+
+
+def _with_conversation_summary(system_prompt: str, summary: str) -> str:
+    """Append the rolling summary of compacted turns (server-side sessions) to the system prompt."""
+    if not summary:
+        return system_prompt
+    return (
+        f"{system_prompt}\n\n"
+        "═══════════════════════════════════════\n"
+        "EARLIER IN THIS CONVERSATION (summary)\n"
+        "═══════════════════════════════════════\n"
+        f"{summary}"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Conversation compaction (see services/chat_memory.py)
+# ---------------------------------------------------------------------------
+
+SUMMARY_INSTRUCTIONS = """You maintain the running summary of a conversation between a user and their personal finance advisor.
+Merge the previous summary and the new messages into one updated summary of at most {max_words} words.
+Keep: the user's questions and decisions, figures they mentioned (amounts, dates, funds), advice already given, and open follow-ups.
+Drop: greetings, repetition, and citations. Write plain sentences in the third person ("The user asked...")."""
+
+
+def _fallback_summary(previous_summary: str, messages: list, max_chars: int) -> str:
+    """Extractive summary used when no LLM is available: the first line of each message."""
+    lines = [previous_summary] if previous_summary else []
+    for msg in messages:
+        speaker = "User" if msg["role"] == "user" else "Advisor"
+        first_line = msg["content"].strip().split("\n", 1)[0]
+        lines.append(f"{speaker}: {first_line[:200]}")
+    # Keep the most recent part when over the limit
+    return "\n".join(lines)[-max_chars:]
+
+
+async def summarize_conversation(previous_summary: str, messages: list, max_tokens: int) -> str:
+    """
+    Fold messages ([{"role", "content"}], oldest first) into previous_summary,
+    returning a new summary of roughly max_tokens tokens.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    llm = registry.get_chat_model()
+    if not llm:
+        return _fallback_summary(previous_summary, messages, max_chars)
+
+    transcript = "\n".join(
+        f"{'User' if m['role'] == 'user' else 'Advisor'}: {m['content']}" for m in messages
+    )
+    try:
+        result = await llm.ainvoke([
+            SystemMessage(content=SUMMARY_INSTRUCTIONS.format(max_words=max_tokens * 3 // 4)),
+            HumanMessage(content=f"PREVIOUS SUMMARY:\n{previous_summary or '(none)'}\n\nNEW MESSAGES:\n{transcript}"),
+        ])
+        summary = _extract_text(result.content)
+        return summary[:max_chars] if summary else _fallback_summary(previous_summary, messages, max_chars)
+    except Exception as e:
+        print(f"[Chatbot] Conversation summary failed: {e}")
+        return _fallback_summary(previous_summary, messages, max_chars)
+
+
 # ---------------------------------------------------------------------------
 # Public API — same signatures as before, so the API layer needs no changes
 # ---------------------------------------------------------------------------
 
+CHAT_UNAVAILABLE_REPLY = (
+    "I'm sorry, the AI service is not configured right now. "
+    "Please contact support to enable the chatbot feature."
+)
+CHAT_EMPTY_REPLY = "I wasn't able to generate a response. Please try again."
+CHAT_ERROR_REPLY = (
+    "I'm having a bit of trouble processing your request right now. "
+    "Could you try rephrasing your question, or try again in a moment?"
+)
+RECOMMENDATIONS_UNAVAILABLE_REPLY = (
+    "The AI service is not configured. "
+    "Please contact support to enable recommendations."
+)
+RECOMMENDATIONS_EMPTY_REPLY = "I wasn't able to generate recommendations. Please try again."
+RECOMMENDATIONS_ERROR_REPLY = (
+    "I'm having trouble generating recommendations right now. "
+    "Please try again in a moment."
+)
+
+# Returned instead of an answer; never cached (services/response_cache.py)
+FALLBACK_REPLIES = frozenset({
+    CHAT_UNAVAILABLE_REPLY, CHAT_EMPTY_REPLY, CHAT_ERROR_REPLY,
+    RECOMMENDATIONS_UNAVAILABLE_REPLY, RECOMMENDATIONS_EMPTY_REPLY, RECOMMENDATIONS_ERROR_REPLY,
+})
+
 async def generate_chat_response(
     message: str,
     history: list,
     user_context: dict,
+    summary: str = "",
 ) -> str:
     """
     Generate a chatbot response using a LangChain ReAct agent
@@ -239,25 +497,19 @@ async def generate_chat_response(
         message:      The user's current message.
         history:      Conversation history as [{"role": "user"|"assistant", "content": "..."}].
         user_context: Dict with keys "profile", "investments", "goals".
+        summary:      Summary of older turns no longer included in history.
 
     Returns:
         AI-generated response string.
     """
-    if not _llm:
-        return (
-            "I'm sorry, the AI service is not configured right now. "
-            "Please contact support to enable the chatbot feature."
-        )
+    llm = registry.get_chat_model(temperature=CHAT_TEMPERATURE)
+    if not llm:
+        return CHAT_UNAVAILABLE_REPLY
 
     try:
-        system_prompt = _build_system_prompt(user_context)
+        system_prompt = _with_conversation_summary(_build_system_prompt(user_context), summary)
 
-        # Build the agent with the system prompt and tools
-        agent = create_react_agent(
-            model=_llm,
-            tools=_tools,
-            prompt=system_prompt,
-        )
+        agent = _get_advisor_agent(llm)
 
         # Build message list: history + current user message
         messages = _convert_history(history)
@@ -265,7 +517,7 @@ async def generate_chat_response(
 
         # Invoke the agent (capped to prevent runaway tool-call loops)
         result = await agent.ainvoke(
-            {"messages": messages},
+            {"messages": messages, "system_prompt": system_prompt},
             config={"recursion_limit": AGENT_RECURSION_LIMIT},
         )
 
@@ -277,16 +529,84 @@ async def generate_chat_response(
         if ai_messages:
             return _extract_text(ai_messages[-1].content)
 
-        return "I wasn't able to generate a response. Please try again."
+        return CHAT_EMPTY_REPLY
 
     except Exception as e:
         print(f"[Chatbot] AI generation failed: {e}")
         import traceback
         traceback.print_exc()
-        return (
-            "I'm having a bit of trouble processing your request right now. "
-            "Could you try rephrasing your question, or try again in a moment?"
-        )
+        return CHAT_ERROR_REPLY
+
+
+# Progress text shown while a tool runs, by tool name
+TOOL_STATUS = {
+    "exa_search_results_json": "Searching the web…",
+}
+
+
+async def stream_chat_response(
+    message: str,
+    history: list,
+    user_context: dict,
+    summary: str = "",
+) -> AsyncIterator[dict]:
+    """
+    Streaming variant of generate_chat_response, built on the agent's
+    astream_events. Yields events as the agent produces them:
+
+        {"type": "token", "content": "..."}                  model output text
+        {"type": "tool_start", "tool": name, "status": "..."} a tool call began
+        {"type": "tool_end", "tool": name}                    the tool returned
+        {"type": "done", "reply": "..."}                      final reply (always last)
+
+    Text streamed before a tool call is the model thinking aloud; the "done"
+    reply is the final answer, the same string generate_chat_response returns.
+    """
+    llm = registry.get_chat_model(temperature=CHAT_TEMPERATURE)
+    if not llm:
+        reply = CHAT_UNAVAILABLE_REPLY
+        yield {"type": "token", "content": reply}
+        yield {"type": "done", "reply": reply}
+        return
+
+    reply = None
+    try:
+        agent = _get_advisor_agent(llm)
+        messages = _convert_history(history)
+        messages.append(HumanMessage(content=message))
+
+        async for event in agent.astream_events(
+            {"messages": messages, "system_prompt": _with_conversation_summary(_build_system_prompt(user_context), summary)},
+            config={"recursion_limit": AGENT_RECURSION_LIMIT},
+            version="v2",
+        ):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                # Plain string chunks keep their whitespace; content-block lists are flattened
+                text = content if isinstance(content, str) else _extract_text(content)
+                if text:
+                    yield {"type": "token", "content": text}
+            elif kind == "on_tool_start":
+                yield {"type": "tool_start", "tool": event["name"], "status": TOOL_STATUS.get(event["name"], f"Running {event['name']}…")}
+            elif kind == "on_tool_end":
+                yield {"type": "tool_end", "tool": event["name"]}
+            elif kind == "on_chain_end" and not event["parent_ids"]:
+                # The root graph finished: its output is the final agent state
+                ai_messages = [
+                    m for m in event["data"]["output"]["messages"]
+                    if isinstance(m, AIMessage) and m.content
+                ]
+                if ai_messages:
+                    reply = _extract_text(ai_messages[-1].content)
+
+    except Exception as e:
+        print(f"[Chatbot] AI streaming failed: {e}")
+        import traceback
+        traceback.print_exc()
+        reply = CHAT_ERROR_REPLY
+
+    yield {"type": "done", "reply": reply or CHAT_EMPTY_REPLY}
 
 
 async def generate_investment_recommendations(
@@ -306,102 +626,15 @@ async def generate_investment_recommendations(
     Returns:
         AI-generated recommendations string.
     """
-    if not _llm:
-        return (
-            "The AI service is not configured. "
-            "Please contact support to enable recommendations."
-        )
+    llm = registry.get_chat_model(temperature=CHAT_TEMPERATURE)
+    if not llm:
+        return RECOMMENDATIONS_UNAVAILABLE_REPLY
 
     try:
-        profile = user_context.get("profile", {})
-        investments = user_context.get("investments", [])
-        goals = user_context.get("goals", [])
-
-        # Build portfolio summary
-        portfolio_lines = []
-        for inv in investments:
-            portfolio_lines.append(
-                f"  - {inv.get('name', 'Unknown')}: ₹{inv.get('amount', 0):,.2f} "
-                f"({inv.get('type', 'N/A')}, Expected Return: {inv.get('expected_return', 0)}%)"
-            )
-        portfolio_summary = "\n".join(portfolio_lines) if portfolio_lines else "No existing investments."
-
-        total_invested = sum(inv.get("amount", 0) for inv in investments)
-        monthly_income = profile.get("monthly_income", 0)
-        monthly_expenses = profile.get("monthly_expenses", 0)
-        monthly_savings = monthly_income - monthly_expenses
-
-        goals_summary = "None"
-        if goals:
-            goal_lines = []
-            for g in goals:
-                goal_lines.append(
-                    f"  - {g.get('name', 'Unknown')}: Target ₹{g.get('target_amount', 0):,.2f}, "
-                    f"Priority: {g.get('priority', 'Medium')}, By: {g.get('target_date', 'N/A')}"
-                )
-            goals_summary = "\n".join(goal_lines)
-
-        system_prompt = f"""You are an expert investment advisor AI. You have access to a web search tool
-to gather real-time market data.
-
-CRITICAL: Use the search tool to find specific, current funds, prices, and market trends.
-Do NOT make up fund names or prices. Only recommend options you find through search or know exist.
-Add "India" or "Indian market" to your search queries for better relevance.
-
-═══════════════════════════════════════
-USER PREFERENCES
-═══════════════════════════════════════
-- Risk Tolerance: {risk_level}
-- Investment Type Requested: {investment_type}
+        system_prompt = _build_recommendations_prompt(risk_level, investment_type, user_context)
 
-═══════════════════════════════════════
-USER'S FINANCIAL PROFILE
-═══════════════════════════════════════
-- Name: {profile.get('full_name', 'User')}
-- Age: {profile.get('age', 'Not specified')}
-- Risk Profile: {profile.get('risk_profile', 'Moderate')}
-- Monthly Income: ₹{monthly_income:,.2f}
-- Monthly Expenses: ₹{monthly_expenses:,.2f}
-- Monthly Savings: ₹{monthly_savings:,.2f}
-- Total Currently Invested: ₹{total_invested:,.2f}
-
-CURRENT PORTFOLIO:
-{portfolio_summary}
-
-FINANCIAL GOALS:
-{goals_summary}
-
-═══════════════════════════════════════
-INSTRUCTIONS
-═══════════════════════════════════════
-
-1. **Search first**: Use the web search tool to find the latest data on {investment_type} options in India.
-
-2. **Recommend 5 specific options** with current returns/performance data.
-
-3. **Suggest specific amounts** to invest based on their ₹{monthly_savings:,.2f} monthly savings.
-
-4. **Diversity**: Ensure the 5 options provide a balanced portfolio.
-
-5. **Cite sources** as: **[Source Name](URL)** using the URLs from search.
-
-6. **Be honest**: Include appropriate disclaimers about market risks. Use ₹ for all currency.
-
-═══════════════════════════════════════
-USER'S CURRENT SITUATION
-═══════════════════════════════════════
-- Profile: {profile.get('risk_profile', 'Moderate')}
-- Monthly Savings: ₹{monthly_savings:,.2f}
-- Existing Investments: {portfolio_summary}
-- Goals: {goals_summary}
-"""
-
-        # Build the agent with investment-focused system prompt
-        agent = create_react_agent(
-            model=_llm,
-            tools=_tools,
-            prompt=system_prompt,
-        )
+        # Same compiled agent, investment-focused system prompt
+        agent = _get_advisor_agent(llm)
 
         user_message = (
             f"Recommend 5 specific {investment_type} options for me with a {risk_level.lower()} risk approach. "
@@ -409,7 +642,7 @@ USER'S CURRENT SITUATION
         )
 
         result = await agent.ainvoke(
-            {"messages": [HumanMessage(content=user_message)]},
+            {"messages": [HumanMessage(content=user_message)], "system_prompt": system_prompt},
             config={"recursion_limit": AGENT_RECURSION_LIMIT},
         )
 
@@ -421,13 +654,10 @@ USER'S CURRENT SITUATION
         if ai_messages:
             return _extract_text(ai_messages[-1].content)
 
-        return "I wasn't able to generate recommendations. Please try again."
+        return RECOMMENDATIONS_EMPTY_REPLY
 
     except Exception as e:
         print(f"[AI Recommendations] Generation failed: {e}")
         import traceback
         traceback.print_exc()
-        return (
-            "I'm having trouble generating recommendations right now. "
-            "Please try again in a moment."
-        )
+        return RECOMMENDATIONS_ERROR_REPLY
@@ -5,28 +5,291 @@ Provides real-time web search capability using Exa's neural search engine.
 Exa is a search engine designed for LLMs — it understands natural language
 queries and returns high-quality, relevant results.
 
-Used as a LangChain tool bound to the chatbot and investment recommendation
-agents so the LLM can autonomously search for current market data, news,
+Used as a LangChain tool bound to the chatbot, investment recommendation and
+market agents so the LLM can autonomously search for current market data, news,
 prices, and financial information.
 
+Every agent shares one CachedExaSearch tool (see ai/registry.py), which sits in
+front of Exa:
+  - queries are normalized (case, whitespace, punctuation), so "Nifty 50 today?"
+    and "nifty  50 today" are one search; word order is kept, since
+    "USD to INR rate" and "INR to USD rate" are different questions;
+  - results are cached with a TTL per query class: live prices expire in
+    minutes, news in an hour, reference queries ("best ELSS funds India") later;
+  - concurrent identical queries share one in-flight Exa call;
+  - a process-wide token bucket (EXA_RATE_LIMIT_PER_SECOND) caps calls to Exa.
+
+EXA_FIXTURE_MODE=record saves every Exa result to EXA_FIXTURE_PATH;
+EXA_FIXTURE_MODE=replay answers only from that file (no API key, no network),
+so agents can be run and benchmarked offline.
+
 Docs: https://docs.exa.ai | https://docs.langchain.com/oss/python/integrations/tools/exa_search
 """
 
+import asyncio
+import json
 import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple, Type
+
 from dotenv import load_dotenv
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from ..core.cache import LRUCache
 
 load_dotenv()
 
 EXA_API_KEY = os.getenv("EXA_API_KEY", "")
+EXA_NUM_RESULTS = int(os.getenv("EXA_NUM_RESULTS", "3"))
+EXA_CACHE_SIZE = int(os.getenv("EXA_CACHE_SIZE", "1024"))
+EXA_RATE_LIMIT_PER_SECOND = float(os.getenv("EXA_RATE_LIMIT_PER_SECOND", "5"))
+EXA_RATE_LIMIT_BURST = int(os.getenv("EXA_RATE_LIMIT_BURST", "10"))
+EXA_FIXTURE_MODE = os.getenv("EXA_FIXTURE_MODE", "off").lower()  # off | record | replay
+EXA_FIXTURE_PATH = os.getenv(
+    "EXA_FIXTURE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "exa_fixtures.json"),
+)
+# Simulated Exa latency in replay mode, for realistic offline benchmarks
+EXA_FIXTURE_LATENCY_MS = float(os.getenv("EXA_FIXTURE_LATENCY_MS", "0"))
+
+# Result TTL per query class (see classify_query)
+QUERY_CLASS_TTL_SECONDS = {
+    "live": float(os.getenv("EXA_TTL_LIVE_SECONDS", "300")),
+    "news": float(os.getenv("EXA_TTL_NEWS_SECONDS", "3600")),
+    "reference": float(os.getenv("EXA_TTL_REFERENCE_SECONDS", "21600")),
+}
+
+_LIVE = re.compile(
+    r"\b(today|now|live|current|currently|price|prices|nav|quote|nifty|sensex|banknifty|"
+    r"index|level|rate|rates|gold|silver|usd|inr|rupee)\b"
+)
+_NEWS = re.compile(r"\b(news|latest|recent|this week|this month|announcement|results|earnings|update|updates)\b")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase words without punctuation, in their original order, single-spaced."""
+    words = re.sub(r"[^\w%.\s]", " ", (query or "").lower()).split()
+    return " ".join(w for w in (w.strip(".") for w in words) if w)
+
+
+def classify_query(query: str) -> str:
+    """"live" (prices, index levels, rates), "news", or "reference" (everything else)."""
+    text = " ".join(re.sub(r"[^\w%.\s]", " ", (query or "").lower()).split())
+    if _LIVE.search(text):
+        return "live"
+    if _NEWS.search(text):
+        return "news"
+    return "reference"
+
+
+class RateLimiter:
+    """Thread-safe token bucket: rate tokens per second, up to burst in reserve."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait:
+                self.waits += 1
+                self.waited_seconds += wait
+        if wait:
+            time.sleep(wait)
+
+
+class _FixtureStore:
+    """Exa results by normalized query, persisted as JSON at EXA_FIXTURE_PATH."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._results = json.load(f)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._results.get(key)
+
+    def put(self, key: str, result: str) -> None:
+        with self._lock:
+            self._results[key] = result
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._results, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+rate_limiter = RateLimiter(EXA_RATE_LIMIT_PER_SECOND, EXA_RATE_LIMIT_BURST)
+search_caches = {
+    query_class: LRUCache(max_size=EXA_CACHE_SIZE, ttl_seconds=ttl)
+    for query_class, ttl in QUERY_CLASS_TTL_SECONDS.items()
+}
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+_counters = Counter()
+
+
+def _count(name: str) -> None:
+    with _inflight_lock:
+        _counters[name] += 1
+
+
+class SearchInput(BaseModel):
+    query: str = Field(description="The search query.")
+
+
+class CachedExaSearch(BaseTool):
+    """Exa search behind the shared cache, request coalescing and rate limiter described above."""
+
+    # Same name as ExaSearchResults, so tool-progress labels (chatbot.TOOL_STATUS) still apply
+    name: str = "exa_search_results_json"
+    description: str = (
+        "Exa Search, one of the best web search APIs built for AI. Input should be an "
+        "Exa-optimized query. Output is a JSON array of the query results"
+    )
+    args_schema: Type[BaseModel] = SearchInput
+
+    _exa: Any = PrivateAttr(default=None)
+    _fixtures: Optional[_FixtureStore] = PrivateAttr(default=None)
+
+    def __init__(self, exa_tool=None, fixtures: Optional[_FixtureStore] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._exa = exa_tool
+        self._fixtures = fixtures
+
+    def _fetch(self, query: str, key: str) -> Tuple[str, bool]:
+        """(result text, cacheable). Failed searches are returned to the agent but not cached."""
+        if EXA_FIXTURE_MODE == "replay":
+            if EXA_FIXTURE_LATENCY_MS:
+                time.sleep(EXA_FIXTURE_LATENCY_MS / 1000)
+            _count("fixture_replays")
+            recorded = self._fixtures.get(key)
+            return (recorded, True) if recorded is not None else (f"No recorded search results for: {query}", False)
+
+        rate_limiter.acquire()
+        _count("exa_calls")
+        response = self._exa.invoke({"query": query, "num_results": EXA_NUM_RESULTS})
+        if isinstance(response, str):  # ExaSearchResults returns repr(exception) on failure
+            _count("errors")
+            return response, False
+        result = str(response)
+        if EXA_FIXTURE_MODE == "record":
+            self._fixtures.put(key, result)
+        return result, True
+
+    def _claim(self, query: str) -> Tuple[str, str, Optional[str], Future, bool]:
+        """(key, query class, cached result, in-flight future, whether this caller must run the search)."""
+        key, query_class = normalize_query(query), classify_query(query)
+        with _inflight_lock:
+            # Cache and _inflight are checked under one lock: an owner caches its result
+            # before leaving _inflight, so a late caller sees one or the other and never
+            # becomes a second owner
+            cached = search_caches[query_class].get(key)
+            if cached is not None:
+                _counters["hits"] += 1
+                return key, query_class, cached, None, False
+            future = _inflight.get(key)
+            if future is not None:
+                _counters["coalesced"] += 1
+                return key, query_class, None, future, False
+            future = _inflight[key] = Future()
+            _counters["misses"] += 1
+        return key, query_class, None, future, True
+
+    def _complete(self, query: str, key: str, query_class: str, future: Future) -> str:
+        try:
+            result, cacheable = self._fetch(query, key)
+            if cacheable:
+                search_caches[query_class].set(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+
+    def _run(self, query: str, run_manager=None) -> str:
+        key, query_class, cached, future, owner = self._claim(query)
+        if cached is not None:
+            return cached
+        return self._complete(query, key, query_class, future) if owner else future.result()
+
+    async def _arun(self, query: str, run_manager=None) -> str:
+        key, query_class, cached, future, owner = self._claim(query)
+        if cached is not None:
+            return cached
+        if not owner:
+            return await asyncio.wrap_future(future)
+        # The Exa client is synchronous; keep it (and any rate-limit wait) off the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._complete, query, key, query_class, future
+        )
+
+
+def search_cache_stats() -> Dict[str, Any]:
+    """Counters of the shared search layer (process-wide)."""
+    searches = _counters["hits"] + _counters["coalesced"] + _counters["misses"]
+    return {
+        "fixture_mode": EXA_FIXTURE_MODE,
+        "searches": searches,
+        "hits": _counters["hits"],
+        "coalesced": _counters["coalesced"],
+        "misses": _counters["misses"],
+        "exa_calls": _counters["exa_calls"],
+        "fixture_replays": _counters["fixture_replays"],
+        "errors": _counters["errors"],
+        "hit_rate": round((_counters["hits"] + _counters["coalesced"]) / searches, 4) if searches else None,
+        "rate_limiter": {
+            "rate_per_second": rate_limiter.rate,
+            "burst": rate_limiter.burst,
+            "waits": rate_limiter.waits,
+            "waited_seconds": round(rate_limiter.waited_seconds, 3),
+        },
+        "classes": {query_class: cache.stats() for query_class, cache in search_caches.items()},
+    }
+
+
+def reset_search_cache() -> None:
+    for cache in search_caches.values():
+        cache.clear()
+    _counters.clear()
 
 
 def get_exa_search_tool():
     """
-    Return a configured ExaSearchResults tool instance for use in LangChain agents.
+    Return the shared CachedExaSearch tool for use in LangChain agents.
 
-    Returns None if the EXA_API_KEY is not set, allowing the agent to
-    gracefully run without web search capability.
+    Returns None if the EXA_API_KEY is not set (and no fixture is being
+    replayed), allowing the agent to gracefully run without web search capability.
     """
+    if EXA_FIXTURE_MODE == "replay":
+        fixtures = _FixtureStore(EXA_FIXTURE_PATH)
+        print(f"[ExaSearch] Replaying {len(fixtures)} recorded searches from {EXA_FIXTURE_PATH}.")
+        return CachedExaSearch(fixtures=fixtures)
+
     if not EXA_API_KEY:
         print("[ExaSearch] EXA_API_KEY not configured. Web search tool will be unavailable.")
         return None
@@ -34,12 +297,10 @@ def get_exa_search_tool():
     try:
         from langchain_exa import ExaSearchResults
 
-        tool = ExaSearchResults(
-            exa_api_key=EXA_API_KEY,
-            max_results=3,
-        )
+        exa_tool = ExaSearchResults(exa_api_key=EXA_API_KEY)
+        fixtures = _FixtureStore(EXA_FIXTURE_PATH) if EXA_FIXTURE_MODE == "record" else None
         print("[ExaSearch] Exa search tool initialized successfully.")
-        return tool
+        return CachedExaSearch(exa_tool=exa_tool, fixtures=fixtures)
 
     except Exception as e:
         print(f"[ExaSearch] Failed to initialize Exa search tool: {e}")
@@ -1,18 +1,29 @@
-import os
 import json
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from .exa_search import get_exa_search_tool
 from langgraph.prebuilt import create_react_agent
+from . import registry
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+MARKET_SYSTEM_PROMPT = """You are a financial data extractor. 
+        Your task is to find the CURRENT (today's) levels of:
+        1. Nifty 50 Index (India)
+        2. BSE Sensex (India)
+        3. Gold Price per 10g (24K, India)
+        
+        Respond ONLY with a JSON array of objects. Example:
+        [
+            {"name": "Nifty 50", "value": "22,096.75", "change": "+0.45%", "status": "up"},
+            ...
+        ]
+        Search the web to get the absolute latest values from reliable sources like Moneycontrol or NSE/BSE.
+        """
 
 async def get_market_indices():
     """
     Uses Gemini + Web Search to get the latest levels of Nifty 50, Sensex, and Gold.
     Returns a list of dicts.
     """
-    if not GEMINI_API_KEY:
+    llm = registry.get_chat_model()  # Shared client, built on first use
+    if not llm:
         return [
             {"name": "Nifty 50", "value": "22,000", "change": "+0.5%", "status": "up"},
             {"name": "Sensex", "value": "72,500", "change": "+0.4%", "status": "up"},
@@ -20,24 +31,12 @@ async def get_market_indices():
         ]
 
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=GEMINI_API_KEY)
-        tools = [get_exa_search_tool()]
-        
-        system_prompt = """You are a financial data extractor. 
-        Your task is to find the CURRENT (today's) levels of:
-        1. Nifty 50 Index (India)
-        2. BSE Sensex (India)
-        3. Gold Price per 10g (24K, India)
-        
-        Respond ONLY with a JSON array of objects. Example:
-        [
-            {"name": "Nifty 50", "value": "22,096.75", "change": "+0.45%", "status": "up"},
-            ...
-        ]
-        Search the web to get the absolute latest values from reliable sources like Moneycontrol or NSE/BSE.
-        """
-        
-        agent = create_react_agent(model=llm, tools=tools, prompt=system_prompt)
+        # The prompt is static, so the graph is compiled once and reused
+        agent = registry.get_agent(
+            "market",
+            llm,
+            lambda model: create_react_agent(model=model, tools=registry.get_tools(), prompt=MARKET_SYSTEM_PROMPT),
+        )
         
         result = await agent.ainvoke(
             {"messages": [HumanMessage(content="Get current Nifty 50, Sensex, and Gold prices for India.")]}
@@ -2,8 +2,11 @@
 Monte Carlo Goal Simulation Engine.
 Runs N simulations with market volatility to produce probability cones for financial goals.
 """
+import os
 import numpy as np
-from typing import Dict, Any, List
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 
 # Annualized return and volatility assumptions by risk profile
@@ -16,6 +19,370 @@ RISK_PARAMS = {
 N_SIMULATIONS = 1000
 MONTHS_PER_YEAR = 12
 
+# Above this many path cells (n_simulations x months) the simulation switches to
+# streaming mode, which keeps only the current month's values in memory.
+STREAMING_THRESHOLD_CELLS = 20_000_000
+STREAM_CHUNK_MONTHS = 12
+
+
+# --- Return models ---
+# Every model is calibrated to the risk profile's monthly mean and volatility, so
+# switching models changes the shape of the distribution, not the headline assumptions.
+STUDENT_T_DOF = 5
+
+# Monthly-return history for the bootstrap model: one decimal return per line (e.g. 0.012)
+HISTORICAL_RETURNS_FILE = os.getenv("MC_HISTORICAL_RETURNS_FILE", "")
+
+# Two-state (bull/bear) Markov regime model
+REGIME_PARAMS = {
+    "p_bull_to_bear": 0.03,     # Monthly chance a bull market turns (mean bull run ~33 months)
+    "p_bear_to_bull": 0.10,     # Monthly chance a bear market ends (mean bear run ~10 months)
+    "bear_mean_shift": -1.0,    # Bear-month mean = overall mean + shift * overall volatility
+    "bear_vol_multiplier": 1.5, # Bear-month volatility relative to overall volatility
+}
+
+# --- Variance reduction ---
+SAMPLERS = ("pseudo", "sobol")
+SYMMETRIC_RETURN_MODELS = ("normal", "student_t")          # Valid for antithetic mirroring
+IID_RETURN_MODELS = ("normal", "student_t", "bootstrap")   # Known E[final value] for control variates
+
+# --- Adaptive stopping ---
+# Paths are added in batches until both standard errors are below tolerance (or the budget runs out)
+ADAPTIVE_MIN_SIMULATIONS = 500
+ADAPTIVE_BATCH_SIZE = 500
+ADAPTIVE_MAX_SIMULATIONS = 20_000
+ADAPTIVE_PROB_TOLERANCE = 1.0      # Std error of probability_of_success, in percentage points
+ADAPTIVE_MEDIAN_TOLERANCE = 0.02   # Std error of the median final value, relative to the median
+
+SIP_CONFIDENCE_LEVELS = [50, 75, 90]  # Success probabilities the SIP solver reports by default
+SIP_SOLVER_SIMULATIONS = 10_000       # One vectorized pass, so more paths are cheap (~50 ms)
+
+CONE_PERCENTILES = [10, 25, 50, 75, 90]
+MAX_CONE_POINTS = 36  # Cone is sampled at most this many times for chart performance
+
+
+def _months_to_target(target_date_str: str) -> int:
+    """Whole months from now until target_date (YYYY-MM-DD), at least 1. Defaults to 5 years."""
+    try:
+        target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
+        now = datetime.now()
+        return max(1, (target_date.year - now.year) * 12 + (target_date.month - now.month))
+    except Exception:
+        return 60  # Default 5 years
+
+
+def _monthly_params(risk_profile: str) -> Tuple[float, float]:
+    """Monthly mean return and volatility for a risk profile."""
+    params = RISK_PARAMS.get(risk_profile, RISK_PARAMS["Moderate"])
+    return params["mean_return"] / MONTHS_PER_YEAR, params["volatility"] / np.sqrt(MONTHS_PER_YEAR)
+
+
+def _normal_returns(rng: np.random.Generator, mean: float, vol: float, shape: Tuple[int, int]) -> np.ndarray:
+    return rng.normal(mean, vol, size=shape)
+
+
+def _student_t_returns(rng: np.random.Generator, mean: float, vol: float, shape: Tuple[int, int]) -> np.ndarray:
+    """Fat-tailed i.i.d. returns: Student-t scaled to unit variance, then to the profile's mean/vol."""
+    returns = rng.standard_t(STUDENT_T_DOF, size=shape)
+    returns *= vol * np.sqrt((STUDENT_T_DOF - 2) / STUDENT_T_DOF)
+    returns += mean
+    return returns
+
+
+@lru_cache(maxsize=4)
+def _load_standardized_history(path: str) -> np.ndarray:
+    values = []
+    with open(path) as f:
+        for line in f:
+            field = line.strip().split(",")[-1]
+            try:
+                values.append(float(field))
+            except ValueError:
+                continue  # header or blank line
+    history = np.asarray(values)
+    if len(history) < 12:
+        raise ValueError(f"Historical returns file {path} needs at least 12 monthly returns, found {len(history)}.")
+    return (history - history.mean()) / history.std()
+
+
+def _bootstrap_returns(rng: np.random.Generator, mean: float, vol: float, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    i.i.d. bootstrap from historical monthly returns. The history is standardized and
+    rescaled to the profile's mean/vol, so it contributes its skew and tails only.
+    """
+    if not HISTORICAL_RETURNS_FILE:
+        raise ValueError("Bootstrap return model needs MC_HISTORICAL_RETURNS_FILE to point at a monthly returns file.")
+    history = _load_standardized_history(HISTORICAL_RETURNS_FILE)
+    returns = history[rng.integers(0, len(history), size=shape)]
+    returns *= vol
+    returns += mean
+    return returns
+
+
+def _regime_moments(mean: float, vol: float) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Per-regime (bull, bear) monthly mean and vol whose stationary mixture has the
+    profile's overall mean and variance. Returns (means, vols, stationary P(bear)).
+    """
+    p_up, p_down = REGIME_PARAMS["p_bull_to_bear"], REGIME_PARAMS["p_bear_to_bull"]
+    pi_bear = p_up / (p_up + p_down)
+    pi_bull = 1 - pi_bear
+    bear_mean = mean + REGIME_PARAMS["bear_mean_shift"] * vol
+    bull_mean = (mean - pi_bear * bear_mean) / pi_bull
+    bear_vol = vol * REGIME_PARAMS["bear_vol_multiplier"]
+    between = pi_bull * pi_bear * (bull_mean - bear_mean) ** 2
+    bull_var = max((vol ** 2 - pi_bear * bear_vol ** 2 - between) / pi_bull, (0.25 * vol) ** 2)
+    return np.array([bull_mean, bear_mean]), np.array([np.sqrt(bull_var), bear_vol]), pi_bear
+
+
+def _regime_states(
+    rng: np.random.Generator, n_sims: int, months: int, initial_state: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Bull(0)/bear(1) state of every path and month, without a loop over months.
+
+    Regime run lengths of a two-state Markov chain are geometric, so each path's regime
+    sequence is drawn as alternating run lengths; their cumulative sums mark the switch
+    months, and a cumsum over the switch marks gives the state.
+
+    initial_state is the state of the month *before* this block (the last column of the
+    previous block). One Markov transition is applied to it to get this block's first
+    month; after that, run lengths are memoryless, so the chain continues exactly.
+    """
+    p_leave = np.array([REGIME_PARAMS["p_bull_to_bear"], REGIME_PARAMS["p_bear_to_bull"]])
+    if initial_state is None:
+        pi_bear = p_leave[0] / p_leave.sum()
+        initial_state = (rng.random(n_sims) < pi_bear).astype(np.int8)
+    else:
+        initial_state = (initial_state ^ (rng.random(n_sims) < p_leave[initial_state])).astype(np.int8)
+
+    # Enough runs to cover the horizon for almost every path; top up the rare stragglers
+    n_runs = int(months * p_leave.max() * 2) + 8
+    run_states = (initial_state[:, None] + np.arange(n_runs)) % 2
+    run_ends = np.cumsum(rng.geometric(p_leave[run_states]), axis=1)
+    while (run_ends[:, -1] < months).any():
+        extra_states = (run_states[:, -1:] + 1 + np.arange(n_runs)) % 2
+        extra_ends = run_ends[:, -1:] + np.cumsum(rng.geometric(p_leave[extra_states]), axis=1)
+        run_states = np.hstack([run_states, extra_states])
+        run_ends = np.hstack([run_ends, extra_ends])
+
+    switches = np.zeros((n_sims, months), dtype=np.int8)
+    rows, cols = np.nonzero(run_ends < months)
+    switches[rows, run_ends[rows, cols]] = 1
+    np.cumsum(switches, axis=1, out=switches)
+    switches += initial_state[:, None]
+    switches %= 2
+    return switches
+
+
+def _regime_returns(
+    rng: np.random.Generator, mean: float, vol: float, shape: Tuple[int, int],
+    initial_state: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Two-state regime-switching normal returns. Returns (returns, last month's state)."""
+    n_sims, months = shape
+    means, vols, _ = _regime_moments(mean, vol)
+    states = _regime_states(rng, n_sims, months, initial_state)
+    is_bear = states.astype(bool)
+    returns = rng.standard_normal(size=shape)
+    returns *= np.where(is_bear, vols[1], vols[0])
+    returns += np.where(is_bear, means[1], means[0])
+    return returns, states[:, -1]
+
+
+RETURN_MODELS: Dict[str, Callable[..., np.ndarray]] = {
+    "normal": _normal_returns,
+    "student_t": _student_t_returns,
+    "bootstrap": _bootstrap_returns,
+    "regime": lambda rng, mean, vol, shape: _regime_returns(rng, mean, vol, shape)[0],
+}
+
+
+def _validate_return_model(return_model: str) -> None:
+    if return_model not in RETURN_MODELS:
+        raise ValueError(f"Unknown return model '{return_model}'. Choose one of: {', '.join(RETURN_MODELS)}.")
+
+
+def _validate_sampling(return_model: str, antithetic: bool, sampler: str, control_variate: bool) -> None:
+    _validate_return_model(return_model)
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{sampler}'. Choose one of: {', '.join(SAMPLERS)}.")
+    if sampler == "sobol" and return_model != "normal":
+        raise ValueError("The sobol sampler is only available with the normal return model.")
+    if antithetic and return_model not in SYMMETRIC_RETURN_MODELS:
+        raise ValueError(f"Antithetic variates need a symmetric return model: {', '.join(SYMMETRIC_RETURN_MODELS)}.")
+    if control_variate and return_model not in IID_RETURN_MODELS:
+        raise ValueError(f"Control variates need an i.i.d. return model: {', '.join(IID_RETURN_MODELS)}.")
+
+
+def _effective_simulations(n_simulations: int, antithetic: bool, sampler: str) -> int:
+    """Sobol runs use the next power of two (balanced point sets); antithetic runs an even count."""
+    if sampler == "sobol":
+        return 1 << max(1, int(np.ceil(np.log2(n_simulations))))
+    if antithetic:
+        return n_simulations + n_simulations % 2
+    return n_simulations
+
+
+def _sobol_normals(rng: np.random.Generator, n_sims: int, months: int) -> np.ndarray:
+    """Scrambled Sobol points mapped to standard normals, one dimension per month."""
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+
+    sampler = qmc.Sobol(d=months, scramble=True, seed=rng)
+    points = sampler.random_base2(int(np.log2(n_sims)))
+    # Guard the open interval: ndtri(0) would be -inf
+    np.clip(points, 1e-12, 1 - 1e-12, out=points)
+    return ndtri(points)
+
+
+def _draw_returns(
+    rng: np.random.Generator, return_model: str, mean: float, vol: float, n_sims: int, months: int,
+    antithetic: bool = False, sampler: str = "pseudo",
+) -> np.ndarray:
+    """
+    (n_sims, months) matrix of monthly returns from the selected model, in one call.
+
+    With antithetic=True the second half of the rows mirrors the first half about the
+    mean (row i pairs with row i + n_sims // 2). sampler='sobol' replaces pseudo-random
+    normals with scrambled low-discrepancy points.
+    """
+    _validate_sampling(return_model, antithetic, sampler, control_variate=False)
+    n_draw = n_sims // 2 if antithetic else n_sims
+    if sampler == "sobol":
+        returns = _sobol_normals(rng, n_draw, months)
+        returns *= vol
+        returns += mean
+    else:
+        returns = RETURN_MODELS[return_model](rng, mean, vol, (n_draw, months))
+    if antithetic:
+        returns = np.concatenate([returns, 2 * mean - returns])
+    return returns
+
+
+def _expected_final_value(current_amount: float, monthly_sip: float, monthly_mean: float, months: int) -> float:
+    """
+    E[V_T] for i.i.d. returns with mean monthly_mean: the deterministic SIP future value.
+        E[V_T] = V_0 g^T + sip * (g + g^2 + ... + g^T),   g = 1 + monthly_mean
+    """
+    g = 1 + monthly_mean
+    if abs(monthly_mean) < 1e-12:
+        return current_amount + monthly_sip * months
+    return current_amount * g ** months + monthly_sip * g * (g ** months - 1) / monthly_mean
+
+
+def _success_estimate(
+    final_values: np.ndarray,
+    target_amount: float,
+    antithetic: bool = False,
+    expected_final: Optional[float] = None,
+) -> Tuple[float, float]:
+    """
+    Probability of success and its standard error, both in percent.
+
+    With expected_final the estimate uses the final value as a control variate
+    (its true mean is known), removing the part of the sampling noise that is
+    explained by how lucky the simulated markets were overall. Antithetic pairs
+    are averaged before the error is computed, since the two halves are correlated.
+    For Sobol runs the i.i.d. error is reported, which overstates the true error.
+    """
+    estimates = (final_values >= target_amount).astype(float)
+    controls = final_values.astype(float)
+    if antithetic:
+        half = len(estimates) // 2
+        estimates = 0.5 * (estimates[:half] + estimates[half:])
+        controls = 0.5 * (controls[:half] + controls[half:])
+    if expected_final is not None:
+        spread = controls - controls.mean()
+        variance = float(np.dot(spread, spread))
+        if variance > 0:
+            beta = float(np.dot(spread, estimates - estimates.mean())) / variance
+            estimates = estimates - beta * (controls - expected_final)
+    prob = float(np.clip(estimates.mean(), 0.0, 1.0))
+    std_error = float(estimates.std(ddof=1) / np.sqrt(len(estimates))) if len(estimates) > 1 else 0.0
+    return prob * 100, std_error * 100
+
+
+def _cone_time_points(months_left: int) -> List[int]:
+    step = max(1, months_left // MAX_CONE_POINTS)
+    time_points = list(range(0, months_left + 1, step))
+    if time_points[-1] != months_left:
+        time_points.append(months_left)
+    return time_points
+
+
+def _milestone_months(months_left: int) -> List[int]:
+    return [m for m in sorted({12, 24, 36, 48, 60, months_left}) if m <= months_left]
+
+
+def _growth_factors(monthly_returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Path-wise factors from which any (current_amount, monthly_sip) portfolio can be built.
+
+    The monthly recurrence  V[t+1] = (V[t] + sip) * (1 + r[t])  has the closed form
+        V[t] = G[t] * (V[0] + sip * D[t]),   G[t] = prod_{j<t} (1 + r[j]),   D[t] = sum_{k<t} 1 / G[k]
+    so every path is one cumprod plus one cumsum instead of a Python loop per month.
+
+    Note: monthly_returns is overwritten and reused as the buffer for D.
+
+    Returns:
+        growth of shape (n_simulations, months + 1) with growth[:, 0] == 1, and
+        discounted of shape (n_simulations, months) holding D[1..months].
+    """
+    n_sims, months = monthly_returns.shape
+    growth = np.empty((n_sims, months + 1))
+    growth[:, 0] = 1.0
+    np.add(monthly_returns, 1.0, out=monthly_returns)
+    np.cumprod(monthly_returns, axis=1, out=growth[:, 1:])
+
+    discounted = monthly_returns
+    np.reciprocal(growth[:, :-1], out=discounted)
+    np.cumsum(discounted, axis=1, out=discounted)
+    return growth, discounted
+
+
+def _paths_from_factors(
+    growth: np.ndarray,
+    discounted: np.ndarray,
+    months: int,
+    current_amount: float,
+    monthly_sip: float,
+) -> np.ndarray:
+    """Portfolio paths of shape (n_simulations, months + 1) for one goal, from shared factors."""
+    portfolio = np.empty((growth.shape[0], months + 1))
+    portfolio[:, 0] = current_amount
+    np.multiply(discounted[:, :months], monthly_sip, out=portfolio[:, 1:])
+    portfolio[:, 1:] += current_amount
+    portfolio[:, 1:] *= growth[:, 1:months + 1]
+    return portfolio
+
+
+def _simulate_paths(monthly_returns: np.ndarray, current_amount: float, monthly_sip: float) -> np.ndarray:
+    """
+    Build all portfolio paths at once from a (n_simulations, months) return matrix.
+    Works in place on the growth factors, so peak memory is two path-sized arrays.
+
+    Returns:
+        Array of shape (n_simulations, months + 1); column 0 is current_amount.
+    """
+    growth, discounted = _growth_factors(monthly_returns)
+    discounted *= monthly_sip
+    discounted += current_amount
+
+    portfolio = growth
+    portfolio[:, 1:] *= discounted
+    portfolio[:, 0] = current_amount
+    return portfolio
+
+
+def _format_cone(time_points: List[int], cone: np.ndarray) -> List[Dict[str, Any]]:
+    """Turn a (len(CONE_PERCENTILES), len(time_points)) percentile array into chart rows."""
+    cone = np.round(cone, 2)
+    return [
+        {"month": t, **{f"p{p}": float(cone[i, j]) for i, p in enumerate(CONE_PERCENTILES)}}
+        for j, t in enumerate(time_points)
+    ]
+
 
 def run_monte_carlo_simulation(
     goal: Dict[str, Any],
@@ -23,6 +390,15 @@ def run_monte_carlo_simulation(
     current_amount: float,
     risk_profile: str = "Moderate",
     n_simulations: int = N_SIMULATIONS,
+    streaming: Optional[bool] = None,
+    return_model: str = "normal",
+    antithetic: bool = False,
+    sampler: str = "pseudo",
+    control_variate: bool = False,
+    adaptive: bool = False,
+    prob_tolerance: float = ADAPTIVE_PROB_TOLERANCE,
+    median_tolerance: float = ADAPTIVE_MEDIAN_TOLERANCE,
+    max_simulations: int = ADAPTIVE_MAX_SIMULATIONS,
 ) -> Dict[str, Any]:
     """
     Run Monte Carlo simulation for a financial goal.
@@ -33,86 +409,524 @@ def run_monte_carlo_simulation(
         current_amount: Already accumulated amount.
         risk_profile: 'Conservative', 'Moderate', or 'Aggressive'.
         n_simulations: Number of simulation paths to run.
+        streaming: Advance paths month by month with O(n_simulations) memory instead of
+            building the full path matrix. None picks streaming automatically for runs
+            larger than STREAMING_THRESHOLD_CELLS.
+        return_model: Monthly return generator, one of RETURN_MODELS
+            ('normal', 'student_t', 'bootstrap', 'regime').
+        antithetic: Mirror half of the paths about the mean (symmetric models only).
+        sampler: 'pseudo' or 'sobol' (scrambled low-discrepancy normals, normal model only;
+            rounds n_simulations up to a power of two and disables streaming).
+        control_variate: Correct the success probability using the final value, whose
+            mean is the deterministic SIP future value (i.i.d. models only).
+        adaptive: Treat n_simulations as the minimum and keep adding batches of
+            ADAPTIVE_BATCH_SIZE paths until the standard errors of the success
+            probability (prob_tolerance, percentage points) and of the median final
+            value (median_tolerance, relative) are met, or max_simulations is reached.
 
     Returns:
-        Simulation results with probability percentiles and cone data.
+        Simulation results with probability percentiles, the success probability's
+        standard error, and cone data. Adaptive runs add a "stopping" section.
     """
-    params = RISK_PARAMS.get(risk_profile, RISK_PARAMS["Moderate"])
-    annual_mean = params["mean_return"]
-    annual_vol = params["volatility"]
+    if adaptive:
+        return run_monte_carlo_batch(
+            [{**goal, "monthly_sip": monthly_sip, "current_amount": current_amount}],
+            risk_profile, n_simulations, return_model, antithetic, sampler, control_variate,
+            adaptive=True, prob_tolerance=prob_tolerance, median_tolerance=median_tolerance,
+            max_simulations=max_simulations,
+        )[0]
 
-    # Convert to monthly
-    monthly_mean = annual_mean / MONTHS_PER_YEAR
-    monthly_vol = annual_vol / np.sqrt(MONTHS_PER_YEAR)
-
-    # Calculate months to target
+    monthly_mean, monthly_vol = _monthly_params(risk_profile)
     target_amount = float(goal.get("target_amount", 0))
-    target_date_str = goal.get("target_date", "")
-    
-    try:
-        from datetime import datetime
-        target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
-        now = datetime.now()
-        months_left = max(1, (target_date.year - now.year) * 12 + (target_date.month - now.month))
-    except Exception:
-        months_left = 60  # Default 5 years
+    months_left = _months_to_target(goal.get("target_date", ""))
+
+    _validate_sampling(return_model, antithetic, sampler, control_variate)
+    n_simulations = _effective_simulations(n_simulations, antithetic, sampler)
+    expected_final = (
+        _expected_final_value(current_amount, monthly_sip, monthly_mean, months_left) if control_variate else None
+    )
+    if streaming is None:
+        streaming = sampler != "sobol" and n_simulations * months_left > STREAMING_THRESHOLD_CELLS
+    if streaming:
+        if sampler == "sobol":
+            raise ValueError("The sobol sampler needs every month's draws at once and cannot stream.")
+        return _run_streaming(
+            goal, target_amount, monthly_sip, current_amount, months_left,
+            risk_profile, n_simulations, monthly_mean, monthly_vol, return_model,
+            antithetic=antithetic, expected_final=expected_final,
+        )
 
     # Run simulations
     rng = np.random.default_rng(seed=42)
     # Shape: (n_simulations, months_left)
-    monthly_returns = rng.normal(monthly_mean, monthly_vol, size=(n_simulations, months_left))
+    monthly_returns = _draw_returns(
+        rng, return_model, monthly_mean, monthly_vol, n_simulations, months_left, antithetic, sampler,
+    )
+    portfolio = _simulate_paths(monthly_returns, current_amount, monthly_sip)
 
-    # Build portfolio value paths
-    # Start all sims at current_amount
-    portfolio = np.zeros((n_simulations, months_left + 1))
-    portfolio[:, 0] = current_amount
+    return _summarize_paths(
+        goal, portfolio, target_amount, current_amount, monthly_sip, risk_profile, return_model,
+        success=_success_estimate(portfolio[:, -1], target_amount, antithetic, expected_final),
+        variance_reduction=_variance_reduction_info(antithetic, sampler, control_variate),
+    )
 
-    for month in range(months_left):
-        portfolio[:, month + 1] = (portfolio[:, month] + monthly_sip) * (1 + monthly_returns[:, month])
 
-    final_values = portfolio[:, -1]
+def _variance_reduction_info(antithetic: bool, sampler: str, control_variate: bool) -> Dict[str, Any]:
+    return {"antithetic": antithetic, "sampler": sampler, "control_variate": control_variate}
 
-    # --- Probability of reaching the goal ---
-    prob_success = float(np.mean(final_values >= target_amount) * 100)
 
-    # --- Percentile Cone (for chart visualization) ---
-    # Compute percentiles at each month snapshot
-    # We sample at most 36 points for chart performance
-    step = max(1, months_left // 36)
-    time_points = list(range(0, months_left + 1, step))
-    if time_points[-1] != months_left:
-        time_points.append(months_left)
+def simulate_goal_batch(
+    goal: Dict[str, Any],
+    risk_profile: str = "Moderate",
+    n_simulations: int = N_SIMULATIONS,
+    return_model: str = "normal",
+    seed: int = 42,
+) -> Dict[str, np.ndarray]:
+    """
+    One batch of paths for a goal (with monthly_sip and current_amount), reduced to
+    what merge_goal_batches needs: the portfolio at the cone months (the last one is
+    the final value), first-hit months and per-milestone hit counts.
+
+    Background jobs simulate a goal as several batches so they can report progress
+    between them. A single batch with seed=42 gives exactly the paths of the
+    full-matrix run_monte_carlo_simulation.
+    """
+    monthly_mean, monthly_vol = _monthly_params(risk_profile)
+    months_left = _months_to_target(goal.get("target_date", ""))
+    rng = np.random.default_rng(seed=seed)
+    monthly_returns = _draw_returns(rng, return_model, monthly_mean, monthly_vol, n_simulations, months_left)
+    portfolio = _simulate_paths(monthly_returns, float(goal.get("current_amount", 0)), float(goal.get("monthly_sip", 0)))
+
+    reached = portfolio >= float(goal.get("target_amount", 0))
+    return {
+        "cone_values": portfolio[:, _cone_time_points(months_left)],
+        "hit_months": reached.argmax(axis=1)[reached.any(axis=1)],
+        "milestone_hits": reached[:, _milestone_months(months_left)].sum(axis=0),
+    }
 
-    cone_data = []
-    for t in time_points:
-        col = portfolio[:, t]
-        cone_data.append({
-            "month": t,
-            "p10": round(float(np.percentile(col, 10)), 2),
-            "p25": round(float(np.percentile(col, 25)), 2),
-            "p50": round(float(np.percentile(col, 50)), 2),  # Median
-            "p75": round(float(np.percentile(col, 75)), 2),
-            "p90": round(float(np.percentile(col, 90)), 2),
-        })
-
-    # --- Find years when goals are likely hit ---
-    # For each sim, find which month portfolio first crosses target
-    hit_months = []
-    for sim_idx in range(n_simulations):
-        path = portfolio[sim_idx]
-        crossed = np.where(path >= target_amount)[0]
-        if len(crossed) > 0:
-            hit_months.append(crossed[0])
-
-    hit_months = np.array(hit_months) if hit_months else np.array([])
-
-    # Milestone probabilities
+
+def merge_goal_batches(
+    goal: Dict[str, Any],
+    batches: List[Dict[str, np.ndarray]],
+    risk_profile: str = "Moderate",
+    return_model: str = "normal",
+) -> Dict[str, Any]:
+    """Combine simulate_goal_batch results into one result shaped like run_monte_carlo_simulation's."""
+    months_left = _months_to_target(goal.get("target_date", ""))
+    cone_values = np.concatenate([batch["cone_values"] for batch in batches])
+    n_simulations = len(cone_values)
+    milestone_hits = np.sum([batch["milestone_hits"] for batch in batches], axis=0)
+
+    return _assemble_result(
+        goal=goal,
+        target_amount=float(goal.get("target_amount", 0)),
+        current_amount=float(goal.get("current_amount", 0)),
+        monthly_sip=float(goal.get("monthly_sip", 0)),
+        months_left=months_left,
+        risk_profile=risk_profile,
+        n_simulations=n_simulations,
+        final_values=cone_values[:, -1],
+        cone_data=_format_cone(
+            _cone_time_points(months_left), np.percentile(cone_values, CONE_PERCENTILES, axis=0),
+        ),
+        milestones={
+            f"month_{m}": round(float(hits / n_simulations * 100), 1)
+            for m, hits in zip(_milestone_months(months_left), milestone_hits)
+        },
+        hit_months=np.concatenate([batch["hit_months"] for batch in batches]),
+        return_model=return_model,
+    )
+
+
+def _run_streaming(
+    goal: Dict[str, Any],
+    target_amount: float,
+    monthly_sip: float,
+    current_amount: float,
+    months_left: int,
+    risk_profile: str,
+    n_simulations: int,
+    monthly_mean: float,
+    monthly_vol: float,
+    return_model: str = "normal",
+    chunk_months: int = STREAM_CHUNK_MONTHS,
+    antithetic: bool = False,
+    expected_final: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Streaming variant of run_monte_carlo_simulation.
+
+    Returns are drawn chunk_months at a time with shape (months, n_simulations) so each
+    month is a contiguous row; only the current value of every path is kept, and the
+    cone, first-hit months and milestones are recorded as the paths pass those months.
+    Statistically equivalent to the full-matrix engine, but the draws are consumed in
+    a different order so individual numbers differ for the same seed.
+    """
+    time_points = _cone_time_points(months_left)
+    cone_index = {t: j for j, t in enumerate(time_points)}
+    milestone_months = set(_milestone_months(months_left))
+
+    values = np.full(n_simulations, current_amount, dtype=float)
+    hit_month = np.where(values >= target_amount, 0, -1)
+    reached = np.empty(n_simulations, dtype=bool)
+    cone = np.empty((len(CONE_PERCENTILES), len(time_points)))
+    cone[:, 0] = np.percentile(values, CONE_PERCENTILES)
     milestones = {}
-    checkpoint_months = [12, 24, 36, 48, 60, months_left]
-    for m in sorted(set(checkpoint_months)):
-        if m <= months_left:
-            prob = float(np.mean(final_values >= target_amount) * 100) if m == months_left else _prob_by_month(portfolio, target_amount, m, n_simulations)
-            milestones[f"month_{m}"] = round(prob, 1)
+
+    rng = np.random.default_rng(seed=42)
+    chunks = _time_major_chunks(
+        rng, return_model, monthly_mean, monthly_vol, n_simulations, months_left, chunk_months, antithetic,
+    )
+    for chunk_start, chunk in zip(range(0, months_left, chunk_months), chunks):
+        chunk += 1.0
+        for offset, growth in enumerate(chunk):
+            month = chunk_start + offset + 1
+            values += monthly_sip
+            values *= growth
+
+            np.greater_equal(values, target_amount, out=reached)
+            hit_month[reached & (hit_month < 0)] = month
+            if month in cone_index:
+                cone[:, cone_index[month]] = np.percentile(values, CONE_PERCENTILES)
+            if month in milestone_months:
+                milestones[f"month_{month}"] = round(float(reached.mean() * 100), 1)
+
+    return _assemble_result(
+        goal=goal,
+        target_amount=target_amount,
+        current_amount=current_amount,
+        monthly_sip=monthly_sip,
+        months_left=months_left,
+        risk_profile=risk_profile,
+        n_simulations=n_simulations,
+        final_values=values,
+        cone_data=_format_cone(time_points, cone),
+        milestones=milestones,
+        hit_months=hit_month[hit_month >= 0],
+        return_model=return_model,
+        success=_success_estimate(values, target_amount, antithetic, expected_final),
+        variance_reduction=_variance_reduction_info(antithetic, "pseudo", expected_final is not None),
+    )
+
+
+def _time_major_chunks(
+    rng: np.random.Generator, return_model: str, mean: float, vol: float,
+    n_sims: int, months: int, chunk_months: int, antithetic: bool = False,
+):
+    """
+    Yield (months, n_sims) return blocks of at most chunk_months rows, in time order.
+    Antithetic columns are paired like _draw_returns' rows (i with i + n_sims // 2).
+    """
+    regime_state = None
+    for chunk_start in range(0, months, chunk_months):
+        size = min(chunk_months, months - chunk_start)
+        if return_model == "regime":
+            # Regimes persist across chunks, so carry the chain's state forward
+            block, regime_state = _regime_returns(rng, mean, vol, (n_sims, size), regime_state)
+            yield np.ascontiguousarray(block.T)
+        elif antithetic:
+            block = RETURN_MODELS[return_model](rng, mean, vol, (size, n_sims // 2))
+            yield np.concatenate([block, 2 * mean - block], axis=1)
+        else:
+            # i.i.d. models: drawing time-major directly keeps each month contiguous
+            yield _draw_returns(rng, return_model, mean, vol, size, n_sims)
+
+
+def run_monte_carlo_batch(
+    goals: List[Dict[str, Any]],
+    risk_profile: str = "Moderate",
+    n_simulations: int = N_SIMULATIONS,
+    return_model: str = "normal",
+    antithetic: bool = False,
+    sampler: str = "pseudo",
+    control_variate: bool = False,
+    adaptive: bool = False,
+    prob_tolerance: float = ADAPTIVE_PROB_TOLERANCE,
+    median_tolerance: float = ADAPTIVE_MEDIAN_TOLERANCE,
+    max_simulations: int = ADAPTIVE_MAX_SIMULATIONS,
+) -> List[Dict[str, Any]]:
+    """
+    Run Monte Carlo simulations for several goals against one shared market scenario.
+
+    A single return matrix sized to the longest horizon is drawn and turned into
+    growth factors once; each goal is then an affine function of those factors, so
+    adding a goal costs one multiply-add instead of a fresh simulation. Because every
+    goal sees the same paths, results are coherent across goals.
+
+    Args:
+        goals: Goal dicts with target_amount, target_date, name, monthly_sip and current_amount.
+        risk_profile: 'Conservative', 'Moderate', or 'Aggressive'.
+        n_simulations: Number of simulation paths shared by all goals.
+        return_model: Monthly return generator, one of RETURN_MODELS.
+        antithetic, sampler, control_variate: Variance reduction, as in run_monte_carlo_simulation.
+        adaptive, prob_tolerance, median_tolerance, max_simulations: Adaptive stopping, as in
+            run_monte_carlo_simulation. Batches are added until every goal has converged.
+
+    Returns:
+        One result per goal, in input order, shaped like run_monte_carlo_simulation's.
+    """
+    if not goals:
+        return []
+
+    monthly_mean, monthly_vol = _monthly_params(risk_profile)
+    horizons = [_months_to_target(goal.get("target_date", "")) for goal in goals]
+    _validate_sampling(return_model, antithetic, sampler, control_variate)
+    n_simulations = _effective_simulations(n_simulations, antithetic, sampler)
+    variance_reduction = _variance_reduction_info(antithetic, sampler, control_variate)
+
+    specs = []
+    for goal, months_left in zip(goals, horizons):
+        current_amount = float(goal.get("current_amount", 0))
+        monthly_sip = float(goal.get("monthly_sip", 0))
+        expected_final = (
+            _expected_final_value(current_amount, monthly_sip, monthly_mean, months_left) if control_variate else None
+        )
+        specs.append((months_left, current_amount, monthly_sip, float(goal.get("target_amount", 0)), expected_final))
+
+    rng = np.random.default_rng(seed=42)
+    stopping = None
+    if adaptive:
+        if sampler != "pseudo":
+            raise ValueError("Adaptive stopping draws paths in batches and only supports the pseudo sampler.")
+        growth, discounted, stopping = _draw_until_converged(
+            rng, specs, return_model, monthly_mean, monthly_vol, max(horizons), antithetic,
+            n_simulations, max(n_simulations, max_simulations), prob_tolerance, median_tolerance,
+        )
+    else:
+        monthly_returns = _draw_returns(
+            rng, return_model, monthly_mean, monthly_vol, n_simulations, max(horizons), antithetic, sampler,
+        )
+        growth, discounted = _growth_factors(monthly_returns)
+
+    results = []
+    for goal, (months_left, current_amount, monthly_sip, target_amount, expected_final) in zip(goals, specs):
+        portfolio = _paths_from_factors(growth, discounted, months_left, current_amount, monthly_sip)
+        result = _summarize_paths(
+            goal, portfolio, target_amount, current_amount, monthly_sip, risk_profile, return_model,
+            success=_success_estimate(portfolio[:, -1], target_amount, antithetic, expected_final),
+            variance_reduction=variance_reduction,
+        )
+        if stopping is not None:
+            result["stopping"] = stopping
+        results.append(result)
+    return results
+
+
+def _final_values(growth: np.ndarray, discounted: np.ndarray, months: int, current_amount: float, monthly_sip: float) -> np.ndarray:
+    """Final portfolio values only (column `months` of _paths_from_factors), without building the paths."""
+    return growth[:, months] * (current_amount + monthly_sip * discounted[:, months - 1])
+
+
+def _median_std_error(final_values: np.ndarray) -> float:
+    """
+    Std error of the sample median relative to its value, from the distribution-free
+    95% order-statistic interval: ranks n/2 -/+ 1.96 * sqrt(n) / 2.
+    """
+    n = len(final_values)
+    half_width = 1.96 * np.sqrt(n) / 2
+    lo, hi = max(0, int(np.floor(n / 2 - half_width))), min(n - 1, int(np.ceil(n / 2 + half_width)))
+    ordered = np.partition(final_values, [lo, n // 2, hi])
+    median = abs(ordered[n // 2])
+    if median == 0:
+        return 0.0
+    return float((ordered[hi] - ordered[lo]) / (2 * 1.96) / median)
+
+
+def _stack_batches(batches: List[np.ndarray], antithetic: bool) -> np.ndarray:
+    """
+    Concatenate per-batch rows. Antithetic batches are re-ordered so that all first
+    halves precede all mirrored halves, keeping row i paired with row i + n // 2.
+    """
+    if not antithetic:
+        return np.concatenate(batches)
+    return np.concatenate([b[:len(b) // 2] for b in batches] + [b[len(b) // 2:] for b in batches])
+
+
+def _draw_until_converged(
+    rng: np.random.Generator,
+    specs: List[Tuple[int, float, float, float, Optional[float]]],
+    return_model: str,
+    mean: float,
+    vol: float,
+    months: int,
+    antithetic: bool,
+    min_simulations: int,
+    max_simulations: int,
+    prob_tolerance: float,
+    median_tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Draw growth factors in batches until every goal in specs
+    (months, current_amount, monthly_sip, target_amount, expected_final) has its
+    success probability and median final value within tolerance.
+
+    Returns:
+        (growth, discounted, stopping) where stopping records the paths used,
+        whether all goals converged and the worst standard errors seen.
+    """
+    growth_batches, discounted_batches = [], []
+    final_batches: List[List[np.ndarray]] = [[] for _ in specs]
+    n_drawn = 0
+    while True:
+        size = min_simulations if n_drawn == 0 else ADAPTIVE_BATCH_SIZE
+        size = min(size, max_simulations - n_drawn)
+        size += size % 2 if antithetic else 0
+        growth, discounted = _growth_factors(_draw_returns(rng, return_model, mean, vol, size, months, antithetic))
+        growth_batches.append(growth)
+        discounted_batches.append(discounted)
+        n_drawn += size
+
+        prob_errors, median_errors = [], []
+        for batches, (months_left, current_amount, monthly_sip, target_amount, expected_final) in zip(final_batches, specs):
+            batches.append(_final_values(growth, discounted, months_left, current_amount, monthly_sip))
+            final_values = _stack_batches(batches, antithetic)
+            prob_errors.append(_success_estimate(final_values, target_amount, antithetic, expected_final)[1])
+            median_errors.append(_median_std_error(final_values))
+
+        converged = max(prob_errors) <= prob_tolerance and max(median_errors) <= median_tolerance
+        if converged or n_drawn >= max_simulations:
+            break
+
+    stopping = {
+        "adaptive": True,
+        "converged": converged,
+        "n_simulations": n_drawn,
+        "prob_tolerance": prob_tolerance,
+        "median_tolerance": median_tolerance,
+        "max_probability_std_error": round(max(prob_errors), 3),
+        "max_median_std_error": round(max(median_errors), 4),
+    }
+    return _stack_batches(growth_batches, antithetic), _stack_batches(discounted_batches, antithetic), stopping
+
+
+def solve_required_sip(
+    goal: Dict[str, Any],
+    current_amount: float,
+    risk_profile: str = "Moderate",
+    confidence_levels: Optional[List[float]] = None,
+    n_simulations: int = SIP_SOLVER_SIMULATIONS,
+    return_model: str = "normal",
+) -> Dict[str, Any]:
+    """
+    Minimum monthly SIP that reaches the goal with each requested success probability.
+
+    All SIP values are evaluated on one shared set of simulated paths (common random
+    numbers). On a path the final value  G_T * (current + sip * D_T)  is linear in sip,
+    so the SIP that path needs is exactly  (target / G_T - current) / D_T.  The success
+    probability of a SIP is the share of paths needing no more than it, so the SIP for
+    p% success is the p-th percentile of the per-path requirements - no search needed.
+
+    Args:
+        goal: Dict with target_amount, target_date, name.
+        current_amount: Amount already saved (incl. linked investments).
+        risk_profile: 'Conservative', 'Moderate', or 'Aggressive'.
+        confidence_levels: Success probabilities in percent (default SIP_CONFIDENCE_LEVELS).
+        n_simulations: Number of shared simulation paths.
+        return_model: Monthly return generator, one of RETURN_MODELS.
+
+    Returns:
+        Goal details plus one {confidence, monthly_sip, achieved_probability} entry per level.
+    """
+    levels = confidence_levels or SIP_CONFIDENCE_LEVELS
+    if any(not 0 < level < 100 for level in levels):
+        raise ValueError("Confidence levels must be between 0 and 100 (exclusive).")
+    _validate_return_model(return_model)
+
+    monthly_mean, monthly_vol = _monthly_params(risk_profile)
+    target_amount = float(goal.get("target_amount", 0))
+    months_left = _months_to_target(goal.get("target_date", ""))
+
+    rng = np.random.default_rng(seed=42)
+    growth, discounted = _growth_factors(
+        _draw_returns(rng, return_model, monthly_mean, monthly_vol, n_simulations, months_left)
+    )
+    required = (target_amount / growth[:, months_left] - current_amount) / discounted[:, months_left - 1]
+
+    # inverted_cdf: the smallest per-path requirement that covers at least p% of paths
+    sips = np.maximum(np.percentile(required, levels, method="inverted_cdf"), 0.0)
+    return {
+        "goal_name": goal.get("name", "Goal"),
+        "target_amount": target_amount,
+        "current_amount": current_amount,
+        "months_to_target": months_left,
+        "risk_profile": risk_profile,
+        "return_model": return_model,
+        "n_simulations": n_simulations,
+        "required_sip": [
+            {
+                "confidence": level,
+                "monthly_sip": round(float(sip), 2),
+                "achieved_probability": round(float(np.mean(required <= sip) * 100), 1),
+            }
+            for level, sip in zip(levels, sips)
+        ],
+    }
+
+
+def _summarize_paths(
+    goal: Dict[str, Any],
+    portfolio: np.ndarray,
+    target_amount: float,
+    current_amount: float,
+    monthly_sip: float,
+    risk_profile: str,
+    return_model: str = "normal",
+    success: Optional[Tuple[float, float]] = None,
+    variance_reduction: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Cone, first-hit months and milestones from a full (n_simulations, months + 1) path matrix."""
+    n_simulations, months_left = portfolio.shape[0], portfolio.shape[1] - 1
+
+    # --- Percentile Cone (for chart visualization) ---
+    time_points = _cone_time_points(months_left)
+    cone = np.percentile(portfolio[:, time_points], CONE_PERCENTILES, axis=0)
+
+    # --- First month each sim crosses the target ---
+    reached = portfolio >= target_amount
+    hit_any = reached.any(axis=1)
+    hit_months = reached.argmax(axis=1)[hit_any]
+
+    milestones = {
+        f"month_{m}": round(float(reached[:, m].mean() * 100), 1)
+        for m in _milestone_months(months_left)
+    }
+
+    return _assemble_result(
+        goal=goal,
+        target_amount=target_amount,
+        current_amount=current_amount,
+        monthly_sip=monthly_sip,
+        months_left=months_left,
+        risk_profile=risk_profile,
+        n_simulations=n_simulations,
+        final_values=portfolio[:, -1],
+        cone_data=_format_cone(time_points, cone),
+        milestones=milestones,
+        hit_months=hit_months,
+        return_model=return_model,
+        success=success,
+        variance_reduction=variance_reduction,
+    )
+
+
+def _assemble_result(
+    goal: Dict[str, Any],
+    target_amount: float,
+    current_amount: float,
+    monthly_sip: float,
+    months_left: int,
+    risk_profile: str,
+    n_simulations: int,
+    final_values: np.ndarray,
+    cone_data: List[Dict[str, Any]],
+    milestones: Dict[str, float],
+    hit_months: np.ndarray,
+    return_model: str = "normal",
+    success: Optional[Tuple[float, float]] = None,
+    variance_reduction: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    prob_success, prob_std_error = success if success is not None else _success_estimate(final_values, target_amount)
+    p10, p50, p90 = np.percentile(final_values, [10, 50, 90])
 
     return {
         "goal_name": goal.get("name", "Goal"),
@@ -121,24 +935,21 @@ def run_monte_carlo_simulation(
         "monthly_sip": round(monthly_sip, 2),
         "months_to_target": months_left,
         "risk_profile": risk_profile,
+        "return_model": return_model,
         "n_simulations": n_simulations,
         "probability_of_success": round(prob_success, 1),
-        "median_final_value": round(float(np.percentile(final_values, 50)), 2),
-        "optimistic_final_value": round(float(np.percentile(final_values, 90)), 2),
-        "pessimistic_final_value": round(float(np.percentile(final_values, 10)), 2),
+        "probability_std_error": round(prob_std_error, 2),
+        "variance_reduction": variance_reduction or _variance_reduction_info(False, "pseudo", False),
+        "median_final_value": round(float(p50), 2),
+        "optimistic_final_value": round(float(p90), 2),
+        "pessimistic_final_value": round(float(p10), 2),
         "cone_data": cone_data,
         "milestones": milestones,
         "early_hit_prob": round(float(np.mean(hit_months < months_left * 0.75) * 100), 1) if len(hit_months) > 0 else 0.0,
-        "summary": _build_summary(prob_success, target_amount, months_left, risk_profile, float(np.percentile(final_values, 90))),
+        "summary": _build_summary(prob_success, target_amount, months_left, risk_profile, float(p90)),
     }
 
 
-def _prob_by_month(portfolio: np.ndarray, target: float, month: int, n_sims: int) -> float:
-    if month >= portfolio.shape[1]:
-        return 0.0
-    return float(np.mean(portfolio[:, month] >= target) * 100)
-
-
 def _build_summary(prob: float, target: float, months: float, risk: str, optimistic: float) -> str:
     years = round(months / 12, 1)
     if prob >= 80:
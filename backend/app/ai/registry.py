@@ -0,0 +1,160 @@
+"""
+LLM & Tool Registry
+===================
+One place that builds the clients the AI modules share: the Gemini chat model
+(LangChain), the google.generativeai models used by the report generator, the
+Exa web search tool and the HTTP session used for local Ollama calls.
+
+Everything is built lazily on first use and then reused for the life of the
+process, so requests share the clients' keep-alive connections instead of
+opening new ones (previously ai/market.py built a new Gemini client and Exa
+tool on every /market/indices call).
+
+LLM_BACKEND=fake swaps every model for FakeChatModel, a local model that
+replies with canned text and never touches the network, for tests and
+benchmarks. use_fake_llm() does the same at runtime.
+"""
+import itertools
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+from .exa_search import get_exa_search_tool
+
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_CHAT_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-2.5-flash")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake
+
+# Keep-alive pool for Ollama (report generator); one connection per concurrent request
+HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "10"))
+
+FAKE_REPLY = "This is a placeholder reply from the local fake model."
+
+
+class FakeChatModel(GenericFakeChatModel):
+    """
+    Offline stand-in for ChatGoogleGenerativeAI. Replies cycle through the
+    given texts; bind_tools returns the model unchanged so it can drive a
+    LangGraph ReAct agent (it never requests a tool call).
+    """
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def make_fake_llm(replies: Iterable[str] = (FAKE_REPLY,)) -> FakeChatModel:
+    return FakeChatModel(messages=itertools.cycle(list(replies)))
+
+
+_lock = threading.RLock()  # get_agent builds agents that call get_tools
+_chat_models: Dict[Optional[float], object] = {}
+_genai_models: Dict[str, object] = {}
+_tools: Optional[List] = None
+_agents: Dict[str, Tuple[Any, Any]] = {}  # name -> (llm, compiled agent)
+_http_session = None
+_fake_llm: Optional[FakeChatModel] = make_fake_llm() if LLM_BACKEND == "fake" else None
+
+
+def use_fake_llm(replies: Iterable[str] = (FAKE_REPLY,)) -> FakeChatModel:
+    """Serve FakeChatModel from get_chat_model from now on (tests and benchmarks)."""
+    global _fake_llm
+    with _lock:
+        _fake_llm = make_fake_llm(replies)
+        return _fake_llm
+
+
+def is_fake_llm() -> bool:
+    return _fake_llm is not None
+
+
+def reset() -> None:
+    """Drop every cached client and the fake override; the next call rebuilds them."""
+    global _tools, _http_session, _fake_llm
+    with _lock:
+        _chat_models.clear()
+        _genai_models.clear()
+        _agents.clear()
+        _tools = None
+        if _http_session is not None:
+            _http_session.close()
+        _http_session = None
+        _fake_llm = make_fake_llm() if LLM_BACKEND == "fake" else None
+
+
+def get_chat_model(temperature: Optional[float] = None):
+    """
+    The shared LangChain chat model (Gemini), or None when GEMINI_API_KEY is not
+    set. One instance per temperature (None = the model's default).
+    """
+    if _fake_llm is not None:
+        return _fake_llm
+    if not GEMINI_API_KEY:
+        return None
+    with _lock:
+        if temperature not in _chat_models:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            kwargs = {} if temperature is None else {"temperature": temperature}
+            _chat_models[temperature] = ChatGoogleGenerativeAI(
+                model=GEMINI_CHAT_MODEL,
+                google_api_key=GEMINI_API_KEY,
+                **kwargs,
+            )
+        return _chat_models[temperature]
+
+
+def get_genai_model(model_name: str):
+    """A google.generativeai GenerativeModel, configured once and reused."""
+    with _lock:
+        if model_name not in _genai_models:
+            import google.generativeai as genai
+
+            if not _genai_models:
+                genai.configure(api_key=GEMINI_API_KEY)
+            _genai_models[model_name] = genai.GenerativeModel(model_name)
+        return _genai_models[model_name]
+
+
+def get_tools() -> list:
+    """Tools shared by every agent (currently cached Exa web search, when EXA_API_KEY is set or a fixture is replayed)."""
+    global _tools
+    with _lock:
+        if _tools is None:
+            exa_tool = get_exa_search_tool()
+            _tools = [exa_tool] if exa_tool else []
+        return _tools
+
+
+def get_agent(name: str, llm, build: Callable[[Any], Any]):
+    """
+    The compiled agent graph `name` for llm: build(llm) runs once and the graph
+    is reused by every request (it is rebuilt only if the model is swapped,
+    e.g. by use_fake_llm). Per-request inputs such as the system prompt go in
+    the agent's input state, not into the graph.
+    """
+    with _lock:
+        cached = _agents.get(name)
+        if cached is None or cached[0] is not llm:
+            cached = _agents[name] = (llm, build(llm))
+        return cached[1]
+
+
+def get_http_session():
+    """A requests.Session with a keep-alive connection pool, for calls to local Ollama."""
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_session = session
+        return _http_session
@@ -1,6 +1,5 @@
 import os
-import requests
-import google.generativeai as genai
+from . import registry
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 OLLAMA_URLS = ["http://127.0.0.1:11434/api/generate", "http://localhost:11434/api/generate"]
@@ -78,10 +77,15 @@ Keep it within 600 words. Use plain text, not markdown.
 async def generate_comprehensive_financial_report(user_context: dict, report_type: str = "Overview") -> str:
     prompt = _build_prompt(user_context, report_type)
 
-    # 1. Try Ollama (local Llama2)
+    # Offline fake model (LLM_BACKEND=fake): no Ollama or Gemini calls
+    if registry.is_fake_llm():
+        return (await registry.get_chat_model().ainvoke(prompt)).content
+
+    # 1. Try Ollama (local Llama2), over the shared keep-alive session
+    session = registry.get_http_session()
     for url in OLLAMA_URLS:
         try:
-            response = requests.post(
+            response = session.post(
                 url,
                 json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False},
                 timeout=45,
@@ -101,8 +105,7 @@ async def generate_comprehensive_financial_report(user_context: dict, report_typ
 
     for model_name in ["gemini-2.5-flash", "gemini-2.5-pro"]:
         try:
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel(model_name)
+            model = registry.get_genai_model(model_name)
             response = model.generate_content(prompt)
             text = response.text.strip()
             if text:
@@ -0,0 +1,16 @@
+"""
+Token Estimation
+================
+Cheap prompt-size estimates for budgeting what is sent to the LLM (chat
+history compaction, system prompt rendering). Gemini does not expose a local
+tokenizer, so text is counted at CHARS_PER_TOKEN characters per token, which
+is close for English prose and slightly pessimistic for numbers and ₹ amounts.
+"""
+import math
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
@@ -4,9 +4,10 @@ from typing import List
 from datetime import datetime
 import math
 from ..db.session import get_db
-from ..models.user import User, Goal, Profile, Investment
+from ..models.user import Goal, Profile, Investment
 from ..schemas.user import GoalCreate, GoalUpdate, GoalResponse
-from .auth import get_current_user
+from .auth import get_current_user, AuthenticatedUser
+from ..services.user_context import invalidate_user_snapshot
 
 router = APIRouter()
 
@@ -15,18 +16,19 @@ router = APIRouter()
 @router.post("/goals", response_model=GoalResponse)
 def create_goal(
     goal_in: GoalCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     new_goal = Goal(**goal_in.dict(), user_id=current_user.id)
     db.add(new_goal)
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     db.refresh(new_goal)
     return new_goal
 
 @router.get("/goals", response_model=List[GoalResponse])
 def get_goals(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return db.query(Goal).filter(Goal.user_id == current_user.id).all()
@@ -35,7 +37,7 @@ def get_goals(
 def update_goal(
     goal_id: int,
     goal_in: GoalUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
@@ -47,13 +49,14 @@ def update_goal(
         setattr(goal, field, value)
     
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     db.refresh(goal)
     return goal
 
 @router.delete("/goals/{goal_id}")
 def delete_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
@@ -61,13 +64,14 @@ def delete_goal(
         raise HTTPException(status_code=404, detail="Goal not found")
     db.delete(goal)
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     return {"message": "Goal deleted"}
 
 # --- SIP Advisory Logic ---
 
 @router.get("/recommendations")
 def get_recommendations(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
@@ -1,25 +1,38 @@
 """
 Analytics API: Expense Anomaly Detection + Monte Carlo Goal Simulations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ..db.session import get_db
-from ..models.user import User, Investment, Goal, Profile
-from .auth import get_current_user
-from ..ai.anomaly_detector import detect_anomalies
-from ..ai.monte_carlo import run_monte_carlo_simulation
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from ..db.session import get_db, get_async_db
+from ..models.user import Investment
+from ..models.simulation_job import SimulationJob
+from .auth import get_current_user, AuthenticatedUser
+from ..services.simulation_cache import (
+    cached_monte_carlo_simulation, cached_monte_carlo_batch, cached_required_sip, simulation_cache,
+)
+from ..services.simulation_pool import simulation_pool, SimulationPoolSaturated
+from ..services.simulation_jobs import create_job, schedule_job, job_status
+from ..services.user_context import get_user_snapshot, get_user_snapshot_async, GoalSnapshot, InvestmentSnapshot, ProfileSnapshot
+from ..ai.monte_carlo import N_SIMULATIONS, RETURN_MODELS, SAMPLERS, ADAPTIVE_MIN_SIMULATIONS, SIP_CONFIDENCE_LEVELS
+from collections import defaultdict
+from datetime import datetime
 import math
 
 router = APIRouter()
 
+MAX_JOB_SIMULATIONS = 200_000
+
 
 # ===========================================================================
 # ENDPOINT 1: Expense / Investment Anomaly Detection
 # ===========================================================================
 @router.get("/anomalies")
 def get_anomalies(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -41,6 +54,7 @@ def get_anomalies(
         for inv in investments
     ]
 
+    from ..ai.anomaly_detector import detect_anomalies  # scikit-learn; see core/preload.py
     results = detect_anomalies(investment_dicts)
     anomaly_count = sum(1 for r in results if r["is_anomaly"])
 
@@ -60,53 +74,131 @@ def get_anomalies(
 # ===========================================================================
 # ENDPOINT 2: Monte Carlo Goal Simulations
 # ===========================================================================
+ANNUAL_RETURN_BY_RISK = {"Conservative": 0.08, "Moderate": 0.12, "Aggressive": 0.16}
+
+
+def _linked_totals(investments: List[InvestmentSnapshot]) -> dict:
+    """Sum of investment amounts per linked goal_id, computed in one pass."""
+    totals = defaultdict(float)
+    for inv in investments:
+        if inv.goal_id is not None:
+            totals[inv.goal_id] += inv.amount or 0
+    return totals
+
+
+def _estimate_monthly_sip(goal: GoalSnapshot, current_amount: float, months_left: int, risk_profile: str, monthly_surplus: float) -> float:
+    """SIP needed by the standard annuity formula, capped at the user's actual surplus (realistic)."""
+    r = ANNUAL_RETURN_BY_RISK.get(risk_profile, 0.12) / 12
+    future_value_needed = max(0, goal.target_amount - current_amount)
+    if months_left > 0 and r > 0:
+        denom = math.pow(1 + r, months_left) - 1
+        suggested_sip = (future_value_needed * r) / denom if denom > 0 else future_value_needed / months_left
+    else:
+        suggested_sip = future_value_needed / max(1, months_left)
+    return min(suggested_sip, max(0, monthly_surplus))
+
+
+def _months_left(target_date_str: str) -> int:
+    target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
+    now = datetime.now()
+    return max(1, (target_date.year - now.year) * 12 + (target_date.month - now.month))
+
+
+def _pool_busy(e: SimulationPoolSaturated) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+
+def _check_return_model(return_model: str) -> None:
+    if return_model not in RETURN_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown return model '{return_model}'. Choose one of: {', '.join(RETURN_MODELS)}.",
+        )
+
+
+RETURN_MODEL_QUERY = Query("normal", description="Monthly return model: normal, student_t, bootstrap or regime")
+
+
+class SamplingParams(BaseModel):
+    """Variance reduction options shared by the Monte Carlo endpoints."""
+    antithetic: bool = False
+    sampler: str = "pseudo"
+    control_variate: bool = False
+
+
+def _sampling_params(
+    antithetic: bool = Query(False, description="Mirror half of the paths about the mean"),
+    sampler: str = Query("pseudo", description="pseudo or sobol (quasi-random normals)"),
+    control_variate: bool = Query(False, description="Use the SIP future value as a control variate"),
+) -> SamplingParams:
+    if sampler not in SAMPLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown sampler '{sampler}'. Choose one of: {', '.join(SAMPLERS)}.")
+    return SamplingParams(antithetic=antithetic, sampler=sampler, control_variate=control_variate)
+
+
+def _prepare_goal_inputs(goals: List[GoalSnapshot], investments: List[InvestmentSnapshot], profile: Optional[ProfileSnapshot]):
+    """
+    Simulation inputs (target, date, current amount incl. linked investments, estimated SIP)
+    for each goal. Goals with an unparseable target date are skipped.
+    Returns (goal_inputs, risk_profile).
+    """
+    risk_profile = profile.risk_profile if profile else "Moderate"
+    monthly_income = profile.monthly_income if profile else 0
+    monthly_expenses = profile.monthly_expenses if profile else 0
+    monthly_surplus = monthly_income - monthly_expenses
+
+    linked_totals = _linked_totals(investments)
+    goal_inputs = []
+    for goal in goals:
+        try:
+            current_amount = (goal.current_amount or 0) + linked_totals[goal.id]
+            months_left = _months_left(goal.target_date)
+            goal_inputs.append({
+                "name": goal.name,
+                "target_amount": goal.target_amount,
+                "target_date": goal.target_date,
+                "current_amount": current_amount,
+                "monthly_sip": _estimate_monthly_sip(goal, current_amount, months_left, risk_profile, monthly_surplus),
+            })
+        except Exception as e:
+            print(f"[MonteCarlo] Skipped goal {goal.name}: {e}")
+    return goal_inputs, risk_profile
+
+
 @router.get("/monte-carlo/{goal_id}")
-def get_monte_carlo(
+async def get_monte_carlo(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    return_model: str = RETURN_MODEL_QUERY,
+    sampling: SamplingParams = Depends(_sampling_params),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Runs 1,000 Monte Carlo simulations for a specific goal.
     Returns probability cones and success likelihood.
+    Results are cached until the goal, investments or profile change.
     """
-    goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
+    _check_return_model(return_model)
+    snapshot = await get_user_snapshot_async(db, current_user.id)
+    goal = snapshot.goal(goal_id)
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-    investments = db.query(Investment).filter(Investment.user_id == current_user.id).all()
-
+    profile = snapshot.profile
     risk_profile = profile.risk_profile if profile else "Moderate"
     monthly_income = profile.monthly_income if profile else 0
     monthly_expenses = profile.monthly_expenses if profile else 0
     monthly_surplus = monthly_income - monthly_expenses
 
     # Estimate linked investment amount
-    linked_total = sum(inv.amount for inv in investments if inv.goal_id == goal.id)
-    current_amount = (goal.current_amount or 0) + linked_total
+    current_amount = (goal.current_amount or 0) + _linked_totals(snapshot.investments)[goal.id]
 
-    # Estimate SIP needed using standard formula
     try:
-        target_date_str = goal.target_date
-        from datetime import datetime
-        target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
-        now = datetime.now()
-        months_left = max(1, (target_date.year - now.year) * 12 + (target_date.month - now.month))
+        months_left = _months_left(goal.target_date)
     except Exception:
         months_left = 60
 
-    annual_return = {"Conservative": 0.08, "Moderate": 0.12, "Aggressive": 0.16}.get(risk_profile, 0.12)
-    r = annual_return / 12
-    future_value_needed = max(0, goal.target_amount - current_amount)
-    if months_left > 0 and r > 0:
-        denom = math.pow(1 + r, months_left) - 1
-        suggested_sip = (future_value_needed * r) / denom if denom > 0 else future_value_needed / months_left
-    else:
-        suggested_sip = future_value_needed / max(1, months_left)
-
-    # Use the smaller of suggested SIP and actual surplus (realistic)
-    monthly_sip = min(suggested_sip, max(0, monthly_surplus))
+    monthly_sip = _estimate_monthly_sip(goal, current_amount, months_left, risk_profile, monthly_surplus)
 
     goal_dict = {
         "name": goal.name,
@@ -114,59 +206,231 @@ def get_monte_carlo(
         "target_date": goal.target_date,
     }
 
-    result = run_monte_carlo_simulation(
-        goal=goal_dict,
-        monthly_sip=monthly_sip,
-        current_amount=current_amount,
-        risk_profile=risk_profile,
-    )
+    try:
+        result = await cached_monte_carlo_simulation(
+            user_id=current_user.id,
+            goal=goal_dict,
+            monthly_sip=monthly_sip,
+            current_amount=current_amount,
+            risk_profile=risk_profile,
+            return_model=return_model,
+            **sampling.dict(),
+        )
+    except SimulationPoolSaturated as e:
+        raise _pool_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return result
 
 
 @router.get("/monte-carlo-all")
-def get_all_monte_carlo(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_all_monte_carlo(
+    return_model: str = RETURN_MODEL_QUERY,
+    sampling: SamplingParams = Depends(_sampling_params),
+    adaptive: Optional[bool] = Query(
+        None, description="Stop adding paths once the estimates are within tolerance (default: on for the pseudo sampler)",
+    ),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Runs Monte Carlo simulations for all user goals (lightweight version).
+    Runs Monte Carlo simulations for all user goals in one batched pass.
+    Every goal is evaluated against the same simulated market paths.
+    With adaptive=true (the default for the pseudo sampler) paths are added only
+    until every goal's success probability and median are within tolerance, so
+    easy goal sets finish early. Sobol draws all paths at once, so it defaults to
+    a fixed N_SIMULATIONS run.
     """
-    goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-    investments = db.query(Investment).filter(Investment.user_id == current_user.id).all()
+    _check_return_model(return_model)
+    if adaptive is None:
+        adaptive = sampling.sampler == "pseudo"
+    snapshot = await get_user_snapshot_async(db, current_user.id)
 
-    if not goals:
+    if not snapshot.goals:
         return {"simulations": [], "message": "No goals found."}
 
+    batch, risk_profile = _prepare_goal_inputs(snapshot.goals, snapshot.investments, snapshot.profile)
+
+    try:
+        simulations = await cached_monte_carlo_batch(
+            current_user.id, batch, risk_profile=risk_profile, return_model=return_model,
+            n_simulations=ADAPTIVE_MIN_SIMULATIONS if adaptive else N_SIMULATIONS,
+            adaptive=adaptive, **sampling.dict(),
+        )
+    except SimulationPoolSaturated as e:
+        raise _pool_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"simulations": simulations}
+
+
+@router.get("/required-sip/{goal_id}")
+async def get_required_sip(
+    goal_id: int,
+    confidence: Optional[List[float]] = Query(None, description="Target success probabilities in percent (default 50, 75, 90)"),
+    return_model: str = RETURN_MODEL_QUERY,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Minimum monthly SIP needed to reach a goal with each target success probability,
+    next to the deterministic annuity SIP and the user's monthly surplus.
+    """
+    _check_return_model(return_model)
+    snapshot = await get_user_snapshot_async(db, current_user.id)
+    goal = snapshot.goal(goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    profile = snapshot.profile
     risk_profile = profile.risk_profile if profile else "Moderate"
-    monthly_income = profile.monthly_income if profile else 0
-    monthly_expenses = profile.monthly_expenses if profile else 0
-    monthly_surplus = monthly_income - monthly_expenses
+    monthly_surplus = (profile.monthly_income - profile.monthly_expenses) if profile else 0
+    current_amount = (goal.current_amount or 0) + _linked_totals(snapshot.investments)[goal.id]
 
-    results = []
-    for goal in goals:
-        try:
-            linked_total = sum(inv.amount for inv in investments if inv.goal_id == goal.id)
-            current_amount = (goal.current_amount or 0) + linked_total
-            annual_return = {"Conservative": 0.08, "Moderate": 0.12, "Aggressive": 0.16}.get(risk_profile, 0.12)
-            r = annual_return / 12
-            from datetime import datetime
-            target_date = datetime.strptime(goal.target_date, "%Y-%m-%d")
-            months_left = max(1, (target_date.year - datetime.now().year) * 12 + (target_date.month - datetime.now().month))
-            future_needed = max(0, goal.target_amount - current_amount)
-            denom = math.pow(1 + r, months_left) - 1
-            sip = (future_needed * r / denom) if denom > 0 else future_needed / months_left
-            monthly_sip = min(sip, max(0, monthly_surplus))
-
-            sim = run_monte_carlo_simulation(
-                goal={"name": goal.name, "target_amount": goal.target_amount, "target_date": goal.target_date},
-                monthly_sip=monthly_sip,
-                current_amount=current_amount,
-                risk_profile=risk_profile,
-            )
-            results.append(sim)
-        except Exception as e:
-            print(f"[MonteCarlo] Skipped goal {goal.name}: {e}")
+    try:
+        months_left = _months_left(goal.target_date)
+    except Exception:
+        months_left = 60
+
+    goal_dict = {
+        "name": goal.name,
+        "target_amount": goal.target_amount,
+        "target_date": goal.target_date,
+    }
+
+    try:
+        result = await cached_required_sip(
+            user_id=current_user.id,
+            goal=goal_dict,
+            current_amount=current_amount,
+            risk_profile=risk_profile,
+            confidence_levels=confidence or SIP_CONFIDENCE_LEVELS,
+            return_model=return_model,
+        )
+    except SimulationPoolSaturated as e:
+        raise _pool_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        **result,
+        "required_sip": [
+            {**level, "affordable": level["monthly_sip"] <= max(0, monthly_surplus)}
+            for level in result["required_sip"]
+        ],
+        "deterministic_sip": round(
+            _estimate_monthly_sip(goal, current_amount, months_left, risk_profile, float("inf")), 2
+        ),
+        "monthly_surplus": monthly_surplus,
+    }
+
+
+@router.get("/monte-carlo-cache/stats")
+def get_monte_carlo_cache_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Size and hit/miss counters of the Monte Carlo result cache (process-wide).
+    """
+    return simulation_cache.stats()
+
+
+@router.get("/simulation-pool/stats")
+def get_simulation_pool_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Worker count, queue limit and in-flight/completed/rejected job counters of the simulation pool.
+    """
+    return simulation_pool.stats()
+
+
+# ===========================================================================
+# ENDPOINT 3: Background Simulation Jobs
+# ===========================================================================
+class SimulationJobRequest(BaseModel):
+    goal_id: Optional[int] = None  # None = all goals
+    n_simulations: int = Field(default=N_SIMULATIONS, ge=100, le=MAX_JOB_SIMULATIONS)
+    return_model: str = "normal"
 
-    return {"simulations": results}
+
+def _get_user_job(db: Session, job_id: str, user_id: int) -> SimulationJob:
+    job = db.query(SimulationJob).filter(SimulationJob.id == job_id, SimulationJob.user_id == user_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+async def submit_simulation_job(
+    request: SimulationJobRequest,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Submit a Monte Carlo job for one goal (goal_id) or all goals.
+    Returns a job id immediately; poll GET /analytics/jobs/{job_id}.
+    """
+    _check_return_model(request.return_model)
+    # Sync Session work runs on the threadpool so the event loop never waits on the database
+    snapshot = await run_in_threadpool(get_user_snapshot, db, current_user.id)
+    goals = snapshot.goals
+    if request.goal_id is not None:
+        goals = [g for g in goals if g.id == request.goal_id]
+    if not goals:
+        raise HTTPException(status_code=404, detail="Goal not found" if request.goal_id is not None else "No goals found.")
+
+    goal_inputs, risk_profile = _prepare_goal_inputs(goals, snapshot.investments, snapshot.profile)
+    if not goal_inputs:
+        raise HTTPException(status_code=400, detail="No goal has a valid target date (YYYY-MM-DD).")
+
+    job = await run_in_threadpool(
+        create_job, db, current_user.id, goal_inputs, risk_profile, request.n_simulations,
+        goal_id=request.goal_id, return_model=request.return_model,
+    )
+    schedule_job(job.id)
+    return job_status(job)
+
+
+@router.get("/jobs")
+def list_simulation_jobs(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Status of the user's simulation jobs, most recent first.
+    """
+    jobs = (
+        db.query(SimulationJob)
+        .filter(SimulationJob.user_id == current_user.id)
+        .order_by(SimulationJob.created_at.desc())
+        .all()
+    )
+    return {"jobs": [job_status(job) for job in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+def get_simulation_job(
+    job_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Status and progress (simulated paths / total paths, updated per batch) of a simulation job.
+    """
+    return job_status(_get_user_job(db, job_id, current_user.id))
+
+
+@router.get("/jobs/{job_id}/result")
+def get_simulation_job_result(
+    job_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Results of a simulation job. While the job is still running this returns the
+    goals finished so far with "partial": true, so cones can be rendered early.
+    """
+    job = _get_user_job(db, job_id, current_user.id)
+    return {
+        **job_status(job),
+        "partial": job.status != "completed",
+        "simulations": job.results or [],
+    }
@@ -2,31 +2,70 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
+from dataclasses import dataclass
+from typing import Optional
+import os
 from ..db.session import get_db
 from ..models.user import User, Profile
 from ..schemas.user import UserCreate, UserResponse, Token, ProfileUpdate, ProfileResponse
+from ..services.user_context import invalidate_user_snapshot
+from ..core.cache import LRUCache
 from ..core.security import verify_password, get_password_hash, create_access_token, SECRET_KEY, ALGORITHM
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Verified token -> identity, so authenticated requests skip the users table
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "2048"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+identity_cache = LRUCache(max_size=AUTH_CACHE_SIZE, ttl_seconds=AUTH_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """The identity routers get from get_current_user (not a database row)."""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+
+
+def invalidate_user_identity(user_id: int) -> int:
+    """Drop cached identities for a user, e.g. after their account or profile changes."""
+    return identity_cache.invalidate(lambda key: key[0] == user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> AuthenticatedUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
+        # Always verified: signature and expiry are checked even on a cache hit
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("user_id")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+
+    if user_id is not None:
+        identity = identity_cache.get((user_id, token))
+        if identity is not None:
+            return identity
+        user = db.get(User, user_id)
+    else:
+        # Tokens issued before user_id was added to the claims
+        user = db.query(User).filter(User.email == email).first()
+    if user is None or user.email != email:
         raise credentials_exception
-    return user
+
+    identity = AuthenticatedUser(id=user.id, email=user.email, full_name=user.full_name)
+    if user_id is not None:
+        identity_cache.set((user_id, token), identity)
+    return identity
 
 @router.post("/register", response_model=UserResponse)
 def register(user_in: UserCreate, db: Session = Depends(get_db)):
@@ -60,27 +99,29 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "user_id": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: AuthenticatedUser = Depends(get_current_user)):
     return current_user
 
 @router.get("/profile", response_model=ProfileResponse)
-def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_profile(current_user: AuthenticatedUser = Depends(get_current_user), db: Session = Depends(get_db)):
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
     return profile
 
 @router.put("/profile", response_model=ProfileResponse)
 def update_profile(
     profile_in: ProfileUpdate, 
-    current_user: User = Depends(get_current_user), 
+    current_user: AuthenticatedUser = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
     for field, value in profile_in.dict(exclude_unset=True).items():
         setattr(profile, field, value)
     db.commit()
+    invalidate_user_snapshot(current_user.id)
+    invalidate_user_identity(current_user.id)
     db.refresh(profile)
     return profile
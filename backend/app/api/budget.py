@@ -6,13 +6,13 @@ All endpoints require authentication via JWT token.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..db.session import get_db
-from ..models.user import User, Profile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.session import get_async_db
+from ..models.user import Profile
 from ..models.budget import Budget
 from ..schemas.budget import BudgetRequest, BudgetResponse, BudgetHistoryResponse
-from ..ai.budget_generator import generate_budget
-from .auth import get_current_user
+from .auth import get_current_user, AuthenticatedUser
 
 router = APIRouter()
 
@@ -20,8 +20,8 @@ router = APIRouter()
 @router.post("/generate", response_model=BudgetResponse)
 async def generate_user_budget(
     budget_input: BudgetRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate a personalized budget using AI.
@@ -31,7 +31,7 @@ async def generate_user_budget(
     The generated budget is saved to the database for history tracking.
     """
     # Fetch the user's profile to get default values
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    profile = await db.scalar(select(Profile).where(Profile.user_id == current_user.id))
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,7 +52,8 @@ async def generate_user_budget(
             detail="Monthly income must be a positive number. Please update your profile."
         )
 
-    # Call the AI budget generator
+    # Call the AI budget generator (google.generativeai is imported on first use, see core/preload.py)
+    from ..ai.budget_generator import generate_budget
     budget_data = await generate_budget(
         income=income,
         expenses=expenses,
@@ -76,26 +77,26 @@ async def generate_user_budget(
         explanation=budget_data["explanation"],
     )
     db.add(new_budget)
-    db.commit()
-    db.refresh(new_budget)
+    await db.commit()
+    await db.refresh(new_budget)
 
     return new_budget
 
 
 @router.get("/latest", response_model=BudgetResponse)
 async def get_latest_budget(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve the most recently generated budget for the current user.
     Returns 404 if no budgets have been generated yet.
     """
-    budget = (
-        db.query(Budget)
-        .filter(Budget.user_id == current_user.id)
+    budget = await db.scalar(
+        select(Budget)
+        .where(Budget.user_id == current_user.id)
         .order_by(Budget.created_at.desc())
-        .first()
+        .limit(1)
     )
     if not budget:
         raise HTTPException(
@@ -107,18 +108,17 @@ async def get_latest_budget(
 
 @router.get("/history", response_model=BudgetHistoryResponse)
 async def get_budget_history(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all generated budgets for the current user,
     ordered by most recent first. Useful for tracking how
     budget recommendations evolve over time.
     """
-    budgets = (
-        db.query(Budget)
-        .filter(Budget.user_id == current_user.id)
+    budgets = (await db.scalars(
+        select(Budget)
+        .where(Budget.user_id == current_user.id)
         .order_by(Budget.created_at.desc())
-        .all()
-    )
+    )).all()
     return BudgetHistoryResponse(budgets=budgets, total=len(budgets))
@@ -4,17 +4,31 @@ Chatbot API Endpoint
 Exposes POST /chatbot/chat for the frontend chatbot UI.
 Fetches the authenticated user's financial data and passes it
 to the AI chatbot module for personalized responses.
+
+POST /chatbot/chat/stream takes the same request and streams the reply as
+Server-Sent Events (tokens and tool progress) while the agent runs.
+
+Conversations are kept server-side (services/chat_memory.py): the client sends
+the new message and the session_id returned by its first turn. Requests that
+carry a `history` list and no session_id are answered statelessly, as before.
+
+Standalone questions (no earlier turns in the conversation) are answered from
+services/response_cache.py when the user has asked them before.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
 
-from ..db.session import get_db
-from ..models.user import User, Profile, Goal, Investment
-from ..api.auth import get_current_user
-from ..ai.chatbot import generate_chat_response
+from ..db.session import get_async_db, AsyncSessionLocal
+from ..api.auth import get_current_user, AuthenticatedUser
+from ..services import chat_memory, response_cache
+from ..services.user_context import get_user_snapshot_async
 
 router = APIRouter()
 
@@ -26,75 +40,206 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
-    history: Optional[List[ChatMessage]] = []
+    session_id: Optional[str] = None  # Omit on the first turn to start a session
+    history: Optional[List[ChatMessage]] = []  # Legacy stateless clients only
 
 
 class ChatResponse(BaseModel):
     reply: str
+    session_id: Optional[str] = None
+
+
+class ChatSessionSummary(BaseModel):
+    session_id: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class ChatTranscriptMessage(ChatMessage):
+    compacted: bool  # Folded into the summary; no longer sent to the model
+    created_at: datetime
+
+
+class ChatSessionDetail(BaseModel):
+    session_id: str
+    summary: str
+    messages: List[ChatTranscriptMessage]
+
+
+async def _conversation(db: AsyncSession, user_id: int, request: ChatRequest):
+    """(session_id, summary, history) for this turn; session_id is None for legacy stateless requests."""
+    if request.session_id:
+        session = await chat_memory.get_session(db, request.session_id, user_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+    elif request.history:
+        return None, "", [{"role": msg.role, "content": msg.content} for msg in request.history]
+    else:
+        session = await chat_memory.create_session(db, user_id)
+    summary, history = await chat_memory.load_history(db, session)
+    return session.id, summary, history
+
+
+def _cached_reply(user_id: int, message: str, user_context: dict, history: list, summary: str):
+    """(cacheable, cached reply or None). Follow-up turns depend on the conversation, so only first turns are cached."""
+    if history or summary:
+        response_cache.skip("chat")
+        return False, None
+    return True, response_cache.lookup(user_id, "chat", message, user_context)
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Send a message to the AI financial advisor chatbot.
     The chatbot has access to the user's profile, investments, and goals.
     """
-    # Fetch user's financial data
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-    investments = db.query(Investment).filter(Investment.user_id == current_user.id).all()
-    goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
-
-    # Build user context dict
-    user_context = {
-        "profile": {
-            "full_name": current_user.full_name,
-            "age": profile.age if profile else None,
-            "occupation": profile.occupation if profile else None,
-            "monthly_income": profile.monthly_income if profile else 0,
-            "monthly_expenses": profile.monthly_expenses if profile else 0,
-            "risk_profile": profile.risk_profile if profile else "Moderate",
-            "location": profile.location if profile else "",
-            "tax_regime": profile.tax_regime if profile else "New",
-            "deductions_80c": profile.deductions_80c if profile else 0,
-            "deductions_80d": profile.deductions_80d if profile else 0,
-            "other_deductions": profile.other_deductions if profile else 0,
-        },
-        "investments": [
-            {
-                "name": inv.name,
-                "type": inv.type,
-                "amount": inv.amount,
-                "frequency": inv.frequency,
-                "expected_return": inv.expected_return,
-                "is_tax_saving": inv.is_tax_saving,
-            }
-            for inv in investments
-        ],
-        "goals": [
-            {
-                "name": goal.name,
-                "target_amount": goal.target_amount,
-                "current_amount": goal.current_amount,
-                "target_date": goal.target_date,
-                "priority": goal.priority,
-                "category": goal.category,
-            }
-            for goal in goals
-        ],
-    }
-
-    # Convert history to list of dicts
-    history_dicts = [{"role": msg.role, "content": msg.content} for msg in (request.history or [])]
-
-    # Generate AI response
-    reply = await generate_chat_response(
-        message=request.message,
-        history=history_dicts,
-        user_context=user_context,
+    # Fetch user's financial data (profile, goals, investments) in one snapshot
+    snapshot = await get_user_snapshot_async(db, current_user.id)
+    user_context = snapshot.to_context()
+
+    # Stored history (or the legacy client-sent history)
+    session_id, summary, history_dicts = await _conversation(db, current_user.id, request)
+
+    cacheable, reply = _cached_reply(current_user.id, request.message, user_context, history_dicts, summary)
+    if reply is None:
+        # Generate AI response (langchain/langgraph are imported on first use, see core/preload.py)
+        from ..ai.chatbot import generate_chat_response, FALLBACK_REPLIES
+        reply = await generate_chat_response(
+            message=request.message,
+            history=history_dicts,
+            user_context=user_context,
+            summary=summary,
+        )
+        if cacheable and reply not in FALLBACK_REPLIES:
+            response_cache.store(current_user.id, "chat", request.message, user_context, reply)
+
+    if session_id:
+        await chat_memory.append_turn(db, session_id, request.message, reply)
+        # Summarize older turns after the response is sent
+        background_tasks.add_task(chat_memory.compact_session, session_id)
+
+    return ChatResponse(reply=reply, session_id=session_id)
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Streaming version of /chat (text/event-stream). Emits `token` events as the
+    model writes, `tool_start` / `tool_end` around web searches, and a final
+    `done` event carrying the complete reply.
+    The `done` event also carries the session_id. A cached reply arrives as a
+    single `token` event.
+    """
+    snapshot = await get_user_snapshot_async(db, current_user.id)
+    user_context = snapshot.to_context()
+    session_id, summary, history_dicts = await _conversation(db, current_user.id, request)
+    cacheable, cached = _cached_reply(current_user.id, request.message, user_context, history_dicts, summary)
+
+    from ..ai.chatbot import stream_chat_response, FALLBACK_REPLIES
+
+    async def cached_events():
+        yield {"type": "token", "content": cached}
+        yield {"type": "done", "reply": cached}
+
+    async def event_stream():
+        events = cached_events() if cached is not None else stream_chat_response(
+            message=request.message,
+            history=history_dicts,
+            user_context=user_context,
+            summary=summary,
+        )
+        async for event in events:
+            if event["type"] == "done":
+                if cached is None and cacheable and event["reply"] not in FALLBACK_REPLIES:
+                    response_cache.store(current_user.id, "chat", request.message, user_context, event["reply"])
+                if session_id:
+                    # The request's session may already be closed while streaming
+                    async with AsyncSessionLocal() as stream_db:
+                        await chat_memory.append_turn(stream_db, session_id, request.message, event["reply"])
+                event = {**event, "session_id": session_id}
+            yield _sse(event)
+
+    if session_id:
+        background_tasks.add_task(chat_memory.compact_session, session_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats")
+def get_response_cache_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Hit/miss counters of the AI response cache (chat and recommendations, process-wide).
+    """
+    return response_cache.stats()
+
+
+@router.get("/search-cache/stats")
+def get_search_cache_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Cache, coalescing and rate-limiter counters of the web search tool shared by all agents.
+    """
+    from ..ai.exa_search import search_cache_stats
+    return search_cache_stats()
+
+
+@router.get("/sessions", response_model=List[ChatSessionSummary])
+async def list_chat_sessions(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The user's chat sessions, most recently active first."""
+    sessions = await chat_memory.list_sessions(db, current_user.id)
+    return [
+        ChatSessionSummary(session_id=s.id, created_at=s.created_at, updated_at=s.updated_at)
+        for s in sessions
+    ]
+
+
+@router.get("/sessions/{session_id}", response_model=ChatSessionDetail)
+async def get_chat_session(
+    session_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Full transcript of a session, with the rolling summary of its compacted messages."""
+    session = await chat_memory.get_session(db, session_id, current_user.id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return ChatSessionDetail(
+        session_id=session.id,
+        summary=session.summary or "",
+        messages=await chat_memory.transcript(db, session),
     )
 
-    return ChatResponse(reply=reply)
+
+@router.delete("/sessions/{session_id}")
+async def delete_chat_session(
+    session_id: str,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    session = await chat_memory.get_session(db, session_id, current_user.id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    await chat_memory.delete_session(db, session)
+    return {"message": "Chat session deleted"}
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
-from ..db.session import get_db
-from ..models.user import User, Investment, BrokerConfig, Profile, Goal
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.session import get_db, get_async_db
+from ..models.user import Investment, BrokerConfig
 from ..schemas.user import InvestmentCreate, InvestmentUpdate, InvestmentResponse, BrokerBase, BrokerUpdate, BrokerResponse
-from .auth import get_current_user
-from ..ai.chatbot import generate_investment_recommendations
+from .auth import get_current_user, AuthenticatedUser
+from ..services import response_cache
+from ..services.user_context import get_user_snapshot_async, invalidate_user_snapshot
 
 router = APIRouter()
 
@@ -15,7 +17,7 @@ router = APIRouter()
 @router.post("/", response_model=InvestmentResponse)
 def create_investment(
     investment_in: InvestmentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     new_investment = Investment(
@@ -24,12 +26,13 @@ def create_investment(
     )
     db.add(new_investment)
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     db.refresh(new_investment)
     return new_investment
 
 @router.get("/", response_model=List[InvestmentResponse])
 def get_investments(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return db.query(Investment).filter(Investment.user_id == current_user.id).all()
@@ -38,7 +41,7 @@ def get_investments(
 def update_investment(
     investment_id: int,
     investment_in: InvestmentUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     investment = db.query(Investment).filter(
@@ -53,13 +56,14 @@ def update_investment(
         setattr(investment, field, value)
     
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     db.refresh(investment)
     return investment
 
 @router.delete("/{investment_id}")
 def delete_investment(
     investment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     investment = db.query(Investment).filter(
@@ -72,13 +76,14 @@ def delete_investment(
     
     db.delete(investment)
     db.commit()
+    invalidate_user_snapshot(current_user.id)
     return {"message": "Investment deleted successfully"}
 
 # --- Broker Configuration ---
 
 @router.get("/broker", response_model=BrokerResponse)
 def get_broker_config(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     config = db.query(BrokerConfig).filter(BrokerConfig.user_id == current_user.id).first()
@@ -93,7 +98,7 @@ def get_broker_config(
 @router.put("/broker", response_model=BrokerResponse)
 def update_broker_config(
     config_in: BrokerUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     config = db.query(BrokerConfig).filter(BrokerConfig.user_id == current_user.id).first()
@@ -123,56 +128,27 @@ class RecommendationResponse(BaseModel):
 @router.post("/ai-recommendations", response_model=RecommendationResponse)
 async def get_ai_recommendations(
     request: RecommendationRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get AI-powered investment recommendations based on user's risk level,
     preferred investment type, and their existing portfolio context.
     """
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-    investments = db.query(Investment).filter(Investment.user_id == current_user.id).all()
-    goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
-
-    user_context = {
-        "profile": {
-            "full_name": current_user.full_name,
-            "age": profile.age if profile else None,
-            "occupation": profile.occupation if profile else None,
-            "monthly_income": profile.monthly_income if profile else 0,
-            "monthly_expenses": profile.monthly_expenses if profile else 0,
-            "risk_profile": profile.risk_profile if profile else "Moderate",
-            "location": profile.location if profile else "",
-        },
-        "investments": [
-            {
-                "name": inv.name,
-                "type": inv.type,
-                "amount": inv.amount,
-                "frequency": inv.frequency,
-                "expected_return": inv.expected_return,
-                "is_tax_saving": inv.is_tax_saving,
-            }
-            for inv in investments
-        ],
-        "goals": [
-            {
-                "name": goal.name,
-                "target_amount": goal.target_amount,
-                "current_amount": goal.current_amount,
-                "target_date": goal.target_date,
-                "priority": goal.priority,
-                "category": goal.category,
-            }
-            for goal in goals
-        ],
-    }
-
-    recommendations = await generate_investment_recommendations(
-        risk_level=request.risk_level,
-        investment_type=request.investment_type,
-        user_context=user_context,
-    )
+    user_context = (await get_user_snapshot_async(db, current_user.id)).to_context()
+
+    # Same risk level and type for an unchanged profile bucket: reuse the recent answer
+    cache_prompt = f"{request.risk_level} {request.investment_type}"
+    recommendations = response_cache.lookup(current_user.id, "recommendation", cache_prompt, user_context)
+    if recommendations is None:
+        from ..ai.chatbot import generate_investment_recommendations, FALLBACK_REPLIES  # Heavy; see core/preload.py
+        recommendations = await generate_investment_recommendations(
+            risk_level=request.risk_level,
+            investment_type=request.investment_type,
+            user_context=user_context,
+        )
+        if recommendations not in FALLBACK_REPLIES:
+            response_cache.store(current_user.id, "recommendation", cache_prompt, user_context, recommendations)
 
     return RecommendationResponse(recommendations=recommendations)
 
@@ -1,14 +1,13 @@
 from fastapi import APIRouter, Depends
-from ..ai.market import get_market_indices
-from .auth import get_current_user
-from ..models.user import User
+from .auth import get_current_user, AuthenticatedUser
 
 router = APIRouter()
 
 @router.get("/indices")
-async def fetch_indices(current_user: User = Depends(get_current_user)):
+async def fetch_indices(current_user: AuthenticatedUser = Depends(get_current_user)):
     """
     Fetch current market indices (Nifty, Sensex, Gold) via AI search.
     """
+    from ..ai.market import get_market_indices  # Heavy (langchain/langgraph); see core/preload.py
     indices = await get_market_indices()
     return indices
@@ -3,11 +3,11 @@ from fastapi.responses import StreamingResponse
 from io import BytesIO
 from fpdf import FPDF
 from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.session import get_db
-from ..models.user import User, Profile, Goal, Investment
-from .auth import get_current_user
-from ..ai.report_generator import generate_comprehensive_financial_report
+from ..db.session import get_async_db
+from .auth import get_current_user, AuthenticatedUser
+from ..services.user_context import get_user_snapshot_async
 
 router = APIRouter()
 
@@ -89,31 +89,17 @@ def create_pdf_report(user_name, report_text, user_data):
 @router.get("/generate/{report_type}")
 async def generate_pdf_report(
     report_type: str,
-    current_user: User = Depends(get_current_user),
-    db = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate and stream a professional financial report PDF.
     """
     # 1. Gather all user context
-    profile = current_user.profile
-    investments = db.query(Investment).filter(Investment.user_id == current_user.id).all()
-    goals = db.query(Goal).filter(Goal.user_id == current_user.id).all()
-    
-    user_context = {
-        "profile": {
-            "full_name": current_user.full_name,
-            "age": profile.age,
-            "monthly_income": profile.monthly_income,
-            "monthly_expenses": profile.monthly_expenses,
-            "risk_profile": profile.risk_profile,
-            "location": profile.location
-        },
-        "investments": [{"name": i.name, "amount": i.amount, "type": i.type} for i in investments],
-        "goals": [{"name": g.name, "target_amount": g.target_amount} for g in goals]
-    }
-    
+    user_context = (await get_user_snapshot_async(db, current_user.id)).to_context()
+
     # 2. Get AI Content (Primary Ollama, secondary Gemini)
+    from ..ai.report_generator import generate_comprehensive_financial_report  # Heavy; see core/preload.py
     ai_report_text = await generate_comprehensive_financial_report(user_context, report_type)
     
     # 3. Create PDF
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..db.session import get_db
-from ..models.user import User, Profile, Investment
-from .auth import get_current_user
+from ..models.user import Profile, Investment
+from .auth import get_current_user, AuthenticatedUser
 
 router = APIRouter()
 
@@ -127,7 +127,7 @@ def calculate_tax_old_regime(annual_income: float, deductions: float) -> dict:
 # ---------------- TAX ESTIMATE ROUTE ----------------
 @router.get("/estimate")
 def get_tax_estimate(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
@@ -2,11 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 from ..services.zerodha_service import ZerodhaService
-from ..api.auth import get_current_user
-from ..models.user import BrokerConfig, User, Investment
+from ..services.user_context import invalidate_user_snapshot
+from ..api.auth import get_current_user, AuthenticatedUser
+from ..models.user import BrokerConfig, Investment
 import os
 import logging
-from kiteconnect import exceptions as kite_exceptions
 
 router = APIRouter()
 
@@ -31,7 +31,7 @@ def get_broker_config(db: Session, user_id: int):
 
 @router.get("/login")
 def get_login_url(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Returns the Zerodha login URL."""
@@ -48,7 +48,7 @@ def get_login_url(
 @router.post("/disconnect")
 def disconnect_zerodha(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Disconnects Zerodha and clears the access token."""
     broker_config = get_broker_config(db, current_user.id)
@@ -65,7 +65,7 @@ def disconnect_zerodha(
 def zerodha_callback(
     request_token: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Exchanges request token for access token and saves to DB."""
@@ -95,7 +95,7 @@ def zerodha_callback(
 @router.get("/profile")
 def get_profile(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Gets Zerodha user profile."""
@@ -103,6 +103,8 @@ def get_profile(
     if not broker_config or not broker_config.access_token:
         raise HTTPException(status_code=401, detail="Zerodha account not linked or token expired")
         
+    from kiteconnect import exceptions as kite_exceptions  # Imported on first use; see core/preload.py
+
     try:
         kite = service._get_kite_instance(broker_config.access_token)
         return kite.profile()
@@ -121,7 +123,7 @@ def get_profile(
 @router.get("/holdings")
 def get_holdings(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Retrieves user's holdings from Zerodha."""
@@ -129,6 +131,8 @@ def get_holdings(
     if not broker_config or not broker_config.access_token:
         raise HTTPException(status_code=401, detail="Zerodha account not linked or token expired")
         
+    from kiteconnect import exceptions as kite_exceptions
+
     try:
         holdings = service.get_holdings(broker_config.access_token)
         return {"holdings": holdings}
@@ -147,7 +151,7 @@ def get_holdings(
 @router.post("/sync-portfolio")
 def sync_portfolio(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Fetches user's holdings from Zerodha and synchronizes them with internal Investment records."""
@@ -155,6 +159,8 @@ def sync_portfolio(
     if not broker_config or not broker_config.access_token:
         raise HTTPException(status_code=401, detail="Zerodha account not linked or token expired")
         
+    from kiteconnect import exceptions as kite_exceptions
+
     try:
         holdings = service.get_holdings(broker_config.access_token)
         
@@ -194,6 +200,7 @@ def sync_portfolio(
                 new_count += 1
                 
         db.commit()
+        invalidate_user_snapshot(current_user.id)
         return {
             "message": "Portfolio synchronized successfully",
             "synced_investments": synced_count,
@@ -216,7 +223,7 @@ def sync_portfolio(
 @router.get("/positions")
 def get_positions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     service: ZerodhaService = Depends(get_zerodha_service)
 ):
     """Retrieves user's net and day positions from Zerodha."""
@@ -224,6 +231,8 @@ def get_positions(
     if not broker_config or not broker_config.access_token:
         raise HTTPException(status_code=401, detail="Zerodha account not linked or token expired")
         
+    from kiteconnect import exceptions as kite_exceptions
+
     try:
         positions = service.get_positions(broker_config.access_token)
         return {"positions": positions}
@@ -0,0 +1,208 @@
+"""
+Caching primitives shared by the service layer.
+
+LRUCache is in-process; RedisCache offers the same get/set/delete interface on
+a Redis-compatible server so several uvicorn workers can share entries.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a size cap, optional TTL and hit/miss counters.
+
+    The least recently used entry is evicted once max_size is exceeded. With
+    ttl_seconds, entries older than the TTL are treated as misses and dropped.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-key counters bumped on invalidation (see set_if_generation)
+        self._generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # Caller holds self._lock
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def generation(self, key: Hashable) -> int:
+        """Invalidation counter of key; read it before loading the value to cache."""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def bump_generation(self, key: Hashable) -> None:
+        """Drop key and make every set_if_generation with an older generation a no-op."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._data.pop(key, None)
+
+    def set_if_generation(self, key: Hashable, value: Any, generation: int) -> bool:
+        """set(key, value) unless bump_generation(key) ran since generation was read."""
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return False
+            self._store(key, value)
+            return True
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate. Returns the number removed."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class RedisCache:
+    """
+    Cache on a Redis-compatible server, for sharing entries between worker processes.
+
+    Keys are namespaced with prefix and expire after ttl_seconds (Redis handles
+    eviction via its own maxmemory policy). Values are stored with dumps/loads,
+    JSON by default. Requires the optional `redis` package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str,
+        ttl_seconds: Optional[float] = None,
+        dumps: Callable[[Any], str] = json.dumps,
+        loads: Callable[[str], Any] = json.loads,
+    ):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisCache needs the 'redis' package: pip install redis") from e
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._dumps = dumps
+        self._loads = loads
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raw = self._client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self._loads(raw)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        ttl_ms = int(self.ttl_seconds * 1000) if self.ttl_seconds else None
+        self._client.set(self._key(key), self._dumps(value), px=ttl_ms)
+
+    def delete(self, key: Hashable) -> bool:
+        return bool(self._client.delete(self._key(key)))
+
+    def _generation_key(self, key: Hashable) -> str:
+        return f"{self.prefix}:generation:{key}"
+
+    def generation(self, key: Hashable) -> int:
+        """Invalidation counter of key, shared by every worker; read it before loading the value."""
+        return int(self._client.get(self._generation_key(key)) or 0)
+
+    def bump_generation(self, key: Hashable) -> None:
+        """Drop key and make every set_if_generation with an older generation a no-op."""
+        with self._client.pipeline() as pipe:
+            pipe.incr(self._generation_key(key))
+            pipe.delete(self._key(key))
+            pipe.execute()
+
+    def set_if_generation(self, key: Hashable, value: Any, generation: int) -> bool:
+        """set(key, value) unless bump_generation(key) ran (in any worker) since generation was read."""
+        generation_key = self._generation_key(key)
+        ttl_ms = int(self.ttl_seconds * 1000) if self.ttl_seconds else None
+        with self._client.pipeline() as pipe:
+            try:
+                # WATCH aborts the transaction if a bump lands between the check and the SET
+                pipe.watch(generation_key)
+                if int(pipe.get(generation_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self._key(key), self._dumps(value), px=ttl_ms)
+                pipe.execute()
+                return True
+            except self._redis.WatchError:
+                return False
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self.prefix}:*"):
+            self._client.delete(key)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
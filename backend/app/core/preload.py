@@ -0,0 +1,57 @@
+"""
+Heavy Module Preloading
+=======================
+The AI, ML and broker integrations (langchain/langgraph, google.generativeai,
+scikit-learn, kiteconnect) take several seconds to import, so the routers
+import them inside the endpoints that use them rather than at module level.
+The app starts serving immediately and the first request to e.g. /chatbot
+pays the import instead.
+
+With AI_PRELOAD=true (the default) the lifespan imports HEAVY_MODULES in a
+background thread right after startup, so in practice they are already loaded
+by the time the first AI request arrives. Set AI_PRELOAD=false to defer every
+import to first use (e.g. for short-lived workers or tests).
+"""
+import asyncio
+import importlib
+import os
+import time
+from typing import Dict, Optional
+
+AI_PRELOAD = os.getenv("AI_PRELOAD", "true").lower() == "true"
+
+# Modules behind lazy imports in the routers (leading dot: relative to the app package)
+HEAVY_MODULES = [
+    ".ai.chatbot",            # langchain, langgraph
+    ".ai.market",             # langchain, langgraph
+    ".ai.report_generator",   # langchain_core (via ai/registry.py)
+    "langchain_google_genai", # Gemini chat model, built by ai/registry.py on first use
+    ".ai.budget_generator",   # google.generativeai
+    ".ai.anomaly_detector",   # scikit-learn
+    "kiteconnect",            # Zerodha client (imported lazily by services/zerodha_service.py)
+]
+
+_APP_PACKAGE = __package__.rsplit(".", 1)[0]
+
+
+def preload_heavy_modules() -> Dict[str, float]:
+    """Import every module in HEAVY_MODULES; returns the milliseconds each took (failures are skipped)."""
+    timings = {}
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name, package=_APP_PACKAGE)
+        except Exception as e:
+            print(f"[Preload] Failed to import {name}: {e}")
+            continue
+        timings[name] = (time.perf_counter() - start) * 1000
+    total = sum(timings.values())
+    print(f"[Preload] Loaded {len(timings)}/{len(HEAVY_MODULES)} heavy modules in {total:.0f} ms")
+    return timings
+
+
+def start_background_preload() -> Optional[asyncio.Future]:
+    """Schedule preload_heavy_modules on a worker thread when AI_PRELOAD is enabled."""
+    if not AI_PRELOAD:
+        return None
+    return asyncio.get_running_loop().run_in_executor(None, preload_heavy_modules)
@@ -0,0 +1,237 @@
+"""
+Schema Migrations
+=================
+Versioned migration runner. Every schema change is one numbered step in
+MIGRATIONS; the versions applied to a database are recorded in the
+schema_version table together with how long each step took, so only pending
+steps run and an up-to-date database costs a single SELECT.
+
+Steps run in order, each in its own transaction with its schema_version row.
+The column steps check the live table first, so databases created before this
+runner existed (already carrying some of the columns) upgrade cleanly.
+
+Each step's transaction holds a database-wide migration lock (a transaction-level
+pg_advisory_xact_lock on PostgreSQL, BEGIN IMMEDIATE on SQLite) and re-checks
+schema_version inside it, so uvicorn workers starting together apply every step
+exactly once while the others wait.
+
+Run offline, from backend/:
+    python -m app.db.migrations            # apply pending migrations (same as: upgrade)
+    python -m app.db.migrations status     # show applied / pending versions
+
+main.py also applies pending migrations on startup unless DB_AUTO_MIGRATE=false.
+For deployments with several workers, run `python -m app.db.migrations upgrade`
+as a release step and start the workers with DB_AUTO_MIGRATE=false.
+"""
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, inspect, select, text
+
+from .session import Base, engine as default_engine
+from ..models import budget, chat_session, simulation_job, user  # noqa: F401  (register tables on Base.metadata)
+
+# Kept out of Base.metadata so create_all and the models never touch it
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_ms", Float, nullable=False),
+)
+
+# Key of the PostgreSQL advisory lock every migration runner takes
+MIGRATION_LOCK_KEY = 7_263_541
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable
+
+
+def _add_missing_columns(conn, table: str, columns: dict) -> None:
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return
+    existing = {col["name"] for col in inspector.get_columns(table)}
+    for col, col_type in columns.items():
+        if col not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}"))
+            print(f"[Migration] Added '{col}' column to {table} table.")
+
+
+def _create_tables(conn) -> None:
+    # create_all only creates NEW tables; later column changes are their own steps
+    Base.metadata.create_all(bind=conn)
+
+
+def _profile_tax_columns(conn) -> None:
+    _add_missing_columns(conn, "profiles", {
+        "location": "VARCHAR DEFAULT ''",
+        "tax_regime": "VARCHAR DEFAULT 'New'",
+        "deductions_80c": "FLOAT DEFAULT 0.0",
+        "deductions_80d": "FLOAT DEFAULT 0.0",
+        "other_deductions": "FLOAT DEFAULT 0.0",
+    })
+
+
+def _investment_goal_columns(conn) -> None:
+    _add_missing_columns(conn, "investments", {
+        "goal_id": "INTEGER REFERENCES goals(id)",
+        "is_tax_saving": "BOOLEAN DEFAULT FALSE",
+    })
+
+
+def _simulation_job_return_model(conn) -> None:
+    _add_missing_columns(conn, "simulation_jobs", {
+        "return_model": "VARCHAR DEFAULT 'normal'",
+    })
+
+
+# Indexes declared in __table_args__; create_all only adds them to new tables,
+# so existing databases get them here. broker_configs.user_id and profiles.user_id
+# are UNIQUE and already indexed.
+INDEXES = {
+    "ix_goals_user_id": "goals (user_id)",
+    "ix_investments_user_id_goal_id": "investments (user_id, goal_id)",
+    "ix_investments_user_id_type_name": "investments (user_id, type, name)",
+    "ix_investments_user_id_is_tax_saving": "investments (user_id, is_tax_saving)",
+}
+
+
+def _per_user_indexes(conn) -> None:
+    for name, target in INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+
+
+def _chat_session_tables(conn) -> None:
+    # Databases created before version 6 ran create_all without these tables
+    for model in (chat_session.ChatSession, chat_session.ChatSessionMessage):
+        model.__table__.create(bind=conn, checkfirst=True)
+
+
+def _simulation_job_progress(conn) -> None:
+    _add_missing_columns(conn, "simulation_jobs", {
+        "completed_simulations": "INTEGER DEFAULT 0",
+    })
+
+
+# Append new steps with the next version number; never renumber or edit an applied step.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "profile location and tax columns", _profile_tax_columns),
+    Migration(3, "investment goal link and tax-saving flag", _investment_goal_columns),
+    Migration(4, "simulation job return model", _simulation_job_return_model),
+    Migration(5, "per-user indexes on goals and investments", _per_user_indexes),
+    Migration(6, "chat sessions and messages", _chat_session_tables),
+    Migration(7, "simulation job progress", _simulation_job_progress),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _applied_versions(conn) -> set:
+    if not inspect(conn).has_table("schema_version"):
+        return set()
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+def applied_versions(engine=default_engine) -> set:
+    with engine.connect() as conn:
+        return _applied_versions(conn)
+
+
+def pending_migrations(engine=default_engine) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+@contextmanager
+def _locked_transaction(engine):
+    """engine.begin(), holding the migration lock until the transaction ends."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        elif conn.dialect.name == "sqlite":
+            # Takes the database write lock now rather than at the first write
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield conn
+
+
+def run_migrations(engine=default_engine) -> List[dict]:
+    """
+    Apply every pending migration in version order and return one
+    {"version", "name", "duration_ms"} entry per step that ran (steps another
+    process applied in the meantime are skipped).
+    """
+    pending = pending_migrations(engine)
+    if not pending:
+        return []
+    with _locked_transaction(engine) as conn:
+        _version_metadata.create_all(bind=conn)
+    ran = []
+    for migration in pending:
+        start = time.perf_counter()
+        with _locked_transaction(engine) as conn:
+            # Another worker may have applied it while this one waited for the lock
+            if migration.version in _applied_versions(conn):
+                continue
+            migration.apply(conn)
+            duration_ms = (time.perf_counter() - start) * 1000
+            conn.execute(schema_version.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+                duration_ms=duration_ms,
+            ))
+        print(f"[Migration] {migration.version:03d} {migration.name} ({duration_ms:.1f} ms)")
+        ran.append({"version": migration.version, "name": migration.name, "duration_ms": duration_ms})
+    return ran
+
+
+def migration_status(engine=default_engine) -> List[dict]:
+    """Every known migration with its applied_at / duration_ms (None while pending)."""
+    recorded = {}
+    with engine.connect() as conn:
+        if inspect(conn).has_table("schema_version"):
+            recorded = {row.version: row for row in conn.execute(select(schema_version))}
+    return [
+        {
+            "version": m.version,
+            "name": m.name,
+            "applied_at": recorded[m.version].applied_at if m.version in recorded else None,
+            "duration_ms": recorded[m.version].duration_ms if m.version in recorded else None,
+        }
+        for m in MIGRATIONS
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrations", description="Apply or inspect schema migrations.")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for row in migration_status():
+            state = f"applied {row['applied_at']:%Y-%m-%d %H:%M:%S} ({row['duration_ms']:.1f} ms)" if row["applied_at"] else "pending"
+            print(f"{row['version']:03d} {row['name']:<45} {state}")
+        return 0
+
+    start = time.perf_counter()
+    ran = run_migrations()
+    if ran:
+        print(f"Applied {len(ran)} migration(s) in {(time.perf_counter() - start) * 1000:.1f} ms; now at version {LATEST_VERSION}.")
+    else:
+        print(f"Database is up to date (version {LATEST_VERSION}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,35 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api import auth, budget, investments, advisory, tax, chatbot, zerodha, market, reports, analytics
-from .models import budget as budget_model, user as user_model  # Ensures tables are created
-from .db.session import create_tables
+from .db.migrations import run_migrations
+from .core.preload import start_background_preload
+from .services.simulation_pool import simulation_pool
+from .services.simulation_jobs import release_claimed_jobs, resume_unfinished_jobs
 
-# Create database tables
-create_tables()
+# Apply pending schema migrations on startup (a single SELECT when up to date; workers
+# starting together are serialized by the migration lock). With several workers, set
+# DB_AUTO_MIGRATE=false and run `python -m app.db.migrations upgrade` as a deploy step instead.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
 
-app = FastAPI(title="Finance Advisor")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing touches the database or the AI/ML libraries at import time;
+    # importing this module only wires up the routers.
+    if DB_AUTO_MIGRATE:
+        run_migrations()
+    # Worker processes for CPU-bound simulations live as long as the app
+    simulation_pool.start()
+    await resume_unfinished_jobs()
+    # Import langchain, Gemini, scikit-learn and kiteconnect in the background (AI_PRELOAD)
+    start_background_preload()
+    yield
+    # Unfinished jobs go back to pending for the next worker that starts
+    await release_claimed_jobs()
+    simulation_pool.shutdown()
+
+app = FastAPI(title="Finance Advisor", lifespan=lifespan)
 
 # Enable CORS for frontend integration
 app.add_middleware(
@@ -0,0 +1,48 @@
+"""
+Chat Session Models
+===================
+SQLAlchemy models for server-side chatbot conversations. The client sends
+only the new message and a session id; the transcript lives here.
+
+Older messages are folded into ChatSession.summary once the conversation
+exceeds its token budget (see services/chat_memory.py). Folded messages are
+kept for the transcript but flagged compacted, so they are no longer sent to
+the model.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
+from datetime import datetime
+from ..db.session import Base
+
+
+class ChatSession(Base):
+    """One conversation between a user and the advisor chatbot."""
+    __tablename__ = "chat_sessions"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Rolling summary of every compacted message, in conversation order
+    summary = Column(Text, default="")
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ChatSessionMessage(Base):
+    """A single user or assistant message within a ChatSession."""
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_id", "session_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
+    role = Column(String, nullable=False)  # "user" or "assistant"
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, default=0)
+
+    # True once folded into ChatSession.summary
+    compacted = Column(Boolean, default=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
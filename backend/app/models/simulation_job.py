@@ -0,0 +1,41 @@
+"""
+Simulation Job Model
+=====================
+SQLAlchemy model for long-running Monte Carlo jobs submitted through
+/analytics/jobs. The job's inputs and every finished goal result are
+persisted, so a job interrupted by a restart resumes where it stopped.
+updated_at doubles as the heartbeat of the worker running the job.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from datetime import datetime
+from ..db.session import Base
+
+
+class SimulationJob(Base):
+    """
+    One simulation request covering a single goal or all of a user's goals.
+    Status moves pending -> running -> completed | failed.
+    """
+    __tablename__ = "simulation_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    goal_id = Column(Integer, nullable=True)  # None = all goals
+
+    status = Column(String, default="pending")
+    n_simulations = Column(Integer, nullable=False)
+
+    # Prepared goal inputs (name, target, date, current_amount, monthly_sip) and risk profile
+    goal_inputs = Column(JSON, nullable=False)
+    risk_profile = Column(String, default="Moderate")
+    return_model = Column(String, default="normal")
+
+    # One result per finished goal, in goal_inputs order (partial while running)
+    results = Column(JSON, default=list)
+    # Paths simulated so far across all goals, committed after every batch (progress)
+    completed_simulations = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
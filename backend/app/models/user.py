@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
@@ -11,6 +11,9 @@ class User(Base):
     full_name = Column(String)
     
     profile = relationship("Profile", back_populates="user", uselist=False)
+    # Read-only collections for eager loading (see services/user_context.py)
+    goals = relationship("Goal", viewonly=True)
+    investments = relationship("Investment", viewonly=True)
 
 class Profile(Base):
     __tablename__ = "profiles"
@@ -35,6 +38,9 @@ class Profile(Base):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -49,6 +55,12 @@ class Goal(Base):
 
 class Investment(Base):
     __tablename__ = "investments"
+    # Every query filters on user_id first; (user_id, goal_id) also serves user_id-only lookups
+    __table_args__ = (
+        Index("ix_investments_user_id_goal_id", "user_id", "goal_id"),
+        Index("ix_investments_user_id_type_name", "user_id", "type", "name"),  # Zerodha sync upserts
+        Index("ix_investments_user_id_is_tax_saving", "user_id", "is_tax_saving"),  # 80C automation
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -0,0 +1,148 @@
+"""
+Chat Memory
+===========
+Server-side conversation sessions for the chatbot. The client sends only the
+new message and a session id; the transcript is stored in chat_sessions /
+chat_messages (models/chat_session.py) and rebuilt here for each turn.
+
+What reaches the model is bounded: once the active (not yet compacted)
+messages exceed CHAT_HISTORY_TOKEN_BUDGET, the oldest are folded into the
+session's rolling summary, keeping at least CHAT_KEEP_RECENT_MESSAGES
+verbatim. Compaction runs after the reply has been sent (a FastAPI
+background task), so it never adds latency to the turn.
+"""
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..ai.tokens import estimate_tokens
+from ..db.session import AsyncSessionLocal
+from ..models.chat_session import ChatSession, ChatSessionMessage
+
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_KEEP_RECENT_MESSAGES = int(os.getenv("CHAT_KEEP_RECENT_MESSAGES", "6"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+
+# Sessions with a compaction in progress (per process), so overlapping turns don't summarize twice
+_compacting = set()
+
+
+async def create_session(db: AsyncSession, user_id: int) -> ChatSession:
+    session = ChatSession(id=uuid.uuid4().hex, user_id=user_id, summary="")
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def get_session(db: AsyncSession, session_id: str, user_id: int) -> Optional[ChatSession]:
+    """The session if it exists and belongs to user_id."""
+    result = await db.execute(
+        select(ChatSession).where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _messages(db: AsyncSession, session_id: str, active_only: bool) -> List[ChatSessionMessage]:
+    query = select(ChatSessionMessage).where(ChatSessionMessage.session_id == session_id)
+    if active_only:
+        query = query.where(ChatSessionMessage.compacted == False)  # noqa: E712
+    return list((await db.execute(query.order_by(ChatSessionMessage.id))).scalars())
+
+
+async def load_history(db: AsyncSession, session: ChatSession) -> Tuple[str, list]:
+    """(summary, active messages as [{"role", "content"}]) to send with the next turn."""
+    active = await _messages(db, session.id, active_only=True)
+    return session.summary or "", [{"role": m.role, "content": m.content} for m in active]
+
+
+async def transcript(db: AsyncSession, session: ChatSession) -> list:
+    """Every message in the session, including compacted ones."""
+    return [
+        {"role": m.role, "content": m.content, "compacted": m.compacted, "created_at": m.created_at}
+        for m in await _messages(db, session.id, active_only=False)
+    ]
+
+
+async def list_sessions(db: AsyncSession, user_id: int) -> List[ChatSession]:
+    result = await db.execute(
+        select(ChatSession).where(ChatSession.user_id == user_id).order_by(ChatSession.updated_at.desc())
+    )
+    return list(result.scalars())
+
+
+async def append_turn(db: AsyncSession, session_id: str, user_message: str, reply: str) -> None:
+    db.add_all([
+        ChatSessionMessage(session_id=session_id, role="user", content=user_message, token_count=estimate_tokens(user_message)),
+        ChatSessionMessage(session_id=session_id, role="assistant", content=reply, token_count=estimate_tokens(reply)),
+    ])
+    await db.execute(update(ChatSession).where(ChatSession.id == session_id).values(updated_at=datetime.utcnow()))
+    await db.commit()
+
+
+def _messages_to_compact(summary: str, active: List[ChatSessionMessage]) -> List[ChatSessionMessage]:
+    """The oldest active messages to fold into the summary so the rest fits the budget."""
+    total = estimate_tokens(summary) + sum(m.token_count or 0 for m in active)
+    if total <= CHAT_HISTORY_TOKEN_BUDGET:
+        return []
+    foldable = active[:max(0, len(active) - CHAT_KEEP_RECENT_MESSAGES)]
+    to_fold = []
+    for message in foldable:
+        if total <= CHAT_HISTORY_TOKEN_BUDGET:
+            break
+        to_fold.append(message)
+        total -= message.token_count or 0
+    # Fold whole user/assistant pairs so the kept history never starts with a reply
+    if len(to_fold) % 2:
+        if len(to_fold) < len(foldable):
+            to_fold.append(foldable[len(to_fold)])
+        else:
+            to_fold.pop()
+    return to_fold
+
+
+async def compact_session(session_id: str) -> None:
+    """
+    Fold the oldest active messages of session_id into its summary when the
+    history is over budget. Opens its own database session, so it can run as
+    a background task after the response.
+    """
+    if session_id in _compacting:
+        return
+    _compacting.add(session_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            session = await db.get(ChatSession, session_id)
+            if session is None:
+                return
+            to_fold = _messages_to_compact(session.summary or "", await _messages(db, session_id, active_only=True))
+            if not to_fold:
+                return
+
+            from ..ai.chatbot import summarize_conversation
+
+            session.summary = await summarize_conversation(
+                session.summary or "",
+                [{"role": m.role, "content": m.content} for m in to_fold],
+                max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+            )
+            await db.execute(
+                update(ChatSessionMessage)
+                .where(ChatSessionMessage.id.in_([m.id for m in to_fold]))
+                .values(compacted=True)
+            )
+            await db.commit()
+            print(f"[ChatMemory] Compacted {len(to_fold)} message(s) of session {session_id}")
+    finally:
+        _compacting.discard(session_id)
+
+
+async def delete_session(db: AsyncSession, session: ChatSession) -> None:
+    await db.execute(
+        ChatSessionMessage.__table__.delete().where(ChatSessionMessage.session_id == session.id)
+    )
+    await db.delete(session)
+    await db.commit()
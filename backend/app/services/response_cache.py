@@ -0,0 +1,231 @@
+"""
+AI Response Cache
+=================
+Reuses chatbot answers and investment recommendations instead of running the
+full agent (several Gemini calls plus web searches) again for a question the
+user has already asked.
+
+Entries are keyed on (user_id, kind, profile fingerprint, normalized prompt).
+The fingerprint is a coarse bucket of the user's financial context (risk
+profile, age band, income / savings / portfolio bands, tax regime, investment
+types, goals), so small changes such as a day's price movement on synced
+holdings do not empty the cache, while a changed situation does. Entries are
+scoped per user because the answers quote the user's name and numbers.
+
+Answers that depend on live market data (prices, "today", Nifty, ...) and all
+recommendations expire after RESPONSE_CACHE_MARKET_TTL_SECONDS; general
+explanations ("what is ELSS?") after RESPONSE_CACHE_TTL_SECONDS.
+
+With RESPONSE_CACHE_SEMANTIC=true, a chat question that misses exactly is
+compared with the user's cached questions using a local hashing-trick
+embedding (word and character-trigram features, cosine similarity), so
+paraphrases such as "explain 80C" / "what is section 80C" can share an answer.
+Market-sensitive questions only ever match exactly.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.cache import LRUCache
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_MARKET_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_MARKET_TTL_SECONDS", "900"))
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() == "true"
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.85"))
+
+# Cached questions remembered per (user, kind, fingerprint) for the similarity lookup
+SEMANTIC_INDEX_PER_BUCKET = 64
+EMBEDDING_DIM = 2 ** 18
+
+KINDS = ("chat", "recommendation")
+
+general_cache = LRUCache(max_size=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+market_cache = LRUCache(max_size=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_MARKET_TTL_SECONDS)
+
+_MARKET_SENSITIVE = re.compile(
+    r"\b(today|now|current(ly)?|latest|live|recent|this (week|month|year)|news|price|prices|nav|"
+    r"nifty|sensex|bank ?nifty|index|indices|market|markets|rate|rates|repo|inflation|ipo|"
+    r"stock|stocks|share|shares|buy|sell|top|best|trending|gold)\b"
+)
+_STOPWORDS = frozenset(
+    "a an the is are was were be to of in on for and or with about me my i you your it this that "
+    "what whats how why when which can could should would will do does please tell explain "
+    "give show much many using use work section".split()
+)
+
+_index: "OrderedDict[tuple, OrderedDict]" = OrderedDict()
+_lock = threading.Lock()
+# Per kind: exact hits, semantic hits, misses, and requests not eligible for caching
+_counters = {kind: Counter() for kind in KINDS}
+
+
+def _count(kind: str, outcome: str) -> None:
+    with _lock:
+        _counters[kind][outcome] += 1
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, punctuation stripped, whitespace collapsed."""
+    text = re.sub(r"['’]", "", (text or "").lower())
+    text = re.sub(r"[^\w₹%.\s]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)  # Keep decimal points only
+    return " ".join(text.split())
+
+
+def is_market_sensitive(text: str) -> bool:
+    return bool(_MARKET_SENSITIVE.search(normalize_prompt(text)))
+
+
+def _band(value, base: float = 2.0) -> int:
+    """Logarithmic bucket of a rupee amount (each band is twice the previous)."""
+    value = value or 0
+    return int(math.log(value, base)) if value >= 1 else 0
+
+
+def profile_fingerprint(user_context: dict) -> str:
+    """Coarse, stable digest of the parts of user_context that shape an answer."""
+    profile = user_context.get("profile", {})
+    investments = user_context.get("investments", [])
+    goals = user_context.get("goals", [])
+    income = profile.get("monthly_income") or 0
+    savings_rate = (income - (profile.get("monthly_expenses") or 0)) / income if income > 0 else 0
+    bucket = [
+        profile.get("risk_profile"),
+        (profile.get("age") or 0) // 10,
+        profile.get("tax_regime"),
+        _band(income),
+        round(savings_rate * 10),
+        _band(sum(inv.get("amount") or 0 for inv in investments)),
+        sorted({inv.get("type") or "" for inv in investments}),
+        sorted((goal.get("name") or "", _band(goal.get("target_amount"))) for goal in goals),
+    ]
+    return hashlib.sha256(json.dumps(bucket, default=str).encode()).hexdigest()[:16]
+
+
+def _embed(normalized: str) -> Dict[int, float]:
+    """Sparse hashing-trick embedding: content words plus their character trigrams, L2-normalized."""
+    features = Counter()
+    for word in normalized.split():
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss") and word not in _STOPWORDS:
+            word = word[:-1]  # Crude plural / verb stemming: "funds" -> "fund", "works" -> "work"
+        if word in _STOPWORDS:
+            continue
+        features[zlib.crc32(f"w:{word}".encode()) % EMBEDDING_DIM] += 2.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            features[zlib.crc32(f"c:{padded[i:i + 3]}".encode()) % EMBEDDING_DIM] += 1.0
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    return {k: v / norm for k, v in features.items()} if norm else {}
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def _cache_for(kind: str, prompt: str) -> LRUCache:
+    return market_cache if kind == "recommendation" or is_market_sensitive(prompt) else general_cache
+
+
+def lookup(user_id: int, kind: str, prompt: str, user_context: dict) -> Optional[str]:
+    """The cached answer to prompt for this user and profile bucket, or None."""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    fingerprint = profile_fingerprint(user_context)
+    normalized = normalize_prompt(prompt)
+    cache = _cache_for(kind, prompt)
+    reply = cache.get((user_id, kind, fingerprint, normalized))
+    if reply is not None:
+        _count(kind, "hits")
+        return reply
+
+    if RESPONSE_CACHE_SEMANTIC and kind == "chat" and cache is general_cache:
+        reply = _similar_reply((user_id, kind, fingerprint), normalized)
+        if reply is not None:
+            _count(kind, "semantic_hits")
+            return reply
+    _count(kind, "misses")
+    return None
+
+
+def _similar_reply(bucket_key: tuple, normalized: str) -> Optional[str]:
+    """The cached answer to the most similar question in bucket_key, if above RESPONSE_CACHE_SIMILARITY."""
+    query = _embed(normalized)
+    if not query:
+        return None
+    with _lock:
+        candidates = list(_index.get(bucket_key, {}).items())
+    best_key, best_score = None, RESPONSE_CACHE_SIMILARITY
+    for key, vector in candidates:
+        score = _cosine(query, vector)
+        if score >= best_score:
+            best_key, best_score = key, score
+    return general_cache.get(best_key) if best_key else None
+
+
+def store(user_id: int, kind: str, prompt: str, user_context: dict, reply: str) -> None:
+    if not RESPONSE_CACHE_ENABLED or not reply:
+        return
+    fingerprint = profile_fingerprint(user_context)
+    normalized = normalize_prompt(prompt)
+    key = (user_id, kind, fingerprint, normalized)
+    cache = _cache_for(kind, prompt)
+    cache.set(key, reply)
+    if not (RESPONSE_CACHE_SEMANTIC and kind == "chat" and cache is general_cache):
+        return
+    with _lock:
+        bucket = _index.setdefault((user_id, kind, fingerprint), OrderedDict())
+        bucket[key] = _embed(normalized)
+        bucket.move_to_end(key)
+        while len(bucket) > SEMANTIC_INDEX_PER_BUCKET:
+            bucket.popitem(last=False)
+        _index.move_to_end((user_id, kind, fingerprint))
+        while len(_index) > RESPONSE_CACHE_SIZE:
+            _index.popitem(last=False)
+
+
+def skip(kind: str) -> None:
+    """Count a request that was not eligible for caching (e.g. a follow-up turn with history)."""
+    _count(kind, "skipped")
+
+
+def clear() -> None:
+    general_cache.clear()
+    market_cache.clear()
+    with _lock:
+        _index.clear()
+        for counter in _counters.values():
+            counter.clear()
+
+
+def stats() -> Dict[str, Any]:
+    """Hit-rate counters per kind, plus size/eviction counters of the two TTL tiers."""
+    with _lock:
+        per_kind = {}
+        for kind, counter in _counters.items():
+            hits = counter["hits"] + counter["semantic_hits"]
+            lookups = hits + counter["misses"]
+            per_kind[kind] = {
+                "hits": counter["hits"],
+                "semantic_hits": counter["semantic_hits"],
+                "misses": counter["misses"],
+                "skipped": counter["skipped"],
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+            }
+    return {
+        "enabled": RESPONSE_CACHE_ENABLED,
+        "semantic": RESPONSE_CACHE_SEMANTIC,
+        "similarity_threshold": RESPONSE_CACHE_SIMILARITY,
+        **per_kind,
+        "general_tier": general_cache.stats(),
+        "market_tier": market_cache.stats(),
+    }
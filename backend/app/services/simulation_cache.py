@@ -0,0 +1,143 @@
+"""
+Simulation Result Cache
+=======================
+Memoizes Monte Carlo results per user. The engine is seeded, so identical
+inputs in the same calendar month (months-to-target only changes monthly)
+always produce identical results.
+
+Entries are keyed on (user_id, hash of the simulation inputs + current month)
+and dropped automatically whenever a Goal, Investment or Profile row owned by
+that user is inserted, updated or deleted.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from ..ai.monte_carlo import (
+    run_monte_carlo_simulation, run_monte_carlo_batch, solve_required_sip, N_SIMULATIONS, SIP_SOLVER_SIMULATIONS,
+)
+from ..core.cache import LRUCache
+from ..models.user import Goal, Investment, Profile
+from .simulation_pool import simulation_pool
+
+SIMULATION_CACHE_SIZE = int(os.getenv("SIMULATION_CACHE_SIZE", "512"))
+
+simulation_cache = LRUCache(max_size=SIMULATION_CACHE_SIZE)
+
+
+def _goal_inputs(goal: Dict[str, Any]) -> List[Any]:
+    return [goal.get("name"), goal.get("target_amount"), goal.get("target_date")]
+
+
+def _cache_key(user_id: int, kind: str, payload: List[Any]) -> tuple:
+    payload = [kind, datetime.now().strftime("%Y-%m"), *payload]
+    digest = hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+    return (user_id, digest)
+
+
+async def cached_monte_carlo_simulation(
+    user_id: int,
+    goal: Dict[str, Any],
+    monthly_sip: float,
+    current_amount: float,
+    risk_profile: str = "Moderate",
+    n_simulations: int = N_SIMULATIONS,
+    return_model: str = "normal",
+    **sampling: Any,
+) -> Dict[str, Any]:
+    """
+    run_monte_carlo_simulation, served from the cache when the inputs are unchanged.
+    Misses are computed on the simulation worker pool. Extra keyword arguments
+    (antithetic, sampler, control_variate) are forwarded and part of the key.
+    """
+    key = _cache_key(user_id, "single", [
+        _goal_inputs(goal), round(monthly_sip, 2), current_amount, risk_profile, n_simulations, return_model,
+        sorted(sampling.items()),
+    ])
+    result = simulation_cache.get(key)
+    if result is None:
+        result = await simulation_pool.run(
+            run_monte_carlo_simulation,
+            goal=goal,
+            monthly_sip=monthly_sip,
+            current_amount=current_amount,
+            risk_profile=risk_profile,
+            n_simulations=n_simulations,
+            return_model=return_model,
+            **sampling,
+        )
+        simulation_cache.set(key, result)
+    return result
+
+
+async def cached_monte_carlo_batch(
+    user_id: int,
+    goals: List[Dict[str, Any]],
+    risk_profile: str = "Moderate",
+    n_simulations: int = N_SIMULATIONS,
+    return_model: str = "normal",
+    **sampling: Any,
+) -> List[Dict[str, Any]]:
+    """run_monte_carlo_batch, served from the cache when none of the goal inputs changed."""
+    key = _cache_key(user_id, "batch", [
+        [[*_goal_inputs(g), round(g.get("monthly_sip", 0), 2), g.get("current_amount")] for g in goals],
+        risk_profile,
+        n_simulations,
+        return_model,
+        sorted(sampling.items()),
+    ])
+    results = simulation_cache.get(key)
+    if results is None:
+        results = await simulation_pool.run(
+            run_monte_carlo_batch, goals, risk_profile=risk_profile, n_simulations=n_simulations,
+            return_model=return_model, **sampling,
+        )
+        simulation_cache.set(key, results)
+    return results
+
+
+async def cached_required_sip(
+    user_id: int,
+    goal: Dict[str, Any],
+    current_amount: float,
+    risk_profile: str = "Moderate",
+    confidence_levels: Optional[List[float]] = None,
+    n_simulations: int = SIP_SOLVER_SIMULATIONS,
+    return_model: str = "normal",
+) -> Dict[str, Any]:
+    """solve_required_sip, served from the cache when the inputs are unchanged."""
+    key = _cache_key(user_id, "required_sip", [
+        _goal_inputs(goal), current_amount, risk_profile, confidence_levels, n_simulations, return_model,
+    ])
+    result = simulation_cache.get(key)
+    if result is None:
+        result = await simulation_pool.run(
+            solve_required_sip,
+            goal=goal,
+            current_amount=current_amount,
+            risk_profile=risk_profile,
+            confidence_levels=confidence_levels,
+            n_simulations=n_simulations,
+            return_model=return_model,
+        )
+        simulation_cache.set(key, result)
+    return result
+
+
+def invalidate_user(user_id: int) -> int:
+    """Drop all cached simulations for a user. Returns the number of entries removed."""
+    return simulation_cache.invalidate(lambda key: key[0] == user_id)
+
+
+def _on_row_change(mapper, connection, target):
+    if target.user_id is not None:
+        invalidate_user(target.user_id)
+
+
+for _model in (Goal, Investment, Profile):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _on_row_change)
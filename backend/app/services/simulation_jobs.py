@@ -0,0 +1,209 @@
+"""
+Simulation Job Runner
+=====================
+Background execution for /analytics/jobs. Each goal is simulated in batches of
+SIMULATION_JOB_BATCH_SIZE paths on the simulation worker pool; progress is
+committed after every batch and each finished goal result as soon as it is
+merged, so pollers see steady progress and partial results (and cones) early.
+
+Jobs live in the simulation_jobs table and are written through an AsyncSession,
+so the event loop never waits on the database. With several uvicorn workers
+every worker calls resume_unfinished_jobs() at startup; a job is only run by
+the worker whose UPDATE ... WHERE status = 'pending' claims it. Running jobs
+bump updated_at after every batch, and a running job whose heartbeat is older
+than SIMULATION_JOB_STALE_SECONDS is treated as abandoned and can be claimed
+again. On shutdown a worker hands its unfinished jobs back (status pending).
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select, update
+
+from ..ai.monte_carlo import merge_goal_batches, simulate_goal_batch
+from ..db.session import AsyncSessionLocal
+from ..models.simulation_job import SimulationJob
+from .simulation_pool import simulation_pool
+
+SIMULATION_JOB_BATCH_SIZE = int(os.getenv("SIMULATION_JOB_BATCH_SIZE", "5000"))
+SIMULATION_JOB_STALE_SECONDS = float(os.getenv("SIMULATION_JOB_STALE_SECONDS", "600"))
+
+# Strong references so running tasks are not garbage collected mid-flight
+_running_tasks: Set[asyncio.Task] = set()
+# Jobs this process has claimed and not finished
+_claimed_jobs: Set[str] = set()
+
+
+def create_job(
+    db,
+    user_id: int,
+    goal_inputs: List[Dict[str, Any]],
+    risk_profile: str,
+    n_simulations: int,
+    goal_id: Optional[int] = None,
+    return_model: str = "normal",
+) -> SimulationJob:
+    job = SimulationJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        goal_id=goal_id,
+        status="pending",
+        n_simulations=n_simulations,
+        goal_inputs=goal_inputs,
+        risk_profile=risk_profile,
+        return_model=return_model,
+        results=[],
+        completed_simulations=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def schedule_job(job_id: str) -> None:
+    task = asyncio.create_task(_run_job(job_id))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+
+
+def job_status(job: SimulationJob) -> Dict[str, Any]:
+    total = len(job.goal_inputs or [])
+    done = len(job.results or [])
+    total_simulations = total * (job.n_simulations or 0)
+    if job.status == "completed" or not total_simulations:
+        progress = 1.0
+    else:
+        progress = min(1.0, (job.completed_simulations or 0) / total_simulations)
+    return {
+        "job_id": job.id,
+        "goal_id": job.goal_id,
+        "status": job.status,
+        "n_simulations": job.n_simulations,
+        "return_model": job.return_model,
+        "total_goals": total,
+        "completed_goals": done,
+        "completed_simulations": job.completed_simulations or 0,
+        "progress": round(progress, 3),
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def _batch_sizes(n_simulations: int) -> List[int]:
+    full, rest = divmod(n_simulations, SIMULATION_JOB_BATCH_SIZE)
+    return [SIMULATION_JOB_BATCH_SIZE] * full + ([rest] if rest else [])
+
+
+async def _simulate_batch(
+    goal: Dict[str, Any], risk_profile: str, n_simulations: int, return_model: str, seed: int,
+) -> Dict[str, Any]:
+    # Background jobs wait for capacity instead of failing (and are not counted as rejected)
+    return await simulation_pool.run_when_free(
+        simulate_goal_batch,
+        goal=goal,
+        risk_profile=risk_profile,
+        n_simulations=n_simulations,
+        return_model=return_model,
+        seed=seed,
+    )
+
+
+def _claimable():
+    stale_before = datetime.utcnow() - timedelta(seconds=SIMULATION_JOB_STALE_SECONDS)
+    return or_(
+        SimulationJob.status == "pending",
+        and_(SimulationJob.status == "running", SimulationJob.updated_at < stale_before),
+    )
+
+
+async def _claim(db, job_id: str) -> bool:
+    """Atomically move a pending (or abandoned) job to running. False if another worker got it first."""
+    result = await db.execute(
+        update(SimulationJob)
+        .where(SimulationJob.id == job_id, _claimable())
+        .values(status="running", updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _update_running(db, job_id: str, **values) -> bool:
+    """Write values (and the heartbeat) to a running job. False once the job is no longer running here."""
+    result = await db.execute(
+        update(SimulationJob)
+        .where(SimulationJob.id == job_id, SimulationJob.status == "running")
+        .values(updated_at=datetime.utcnow(), **values)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _run_job(job_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        if not await _claim(db, job_id):
+            return
+        _claimed_jobs.add(job_id)
+        try:
+            job = await db.get(SimulationJob, job_id)
+            return_model = job.return_model or "normal"
+            results = list(job.results or [])
+            completed = len(results) * job.n_simulations
+            # The unfinished goal restarts from its first batch, so progress already
+            # committed for it is only overtaken, never lowered
+            committed = job.completed_simulations or 0
+
+            # Resume after the last committed goal result
+            for goal in job.goal_inputs[len(results):]:
+                batches = []
+                # Batch i uses seed 42 + i, so a one-batch job matches /analytics/monte-carlo exactly
+                for index, size in enumerate(_batch_sizes(job.n_simulations)):
+                    batches.append(await _simulate_batch(goal, job.risk_profile, size, return_model, 42 + index))
+                    completed += size
+                    if not await _update_running(db, job_id, completed_simulations=max(committed, completed)):
+                        return
+                result = await run_in_threadpool(merge_goal_batches, goal, batches, job.risk_profile, return_model)
+                results.append(result)
+                if not await _update_running(db, job_id, results=list(results)):
+                    return
+
+            await _update_running(db, job_id, status="completed")
+        except Exception as e:
+            print(f"[SimulationJobs] Job {job_id} failed: {e}")
+            await db.rollback()
+            await _update_running(db, job_id, status="failed", error=str(e))
+        finally:
+            _claimed_jobs.discard(job_id)
+
+
+async def resume_unfinished_jobs() -> int:
+    """
+    Schedule jobs left pending (or abandoned while running) by a previous process.
+    Each one is claimed atomically when it starts, so with several workers every
+    job still runs once. Returns how many were scheduled.
+    """
+    async with AsyncSessionLocal() as db:
+        job_ids = (await db.execute(select(SimulationJob.id).where(_claimable()))).scalars().all()
+    for job_id in job_ids:
+        schedule_job(job_id)
+    if job_ids:
+        print(f"[SimulationJobs] Resuming {len(job_ids)} unfinished job(s).")
+    return len(job_ids)
+
+
+async def release_claimed_jobs() -> int:
+    """Hand this process's unfinished jobs back (status pending) so the next worker to start resumes them."""
+    if not _claimed_jobs:
+        return 0
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(SimulationJob)
+            .where(SimulationJob.id.in_(list(_claimed_jobs)), SimulationJob.status == "running")
+            .values(status="pending")
+        )
+        await db.commit()
+    return result.rowcount
@@ -0,0 +1,92 @@
+"""
+Simulation Worker Pool
+======================
+Runs CPU-bound simulation work (Monte Carlo) in a dedicated pool of worker
+processes so NumPy-heavy requests never occupy the API's threadpool or event loop.
+
+The pool is started and stopped with the app's lifespan (see main.py). Callers
+await SimulationPool.run(...); when more than SIMULATION_QUEUE_LIMIT jobs are
+already in flight it raises SimulationPoolSaturated, which routers turn into
+HTTP 429 so clients back off instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+SIMULATION_QUEUE_LIMIT = int(os.getenv("SIMULATION_QUEUE_LIMIT", "32"))
+# How often run_when_free checks for a free slot
+CAPACITY_POLL_SECONDS = 0.25
+
+
+class SimulationPoolSaturated(Exception):
+    """Raised when the pool already has queue_limit jobs in flight."""
+
+
+class SimulationPool:
+    def __init__(self, max_workers: int = SIMULATION_WORKERS, queue_limit: int = SIMULATION_QUEUE_LIMIT):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            # spawn keeps workers independent of the server's threads and open DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            print(f"[SimulationPool] Started with {self.max_workers} worker(s), queue limit {self.queue_limit}.")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) in a worker process and await its result.
+        fn and its arguments must be picklable (module-level functions, plain data).
+        """
+        if self._in_flight >= self.queue_limit:
+            self.rejected += 1
+            raise SimulationPoolSaturated(
+                f"Simulation queue is full ({self._in_flight}/{self.queue_limit} jobs in flight)."
+            )
+        self.start()
+        self._in_flight += 1
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+            result = await asyncio.wrap_future(future)
+            self.completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    async def run_when_free(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        run(), but wait for a free slot instead of raising SimulationPoolSaturated.
+        For background work: waiting is not counted as a rejection.
+        """
+        while self._in_flight >= self.queue_limit:
+            await asyncio.sleep(CAPACITY_POLL_SECONDS)
+        # No await between the check and run(), so the slot cannot be taken in between
+        return await self.run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+simulation_pool = SimulationPool()
@@ -0,0 +1,242 @@
+"""
+User Financial Context Loader
+=============================
+Loads a user's profile, goals and investments as one typed, read-only snapshot
+for the AI features (chatbot, recommendations, reports) and analytics.
+
+The user row, profile and goals come back from a single joined SELECT; the
+investments (which can run into hundreds of Zerodha holdings) follow in one
+selectin query, so they are not multiplied by the goal rows. Routers call
+load_user_snapshot (sync Session) or load_user_snapshot_async (AsyncSession)
+and use snapshot.to_context() for the dict the AI modules expect.
+
+get_user_snapshot / get_user_snapshot_async serve snapshots from a per-user
+TTL cache. The cache is in-process (TTL + LRU) by default, or shared through a
+Redis-compatible server with SNAPSHOT_CACHE_BACKEND=redis when running several
+workers. Endpoints that write a user's profile, goals or investments call
+invalidate_user_snapshot after committing. Invalidation also bumps the user's
+cache generation, and a snapshot is only stored if the generation is unchanged
+since its load began, so a load racing a write cannot cache the pre-write data.
+"""
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from ..core.cache import LRUCache, RedisCache
+from ..models.user import User
+
+SNAPSHOT_CACHE_BACKEND = os.getenv("SNAPSHOT_CACHE_BACKEND", "memory")  # memory | redis
+SNAPSHOT_CACHE_REDIS_URL = os.getenv("SNAPSHOT_CACHE_REDIS_URL", "redis://localhost:6379/0")
+SNAPSHOT_CACHE_TTL_SECONDS = float(os.getenv("SNAPSHOT_CACHE_TTL_SECONDS", "300"))
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    age: Optional[int] = None
+    occupation: Optional[str] = None
+    monthly_income: float = 0.0
+    monthly_expenses: float = 0.0
+    risk_profile: str = "Moderate"
+    location: str = ""
+    tax_regime: str = "New"
+    deductions_80c: float = 0.0
+    deductions_80d: float = 0.0
+    other_deductions: float = 0.0
+
+
+@dataclass(frozen=True)
+class GoalSnapshot:
+    id: int
+    name: str
+    target_amount: float
+    target_date: str
+    current_amount: float
+    priority: Optional[str]
+    category: Optional[str]
+
+
+@dataclass(frozen=True)
+class InvestmentSnapshot:
+    id: int
+    name: str
+    type: str
+    amount: float
+    frequency: Optional[str]
+    expected_return: Optional[float]
+    is_tax_saving: bool
+    goal_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    user_id: int
+    full_name: Optional[str]
+    email: str
+    profile: Optional[ProfileSnapshot] = None
+    goals: Tuple[GoalSnapshot, ...] = ()
+    investments: Tuple[InvestmentSnapshot, ...] = ()
+
+    def goal(self, goal_id: int) -> Optional[GoalSnapshot]:
+        return next((g for g in self.goals if g.id == goal_id), None)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserSnapshot":
+        data = json.loads(raw)
+        return cls(
+            user_id=data["user_id"],
+            full_name=data["full_name"],
+            email=data["email"],
+            profile=ProfileSnapshot(**data["profile"]) if data["profile"] else None,
+            goals=tuple(GoalSnapshot(**g) for g in data["goals"]),
+            investments=tuple(InvestmentSnapshot(**i) for i in data["investments"]),
+        )
+
+    def to_context(self) -> Dict[str, Any]:
+        """The user_context dict consumed by ai/chatbot.py and ai/report_generator.py."""
+        profile = self.profile or ProfileSnapshot()
+        return {
+            "profile": {"full_name": self.full_name, **asdict(profile)},
+            "investments": [
+                {
+                    "name": inv.name,
+                    "type": inv.type,
+                    "amount": inv.amount,
+                    "frequency": inv.frequency,
+                    "expected_return": inv.expected_return,
+                    "is_tax_saving": inv.is_tax_saving,
+                }
+                for inv in self.investments
+            ],
+            "goals": [
+                {
+                    "name": goal.name,
+                    "target_amount": goal.target_amount,
+                    "current_amount": goal.current_amount,
+                    "target_date": goal.target_date,
+                    "priority": goal.priority,
+                    "category": goal.category,
+                }
+                for goal in self.goals
+            ],
+        }
+
+
+def _snapshot_query(user_id: int):
+    return (
+        select(User)
+        .where(User.id == user_id)
+        .options(
+            joinedload(User.profile),
+            joinedload(User.goals),
+            selectinload(User.investments),
+        )
+    )
+
+
+def _to_snapshot(user: User) -> UserSnapshot:
+    profile = user.profile
+    return UserSnapshot(
+        user_id=user.id,
+        full_name=user.full_name,
+        email=user.email,
+        profile=ProfileSnapshot(
+            age=profile.age,
+            occupation=profile.occupation,
+            monthly_income=profile.monthly_income or 0.0,
+            monthly_expenses=profile.monthly_expenses or 0.0,
+            risk_profile=profile.risk_profile or "Moderate",
+            location=profile.location or "",
+            tax_regime=profile.tax_regime or "New",
+            deductions_80c=profile.deductions_80c or 0.0,
+            deductions_80d=profile.deductions_80d or 0.0,
+            other_deductions=profile.other_deductions or 0.0,
+        ) if profile else None,
+        goals=tuple(
+            GoalSnapshot(
+                id=goal.id,
+                name=goal.name,
+                target_amount=goal.target_amount,
+                target_date=goal.target_date,
+                current_amount=goal.current_amount or 0.0,
+                priority=goal.priority,
+                category=goal.category,
+            )
+            for goal in sorted(user.goals, key=lambda g: g.id)
+        ),
+        investments=tuple(
+            InvestmentSnapshot(
+                id=inv.id,
+                name=inv.name,
+                type=inv.type,
+                amount=inv.amount or 0.0,
+                frequency=inv.frequency,
+                expected_return=inv.expected_return,
+                is_tax_saving=bool(inv.is_tax_saving),
+                goal_id=inv.goal_id,
+            )
+            for inv in sorted(user.investments, key=lambda i: i.id)
+        ),
+    )
+
+
+def load_user_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    """Profile, goals and investments for user_id, or None if the user does not exist."""
+    user = db.execute(_snapshot_query(user_id)).unique().scalar_one_or_none()
+    return _to_snapshot(user) if user else None
+
+
+async def load_user_snapshot_async(db: AsyncSession, user_id: int) -> Optional[UserSnapshot]:
+    """load_user_snapshot for async routers."""
+    user = (await db.execute(_snapshot_query(user_id))).unique().scalar_one_or_none()
+    return _to_snapshot(user) if user else None
+
+
+def _make_snapshot_cache():
+    if SNAPSHOT_CACHE_BACKEND == "redis":
+        return RedisCache(
+            SNAPSHOT_CACHE_REDIS_URL,
+            prefix="user_snapshot",
+            ttl_seconds=SNAPSHOT_CACHE_TTL_SECONDS,
+            dumps=UserSnapshot.to_json,
+            loads=UserSnapshot.from_json,
+        )
+    return LRUCache(max_size=SNAPSHOT_CACHE_SIZE, ttl_seconds=SNAPSHOT_CACHE_TTL_SECONDS)
+
+
+snapshot_cache = _make_snapshot_cache()
+
+
+def get_user_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    """load_user_snapshot, served from the snapshot cache when present."""
+    snapshot = snapshot_cache.get(user_id)
+    if snapshot is None:
+        generation = snapshot_cache.generation(user_id)
+        snapshot = load_user_snapshot(db, user_id)
+        if snapshot is not None:
+            snapshot_cache.set_if_generation(user_id, snapshot, generation)
+    return snapshot
+
+
+async def get_user_snapshot_async(db: AsyncSession, user_id: int) -> Optional[UserSnapshot]:
+    """get_user_snapshot for async routers."""
+    snapshot = snapshot_cache.get(user_id)
+    if snapshot is None:
+        generation = snapshot_cache.generation(user_id)
+        snapshot = await load_user_snapshot_async(db, user_id)
+        if snapshot is not None:
+            snapshot_cache.set_if_generation(user_id, snapshot, generation)
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id: int) -> None:
+    """Drop a user's cached snapshot. Call after committing a change to their profile, goals or investments."""
+    snapshot_cache.bump_generation(user_id)
@@ -1,13 +1,18 @@
 import os
-from kiteconnect import KiteConnect
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from kiteconnect import KiteConnect
 
 class ZerodhaService:
     def __init__(self, api_key: str, api_secret: str):
         self.api_key = api_key
         self.api_secret = api_secret
 
-    def _get_kite_instance(self, access_token: str = None) -> KiteConnect:
+    def _get_kite_instance(self, access_token: str = None) -> "KiteConnect":
         """Returns an initialized KiteConnect instance. Optionally with an access token."""
+        # kiteconnect is slow to import; load it on first use (see core/preload.py)
+        from kiteconnect import KiteConnect
         kite = KiteConnect(api_key=self.api_key)
         if access_token:
             kite.set_access_token(access_token)
@@ -18,7 +18,7 @@ const SUGGESTED_PROMPTS = [
     { icon: TrendingUp, text: "Best mutual funds to invest in right now?", color: "text-rose-600 bg-rose-50" },
 ];
 
-const TypingIndicator = () => (
+const TypingIndicator = ({ status }) => (
     <div className="flex items-start gap-3 mb-6">
         <div className="w-9 h-9 rounded-2xl bg-slate-900 flex items-center justify-center flex-shrink-0 shadow-lg">
             <Bot className="w-5 h-5 text-white" />
@@ -28,6 +28,13 @@ const TypingIndicator = () => (
                 <div className="w-2 h-2 rounded-full bg-slate-400 animate-bounce" style={{ animationDelay: '0ms' }} />
                 <div className="w-2 h-2 rounded-full bg-slate-400 animate-bounce" style={{ animationDelay: '150ms' }} />
                 <div className="w-2 h-2 rounded-full bg-slate-400 animate-bounce" style={{ animationDelay: '300ms' }} />
+                {/* Tool progress from the streaming endpoint, e.g. "Searching the web…" */}
+                {status && (
+                    <span className="ml-2 flex items-center gap-1.5 text-xs font-bold text-slate-400">
+                        <Globe className="w-3.5 h-3.5 text-accent" />
+                        {status}
+                    </span>
+                )}
             </div>
         </div>
     </div>
@@ -104,6 +111,8 @@ const Chatbot = () => {
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
     const [showSuggestions, setShowSuggestions] = useState(true);
+    const [toolStatus, setToolStatus] = useState(null);
+    const [sessionId, setSessionId] = useState(null); // Server-side conversation (history lives there)
     const chatEndRef = useRef(null);
     const inputRef = useRef(null);
     const navigate = useNavigate();
@@ -128,12 +137,31 @@ const Chatbot = () => {
         setShowSuggestions(false);
         setLoading(true);
 
+        // Stream the reply into an assistant bubble as tokens arrive
+        let streamed = '';
+        const showReply = (content) => setMessages([...newMessages, { role: 'assistant', content }]);
+
         try {
-            const reply = await chatbotService.sendMessage(
+            const { reply, sessionId: nextSessionId } = await chatbotService.streamMessage(
                 text.trim(),
-                messages // Send existing history (before this message)
+                sessionId, // Only the new message is sent; the server holds the history
+                {
+                    onToken: (token) => {
+                        streamed += token;
+                        setToolStatus(null);
+                        showReply(streamed);
+                    },
+                    onToolStart: (status) => {
+                        // Text before a tool call is the model thinking aloud; the answer follows the tool
+                        streamed = '';
+                        setMessages(newMessages);
+                        setToolStatus(status);
+                    },
+                    onToolEnd: () => setToolStatus(null),
+                }
             );
-            setMessages([...newMessages, { role: 'assistant', content: reply }]);
+            setSessionId(nextSessionId);
+            showReply(reply || streamed);
         } catch (err) {
             console.error('Chatbot error:', err);
             setMessages([
@@ -145,6 +173,7 @@ const Chatbot = () => {
             ]);
         } finally {
             setLoading(false);
+            setToolStatus(null);
             inputRef.current?.focus();
         }
     };
@@ -241,8 +270,10 @@ const Chatbot = () => {
                             <ChatMessage key={i} message={msg} />
                         ))}
 
-                        {/* Typing indicator */}
-                        {loading && <TypingIndicator />}
+                        {/* Typing indicator (until the first streamed token arrives) */}
+                        {loading && messages[messages.length - 1]?.role !== 'assistant' && (
+                            <TypingIndicator status={toolStatus} />
+                        )}
 
                         <div ref={chatEndRef} />
                     </div>
@@ -13,4 +13,34 @@ export const analyticsService = {
         const response = await api.get('/analytics/monte-carlo-all');
         return response.data;
     },
+    /**
+     * Minimum monthly SIP for each target success probability.
+     * @param {number} goalId
+     * @param {number[]} confidence - Success probabilities in percent, e.g. [50, 75, 90]
+     */
+    getRequiredSip: async (goalId, confidence = [50, 75, 90]) => {
+        const response = await api.get(`/analytics/required-sip/${goalId}`, {
+            params: { confidence },
+            paramsSerializer: { indexes: null },
+        });
+        return response.data;
+    },
+    /**
+     * Submit a background Monte Carlo job.
+     * @param {number|null} goalId - A single goal, or null for all goals
+     * @param {number} nSimulations - Paths per goal
+     */
+    submitSimulationJob: async (goalId = null, nSimulations = 1000) => {
+        const response = await api.post('/analytics/jobs', { goal_id: goalId, n_simulations: nSimulations });
+        return response.data;
+    },
+    getSimulationJob: async (jobId) => {
+        const response = await api.get(`/analytics/jobs/${jobId}`);
+        return response.data;
+    },
+    /** Finished goal results so far; `partial` is true until the job completes. */
+    getSimulationJobResult: async (jobId) => {
+        const response = await api.get(`/analytics/jobs/${jobId}/result`);
+        return response.data;
+    },
 };
@@ -2,13 +2,73 @@ import api from './authService';
 
 export const chatbotService = {
     /**
-     * Send a message to the AI chatbot.
+     * Send a message to the AI chatbot. The conversation is kept on the server;
+     * pass the session id returned by the previous turn (null starts a new session).
      * @param {string} message - The user's message
-     * @param {Array} history - Array of { role: 'user'|'assistant', content: string }
-     * @returns {Promise<string>} The AI's reply
+     * @param {string|null} sessionId - Chat session id
+     * @returns {Promise<{reply: string, sessionId: string}>} The AI's reply and the session id
      */
-    sendMessage: async (message, history = []) => {
-        const response = await api.post('/chatbot/chat', { message, history });
-        return response.data.reply;
+    sendMessage: async (message, sessionId = null) => {
+        const response = await api.post('/chatbot/chat', { message, session_id: sessionId });
+        return { reply: response.data.reply, sessionId: response.data.session_id };
+    },
+
+    /**
+     * Send a message and stream the reply as it is generated (Server-Sent Events).
+     * @param {string} message - The user's message
+     * @param {string|null} sessionId - Chat session id (null starts a new session)
+     * @param {Object} handlers - { onToken(text), onToolStart(status), onToolEnd() }
+     * @returns {Promise<{reply: string, sessionId: string}>} The complete reply and the session id
+     */
+    streamMessage: async (message, sessionId = null, handlers = {}) => {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${api.defaults.baseURL}/chatbot/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            body: JSON.stringify({ message, session_id: sessionId }),
+        });
+
+        if (response.status === 401) {
+            localStorage.removeItem('token');
+            window.location.href = '/login';
+        }
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat stream failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let reply = '';
+        let streamSessionId = sessionId;
+
+        // Each SSE frame is "event: <type>\ndata: <json>\n\n"; the JSON carries the type too
+        const handleFrame = (frame) => {
+            const data = frame.split('\n').find((line) => line.startsWith('data: '));
+            if (!data) return;
+            const event = JSON.parse(data.slice(6));
+            if (event.type === 'token') handlers.onToken?.(event.content);
+            else if (event.type === 'tool_start') handlers.onToolStart?.(event.status);
+            else if (event.type === 'tool_end') handlers.onToolEnd?.();
+            else if (event.type === 'done') {
+                reply = event.reply;
+                streamSessionId = event.session_id;
+            }
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            frames.forEach(handleFrame);
+        }
+        if (buffer.trim()) handleFrame(buffer);
+
+        return { reply, sessionId: streamSessionId };
     },
 };
@@ -0,0 +1,126 @@
+"""
+Benchmark: per-request overhead of the chatbot's ReAct agent when the LangGraph
+graph is rebuilt for every request (create_react_agent with the user's system
+prompt baked in) vs compiled once and reused with the system prompt passed in
+the input state (backend/app/ai/chatbot.py).
+
+The LLM is the local FakeChatModel from app/ai/registry.py, so the numbers are
+pure framework overhead: no network, no tokens. The agent is given one (never
+called) tool so the tool-binding and ToolNode setup are included, as with Exa.
+
+Run from the repo root:
+    python scripts/bench_agents.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+from langgraph.prebuilt import create_react_agent  # noqa: E402
+
+from app.ai import chatbot, registry  # noqa: E402
+
+# create_react_agent warns about its langchain.agents move on every call
+warnings.simplefilter("ignore")
+
+N_REQUESTS = 200
+WARMUP = 10
+
+USER_CONTEXT = {
+    "profile": {"full_name": "Bench User", "age": 32, "monthly_income": 150_000, "monthly_expenses": 70_000},
+    "investments": [
+        {"name": f"Fund {i}", "type": "Mutual Fund", "amount": 10_000 * (i + 1), "frequency": "Monthly", "expected_return": 12}
+        for i in range(10)
+    ],
+    "goals": [{"name": "Retirement", "target_amount": 5e7, "current_amount": 2e6, "target_date": "2050-01-01"}],
+}
+
+
+@tool
+def web_search(query: str) -> str:
+    """Search the web (stand-in for the Exa tool; never called by the fake model)."""
+    return ""
+
+
+TOOLS = [web_search]
+
+
+def _request_messages(i: int) -> list:
+    return [HumanMessage(content=f"Should I increase my SIP this month? ({i})")]
+
+
+async def _rebuild_per_request(llm, i: int):
+    system_prompt = chatbot._build_system_prompt(USER_CONTEXT)
+    agent = create_react_agent(model=llm, tools=TOOLS, prompt=system_prompt)
+    return await agent.ainvoke({"messages": _request_messages(i)}, config={"recursion_limit": chatbot.AGENT_RECURSION_LIMIT})
+
+
+def _compiled_once(llm):
+    agent = create_react_agent(
+        model=llm, tools=TOOLS, prompt=chatbot._with_system_prompt, state_schema=chatbot.AdvisorState,
+    )
+
+    async def run(_, i: int):
+        system_prompt = chatbot._build_system_prompt(USER_CONTEXT)
+        return await agent.ainvoke(
+            {"messages": _request_messages(i), "system_prompt": system_prompt},
+            config={"recursion_limit": chatbot.AGENT_RECURSION_LIMIT},
+        )
+
+    return run
+
+
+async def _time_requests(fn, llm) -> list:
+    for i in range(WARMUP):
+        await fn(llm, i)
+    samples = []
+    for i in range(N_REQUESTS):
+        start = time.perf_counter()
+        result = await fn(llm, i)
+        samples.append((time.perf_counter() - start) * 1000)
+    assert result["messages"][-1].content == registry.FAKE_REPLY
+    return samples
+
+
+def _compile_ms(llm) -> float:
+    start = time.perf_counter()
+    for _ in range(N_REQUESTS):
+        create_react_agent(model=llm, tools=TOOLS, prompt="system prompt")
+    return (time.perf_counter() - start) * 1000 / N_REQUESTS
+
+
+async def main():
+    llm = registry.use_fake_llm()
+
+    rebuild = await _time_requests(_rebuild_per_request, llm)
+    reuse = await _time_requests(_compiled_once(llm), llm)
+
+    # End to end through the public API (snapshot context -> prompt -> shared agent)
+    async def public_api(_, i):
+        reply = await chatbot.generate_chat_response(f"Hello ({i})", [], USER_CONTEXT)
+        return {"messages": [HumanMessage(content=reply)]}
+
+    public = await _time_requests(public_api, llm)
+
+    print(f"{N_REQUESTS} requests per mode, fake LLM (framework overhead only)\n")
+    print(f"create_react_agent alone:            {_compile_ms(llm):7.2f} ms per call\n")
+    print(f"{'mode':>32} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for label, samples in [
+        ("rebuild graph per request", rebuild),
+        ("compiled once, prompt in state", reuse),
+        ("generate_chat_response (no Exa)", public),
+    ]:
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(f"{label:>32} {statistics.mean(samples):9.2f} {statistics.median(samples):9.2f} {p95:9.2f}")
+    print(f"\nPer-request overhead saved: {statistics.mean(rebuild) - statistics.mean(reuse):.2f} ms "
+          f"({statistics.mean(rebuild) / statistics.mean(reuse):.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark: read/write throughput of the SQLite engine under concurrent requests,
+with a default engine (rollback journal, default pool) vs the tuned engine from
+backend/app/db/session.py (WAL, synchronous=NORMAL, mmap/cache pragmas, sized pool).
+
+Each worker thread plays the role of a FastAPI threadpool request: it opens a
+session, either reads a user's goals and investments (dashboard-style) or edits
+a goal and records an investment (goal edit / portfolio sync), and closes it.
+
+Run from the repo root:
+    python scripts/bench_db.py
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.session import Base, make_engine  # noqa: E402
+from app.models import simulation_job  # noqa: E402,F401  (registers the table)
+from app.models.user import User, Goal, Investment  # noqa: E402
+
+N_USERS = 200
+GOALS_PER_USER = 5
+INVESTMENTS_PER_USER = 20
+THREAD_COUNTS = [1, 8, 32]
+OPS_PER_THREAD = 300
+WRITE_RATIOS = [0.1, 0.5]
+
+
+def _seed(Session) -> None:
+    db = Session()
+    for u in range(N_USERS):
+        user = User(email=f"user{u}@bench.local", hashed_password="x", full_name=f"User {u}")
+        db.add(user)
+        db.flush()
+        for g in range(GOALS_PER_USER):
+            db.add(Goal(user_id=user.id, name=f"Goal {g}", target_amount=1e6, target_date="2035-01-01"))
+        for i in range(INVESTMENTS_PER_USER):
+            db.add(Investment(user_id=user.id, name=f"Fund {i}", amount=1000.0 * i, type="Mutual Fund"))
+    db.commit()
+    db.close()
+
+
+def _read(db, user_id: int) -> None:
+    db.query(Goal).filter(Goal.user_id == user_id).all()
+    db.query(Investment).filter(Investment.user_id == user_id).all()
+
+
+def _write(db, user_id: int) -> None:
+    goal = db.query(Goal).filter(Goal.user_id == user_id).first()
+    goal.current_amount = (goal.current_amount or 0) + 100
+    db.add(Investment(user_id=user_id, name="SIP", amount=100.0, type="Mutual Fund"))
+    db.commit()
+
+
+def _worker(Session, write_ratio: float, seed: int, latencies: dict, errors: list) -> None:
+    rng = random.Random(seed)
+    for _ in range(OPS_PER_THREAD):
+        kind = "write" if rng.random() < write_ratio else "read"
+        db = Session()
+        start = time.perf_counter()
+        try:
+            (_write if kind == "write" else _read)(db, rng.randint(1, N_USERS))
+            latencies[kind].append(time.perf_counter() - start)
+        except OperationalError:
+            errors.append(kind)
+            db.rollback()
+        finally:
+            db.close()
+
+
+def _run(tuned: bool, threads: int, write_ratio: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", tuned=tuned)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _seed(Session)
+
+        latencies = {"read": [], "write": []}
+        errors = []
+        workers = [
+            threading.Thread(target=_worker, args=(Session, write_ratio, seed, latencies, errors))
+            for seed in range(threads)
+        ]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] * 1000 if values else 0.0
+
+    return {
+        "ops_per_s": (len(latencies["read"]) + len(latencies["write"])) / elapsed,
+        "read_p95_ms": p95(latencies["read"]),
+        "write_p95_ms": p95(latencies["write"]),
+        "errors": len(errors),
+    }
+
+
+def main():
+    print(
+        f"{'writes':>7} {'threads':>8} {'engine':>8} {'ops/s':>9} "
+        f"{'read p95 (ms)':>14} {'write p95 (ms)':>15} {'errors':>7}"
+    )
+    for write_ratio in WRITE_RATIOS:
+        for threads in THREAD_COUNTS:
+            for tuned in (False, True):
+                r = _run(tuned, threads, write_ratio)
+                print(
+                    f"{write_ratio:>7.0%} {threads:>8} {'tuned' if tuned else 'default':>8} {r['ops_per_s']:>9.0f} "
+                    f"{r['read_p95_ms']:>14.2f} {r['write_p95_ms']:>15.2f} {r['errors']:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark: legacy loop-based Monte Carlo engine vs the vectorized engine
+in backend/app/ai/monte_carlo.py, per-goal vs batched multi-goal runs,
+peak memory of the full-matrix vs streaming modes, and the cost of each
+return model against the legacy normal engine. Also checks that the streaming
+mode's regime chain (carried across chunks) matches the full-matrix percentiles.
+
+Run from the repo root:
+    python scripts/bench_monte_carlo.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.ai import monte_carlo  # noqa: E402
+from app.ai.monte_carlo import run_monte_carlo_simulation, run_monte_carlo_batch, _monthly_params  # noqa: E402
+
+HORIZONS_MONTHS = [60, 240, 360]
+SIM_COUNTS = [1_000, 10_000, 50_000]
+GOAL_COUNTS = [1, 5, 10, 20]
+MODEL_CASES = [(1_000, 360), (10_000, 360), (50_000, 240)]
+MEMORY_CASES = [(10_000, 480), (50_000, 480), (100_000, 480)]
+VARIANCE_CASES = [
+    ("plain", {}),
+    ("antithetic", {"antithetic": True}),
+    ("sobol", {"sampler": "sobol"}),
+    ("control variate", {"control_variate": True}),
+    ("antithetic + cv", {"antithetic": True, "control_variate": True}),
+]
+TARGET_HALF_WIDTH_PCT = 1.0  # 95% CI of +/- 1 percentage point
+# (target amount, label): same SIP and horizon, from near-certain to borderline
+ADAPTIVE_CASES = [(1e6, "easy"), (1e8, "hopeless"), (3e6, "borderline"), (4e6, "borderline")]
+REPEATS = 3
+# Streaming vs full-matrix regime percentiles must agree within this (Monte Carlo noise at 100k paths is ~0.5%)
+REGIME_STREAM_TOLERANCE_PCT = 2.0
+
+
+def legacy_simulation(target_amount, months_left, monthly_sip, current_amount, risk_profile, n_simulations):
+    """The original engine: Python loop over months, np.where per path, one percentile call per cell."""
+    monthly_mean, monthly_vol = _monthly_params(risk_profile)
+    rng = np.random.default_rng(seed=42)
+    monthly_returns = rng.normal(monthly_mean, monthly_vol, size=(n_simulations, months_left))
+
+    portfolio = np.zeros((n_simulations, months_left + 1))
+    portfolio[:, 0] = current_amount
+    for month in range(months_left):
+        portfolio[:, month + 1] = (portfolio[:, month] + monthly_sip) * (1 + monthly_returns[:, month])
+
+    final_values = portfolio[:, -1]
+    step = max(1, months_left // 36)
+    time_points = list(range(0, months_left + 1, step))
+    if time_points[-1] != months_left:
+        time_points.append(months_left)
+    cone = [[np.percentile(portfolio[:, t], p) for p in (10, 25, 50, 75, 90)] for t in time_points]
+
+    hit_months = []
+    for sim_idx in range(n_simulations):
+        crossed = np.where(portfolio[sim_idx] >= target_amount)[0]
+        if len(crossed) > 0:
+            hit_months.append(crossed[0])
+    return float(np.mean(final_values >= target_amount) * 100), cone, hit_months
+
+
+def _target_date(months: int) -> str:
+    now = datetime.now()
+    total = now.year * 12 + (now.month - 1) + months
+    return f"{total // 12:04d}-{total % 12 + 1:02d}-01"
+
+
+def _best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_engines():
+    sip, current, risk = 25_000.0, 500_000.0, "Moderate"
+    print(f"{'months':>7} {'sims':>8} {'legacy (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8} {'P(success) legacy/new':>24}")
+    for months in HORIZONS_MONTHS:
+        target = 1_500_000.0 * months / 12
+        goal = {"name": "Bench", "target_amount": target, "target_date": _target_date(months)}
+        for n_sims in SIM_COUNTS:
+            legacy_t = _best_of(lambda: legacy_simulation(target, months, sip, current, risk, n_sims))
+            new_t = _best_of(lambda: run_monte_carlo_simulation(goal, sip, current, risk, n_simulations=n_sims))
+            legacy_prob = legacy_simulation(target, months, sip, current, risk, n_sims)[0]
+            new_prob = run_monte_carlo_simulation(goal, sip, current, risk, n_simulations=n_sims)["probability_of_success"]
+            print(
+                f"{months:>7} {n_sims:>8} {legacy_t * 1000:>12.1f} {new_t * 1000:>16.1f} "
+                f"{legacy_t / new_t:>7.1f}x {legacy_prob:>11.1f} / {new_prob:<10.1f}"
+            )
+
+
+def bench_batch():
+    print(f"\n{'goals':>6} {'per-goal (ms)':>14} {'batched (ms)':>13} {'speedup':>8}")
+    for n_goals in GOAL_COUNTS:
+        goals = [
+            {
+                "name": f"Goal {i}",
+                "target_amount": 2_000_000.0 * (i + 1),
+                "target_date": _target_date(24 + 12 * i),
+                "current_amount": 100_000.0,
+                "monthly_sip": 15_000.0,
+            }
+            for i in range(n_goals)
+        ]
+        per_goal_t = _best_of(lambda: [
+            run_monte_carlo_simulation(g, g["monthly_sip"], g["current_amount"], "Moderate") for g in goals
+        ])
+        batch_t = _best_of(lambda: run_monte_carlo_batch(goals, "Moderate"))
+        print(f"{n_goals:>6} {per_goal_t * 1000:>14.1f} {batch_t * 1000:>13.1f} {per_goal_t / batch_t:>7.1f}x")
+
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, elapsed
+
+
+def bench_memory():
+    print(f"\n{'sims':>8} {'months':>7} {'full peak (MB)':>15} {'full (ms)':>10} {'stream peak (MB)':>17} {'stream (ms)':>12}")
+    for n_sims, months in MEMORY_CASES:
+        goal = {"name": "Bench", "target_amount": 5e7, "target_date": _target_date(months)}
+        full_mb, full_t = _peak_mb(lambda: run_monte_carlo_simulation(goal, 20_000.0, 0.0, n_simulations=n_sims, streaming=False))
+        stream_mb, stream_t = _peak_mb(lambda: run_monte_carlo_simulation(goal, 20_000.0, 0.0, n_simulations=n_sims, streaming=True))
+        print(f"{n_sims:>8} {months:>7} {full_mb:>15.1f} {full_t * 1000:>10.1f} {stream_mb:>17.1f} {stream_t * 1000:>12.1f}")
+
+
+def bench_return_models():
+    # Synthetic fat-tailed history so the bootstrap model can run without a real data file
+    history = np.random.default_rng(7).standard_t(3, size=360) * 0.045 + 0.01
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.write("\n".join(f"{r:.6f}" for r in history))
+    monte_carlo.HISTORICAL_RETURNS_FILE = f.name
+
+    models = list(monte_carlo.RETURN_MODELS)
+    print(f"\n{'sims':>8} {'months':>7} {'legacy normal (ms)':>19} " + " ".join(f"{m + ' (ms)':>16}" for m in models))
+    try:
+        for n_sims, months in MODEL_CASES:
+            goal = {"name": "Bench", "target_amount": 5e7, "target_date": _target_date(months)}
+            legacy_t = _best_of(lambda: legacy_simulation(5e7, months, 20_000.0, 0.0, "Moderate", n_sims))
+            model_ts = [
+                _best_of(lambda: run_monte_carlo_simulation(goal, 20_000.0, 0.0, n_simulations=n_sims, return_model=m))
+                for m in models
+            ]
+            print(f"{n_sims:>8} {months:>7} {legacy_t * 1000:>19.1f} " + " ".join(f"{t * 1000:>16.1f}" for t in model_ts))
+    finally:
+        os.unlink(f.name)
+
+
+def check_regime_streaming():
+    goal = {"name": "Bench", "target_amount": 5e7, "target_date": _target_date(360)}
+    keys = [("pessimistic_final_value", "p10"), ("median_final_value", "p50"), ("optimistic_final_value", "p90")]
+    results = {
+        streaming: run_monte_carlo_simulation(
+            goal, 20_000.0, 0.0, n_simulations=100_000, return_model="regime", streaming=streaming,
+        )
+        for streaming in (False, True)
+    }
+    print(f"\n{'regime':>8} {'full':>16} {'streaming':>16} {'diff':>7}")
+    for key, label in keys:
+        full, stream = results[False][key], results[True][key]
+        diff = (stream - full) / full * 100
+        print(f"{label:>8} {full:>16,.0f} {stream:>16,.0f} {diff:>6.2f}%")
+        if abs(diff) > REGIME_STREAM_TOLERANCE_PCT:
+            raise SystemExit(f"Streaming regime {label} differs from the full-matrix run by {diff:.2f}%")
+
+
+def bench_variance_reduction():
+    # A goal near 70% success, where the probability estimate is noisiest
+    goal = {"name": "Bench", "target_amount": 3e6, "target_date": _target_date(120)}
+    n_sims = 1_000
+    print(f"\n{'method':>16} {'P(success)':>11} {'std err':>8} {'time (ms)':>10} {'sims for +/-1pp':>16}")
+    for label, options in VARIANCE_CASES:
+        result = run_monte_carlo_simulation(goal, 15_000.0, 200_000.0, n_simulations=n_sims, **options)
+        elapsed = _best_of(lambda: run_monte_carlo_simulation(goal, 15_000.0, 200_000.0, n_simulations=n_sims, **options))
+        std_error = result["probability_std_error"]
+        needed = result["n_simulations"] * (1.96 * std_error / TARGET_HALF_WIDTH_PCT) ** 2
+        print(
+            f"{label:>16} {result['probability_of_success']:>10.1f}% {std_error:>8.2f} "
+            f"{elapsed * 1000:>10.1f} {needed:>16,.0f}"
+        )
+
+
+def bench_adaptive():
+    print(f"\n{'goal':>11} {'fixed paths':>12} {'fixed (ms)':>11} {'adaptive paths':>15} {'adaptive (ms)':>14} {'std err':>8}")
+    fixed_n = monte_carlo.ADAPTIVE_MAX_SIMULATIONS // 4
+    for target, label in ADAPTIVE_CASES:
+        goal = {"name": "Bench", "target_amount": target, "target_date": _target_date(120)}
+        fixed_t = _best_of(lambda: run_monte_carlo_simulation(goal, 15_000.0, 200_000.0, n_simulations=fixed_n))
+        run = lambda: run_monte_carlo_simulation(
+            goal, 15_000.0, 200_000.0, n_simulations=monte_carlo.ADAPTIVE_MIN_SIMULATIONS, adaptive=True,
+        )
+        adaptive_t = _best_of(run)
+        result = run()
+        print(
+            f"{label:>11} {fixed_n:>12,} {fixed_t * 1000:>11.1f} {result['n_simulations']:>15,} "
+            f"{adaptive_t * 1000:>14.1f} {result['probability_std_error']:>8.2f}"
+        )
+
+
+def main():
+    bench_engines()
+    bench_batch()
+    bench_memory()
+    bench_return_models()
+    check_regime_streaming()
+    bench_variance_reduction()
+    bench_adaptive()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: the shared Exa search layer (backend/app/ai/exa_search.py), offline.
+
+Searches are replayed from a synthetic fixture (EXA_FIXTURE_MODE=replay) with a
+simulated Exa round trip of EXA_FIXTURE_LATENCY_MS, so no API key or network is
+needed. Measures:
+  1. request coalescing: many concurrent identical queries -> one search;
+  2. cache hit rate on a repetitive workload (the same questions with
+     different casing, punctuation and spacing);
+  3. an advisor agent (FakeChatModel that always calls the search tool once)
+     answering the same questions cold vs with a warm cache.
+
+Run from the repo root:
+    python scripts/bench_search_cache.py
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+QUERIES = [
+    "Nifty 50 today",
+    "Sensex closing level today",
+    "best ELSS funds India 2026",
+    "best large cap mutual funds India",
+    "current FD interest rates SBI HDFC",
+    "latest RBI monetary policy news",
+    "gold price today India",
+    "PPF interest rate current quarter",
+    "top performing flexi cap funds India",
+    "NPS tier 1 returns equity scheme",
+    "Section 80C tax saving options India",
+    "latest IPO news India",
+]
+LATENCY_MS = 300
+CONCURRENT_CALLERS = 50
+WORKLOAD_SIZE = 300
+
+
+def _write_fixture(path: str) -> None:
+    from app.ai.exa_search import normalize_query
+
+    results = {
+        normalize_query(q): json.dumps([{"title": f"Result for {q}", "url": "https://example.com", "text": "..."}])
+        for q in QUERIES
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+def _variant(query: str, rng: random.Random) -> str:
+    """The same search as an LLM might write it: casing, punctuation, spacing."""
+    text = (" " * rng.randint(1, 2)).join(query.split())
+    return rng.choice([text, text.lower(), text.upper(), text + "?", text + " ."])
+
+
+async def bench_coalescing(tool, exa_search) -> None:
+    exa_search.reset_search_cache()
+    start = time.perf_counter()
+    await asyncio.gather(*(tool.ainvoke({"query": "Nifty 50 today"}) for _ in range(CONCURRENT_CALLERS)))
+    elapsed = (time.perf_counter() - start) * 1000
+    stats = exa_search.search_cache_stats()
+    print(f"1. {CONCURRENT_CALLERS} concurrent identical queries: {elapsed:.0f} ms wall, "
+          f"{stats['fixture_replays']} search(es), {stats['coalesced']} coalesced")
+
+
+async def bench_workload(tool, exa_search) -> None:
+    exa_search.reset_search_cache()
+    rng = random.Random(7)
+    workload = [_variant(rng.choice(QUERIES), rng) for _ in range(WORKLOAD_SIZE)]
+    start = time.perf_counter()
+    for query in workload:
+        await tool.ainvoke({"query": query})
+    elapsed = time.perf_counter() - start
+    stats = exa_search.search_cache_stats()
+    print(f"2. {WORKLOAD_SIZE} sequential queries over {len(QUERIES)} distinct searches: "
+          f"{stats['fixture_replays']} searches, hit rate {stats['hit_rate']:.1%}, "
+          f"{elapsed:.1f} s (uncached: {WORKLOAD_SIZE * LATENCY_MS / 1000:.1f} s)")
+
+
+async def bench_agent(exa_search) -> None:
+    from langchain_core.messages import AIMessage
+
+    from app.ai import chatbot, registry
+
+    exa_search.reset_search_cache()
+    rounds = {"cold": [], "warm": []}
+    for label in rounds:
+        for i, query in enumerate(QUERIES):
+            # Each request: one search tool call, then the answer
+            registry.use_fake_llm([
+                AIMessage(content="", tool_calls=[{"name": "exa_search_results_json", "args": {"query": query}, "id": f"call_{i}"}]),
+                AIMessage(content=registry.FAKE_REPLY),
+            ])
+            start = time.perf_counter()
+            reply = await chatbot.generate_chat_response(query, [], {})
+            rounds[label].append((time.perf_counter() - start) * 1000)
+            assert reply == registry.FAKE_REPLY, reply
+    print(f"3. Advisor agent, one search per request ({len(QUERIES)} requests per round):")
+    for label, samples in rounds.items():
+        print(f"   {label:>4}: mean {statistics.mean(samples):7.1f} ms, p50 {statistics.median(samples):7.1f} ms")
+
+
+async def main(fixture: str):
+    from app.ai import exa_search, registry
+
+    _write_fixture(fixture)
+    tool = registry.get_tools()[0]  # Loads the fixture
+    print(f"Replaying {len(QUERIES)} recorded searches, simulated Exa latency {LATENCY_MS} ms\n")
+    await bench_coalescing(tool, exa_search)
+    await bench_workload(tool, exa_search)
+    await bench_agent(exa_search)
+
+
+if __name__ == "__main__":
+    fd, fixture = tempfile.mkstemp(suffix=".json", prefix="exa_fixture_")
+    os.close(fd)
+    # exa_search reads its settings at import time
+    os.environ.update({
+        "EXA_FIXTURE_MODE": "replay",
+        "EXA_FIXTURE_PATH": fixture,
+        "EXA_FIXTURE_LATENCY_MS": str(LATENCY_MS),
+        "LLM_BACKEND": "fake",
+    })
+    warnings.simplefilter("ignore")
+    try:
+        asyncio.run(main(fixture))
+    finally:
+        os.remove(fixture)
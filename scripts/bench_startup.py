@@ -0,0 +1,105 @@
+"""
+Benchmark: cold-start import time of the API (backend/app/main.py), and the
+import time of each module it pulls in.
+
+Every measurement runs in a fresh interpreter, so nothing is served from
+sys.modules. Reports:
+  * wall time of `import app.main` (what uvicorn waits for before serving),
+    against importing it together with the heavy AI/ML/broker modules that
+    the routers now load lazily (see app/core/preload.py);
+  * the slowest app modules and third-party packages in that import, from
+    `python -X importtime`;
+  * the time each heavy module adds when it is first used or preloaded.
+
+Run from the repo root:
+    python scripts/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+RUNS = 3
+TOP_N = 12
+
+EAGER_IMPORT = (
+    "import importlib, app.main\n"
+    "from app.core.preload import HEAVY_MODULES\n"
+    "for name in HEAVY_MODULES: importlib.import_module(name, package='app')\n"
+)
+PRELOAD_TIMINGS = (
+    "import json, app.main\n"
+    "from app.core.preload import preload_heavy_modules\n"
+    "print(json.dumps(preload_heavy_modules()))\n"
+)
+
+
+def _run(args, env) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def _wall_ms(code: str, env) -> float:
+    timed = f"import time\n_t = time.perf_counter()\n{code}\nprint('WALL_MS', (time.perf_counter() - _t) * 1000)\n"
+    samples = []
+    for _ in range(RUNS):
+        out = _run(["-c", timed], env).stdout
+        samples.append(float(next(line for line in out.splitlines() if line.startswith("WALL_MS")).split()[1]))
+    return statistics.median(samples)
+
+
+def _import_profile(env):
+    """(module, self_ms, cumulative_ms) for every module imported by `import app.main`."""
+    stderr = _run(["-X", "importtime", "-c", "import app.main"], env).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            "PYTHONWARNINGS": "ignore",
+        }
+
+        lazy_ms = _wall_ms("import app.main", env)
+        eager_ms = _wall_ms(EAGER_IMPORT, env)
+        print(f"import app.main (lazy routers):        {lazy_ms:8.0f} ms   (median of {RUNS} cold runs)")
+        print(f"import app.main + heavy modules:       {eager_ms:8.0f} ms   (cost of importing everything up front)")
+        print(f"Startup saved:                         {eager_ms - lazy_ms:8.0f} ms ({eager_ms / lazy_ms:.1f}x faster)\n")
+
+        rows = _import_profile(env)
+        app_modules = sorted((r for r in rows if r[0].startswith("app.")), key=lambda r: -r[2])
+        print("Slowest app modules in `import app.main` (cumulative ms, includes their imports):")
+        for name, _, cumulative_ms in app_modules[:TOP_N]:
+            print(f"  {name:<40} {cumulative_ms:8.1f}")
+
+        # A package's first import carries the whole cost; later imports of it are cache hits
+        packages = {}
+        for name, _, cumulative_ms in rows:
+            root = name.split(".")[0]
+            if root != "app" and name == root:
+                packages[root] = max(packages.get(root, 0.0), cumulative_ms)
+        print("\nSlowest third-party packages in `import app.main` (cumulative ms):")
+        for root, cumulative_ms in sorted(packages.items(), key=lambda kv: -kv[1])[:TOP_N]:
+            print(f"  {root:<40} {cumulative_ms:8.1f}")
+
+        timings = json.loads(_run(["-c", PRELOAD_TIMINGS], env).stdout.strip().splitlines()[-1])
+        print("\nLazy modules (first use, or AI_PRELOAD in the background; ms, in load order):")
+        for name, ms in timings.items():
+            print(f"  {name:<40} {ms:8.1f}")
+        print(f"  {'total':<40} {sum(timings.values()):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
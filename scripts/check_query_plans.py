@@ -0,0 +1,152 @@
+"""
+Query-plan check: seeds a SQLite database with 100k+ investments and asserts
+that the per-user queries the routers run are answered from an index (no full
+table scan), then times each query with and without the indexes.
+
+Exits non-zero if any query falls back to a table scan.
+
+Run from the repo root:
+    python scripts/check_query_plans.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app.db.migrations import INDEXES  # noqa: E402
+from app.db.session import Base, make_engine  # noqa: E402
+from app.models import budget, simulation_job  # noqa: E402,F401  (register tables)
+from app.models.user import User, Profile, Goal, Investment, BrokerConfig  # noqa: E402
+
+N_USERS = 2_000
+GOALS_PER_USER = 5
+INVESTMENTS_PER_USER = 60   # 120k investment rows
+TYPES = ["SIP", "Mutual Fund", "Stock", "FD", "Gold"]
+REPEATS = 200
+USER_ID = 1_234
+GOAL_ID = (USER_ID - 1) * GOALS_PER_USER + 1
+
+# (label, statement, index that must appear in the plan) for the queries the routers run
+QUERIES = [
+    ("goals by user", select(Goal).where(Goal.user_id == USER_ID), "ix_goals_user_id"),
+    ("goal by id + user", select(Goal).where(Goal.id == GOAL_ID, Goal.user_id == USER_ID), None),
+    ("investments by user", select(Investment).where(Investment.user_id == USER_ID), "ix_investments_user_id"),
+    (
+        "investments by user + goal",
+        select(Investment).where(Investment.user_id == USER_ID, Investment.goal_id == GOAL_ID),
+        "ix_investments_user_id_goal_id",
+    ),
+    (
+        "zerodha upsert lookup",
+        select(Investment).where(
+            Investment.user_id == USER_ID, Investment.name == "Fund 7", Investment.type == "Stock",
+        ),
+        "ix_investments_user_id_type_name",
+    ),
+    (
+        "80C tax-saving investments",
+        select(Investment).where(Investment.user_id == USER_ID, Investment.is_tax_saving == True),  # noqa: E712
+        "ix_investments_user_id",
+    ),
+    (
+        "snapshot investments (selectin)",
+        select(Investment).where(Investment.user_id.in_([USER_ID])),
+        "ix_investments_user_id",
+    ),
+    (
+        "broker config by user",
+        select(BrokerConfig).where(BrokerConfig.user_id == USER_ID, BrokerConfig.broker_name == "Zerodha"),
+        None,
+    ),
+]
+
+
+def _seed(engine) -> None:
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": u, "email": f"user{u}@bench.local", "hashed_password": "x", "full_name": f"User {u}"}
+            for u in range(1, N_USERS + 1)
+        ])
+        conn.execute(Profile.__table__.insert(), [{"user_id": u} for u in range(1, N_USERS + 1)])
+        conn.execute(BrokerConfig.__table__.insert(), [{"user_id": u} for u in range(1, N_USERS + 1)])
+        conn.execute(Goal.__table__.insert(), [
+            {"user_id": u, "name": f"Goal {g}", "target_amount": 1e6, "target_date": "2035-01-01"}
+            for u in range(1, N_USERS + 1) for g in range(GOALS_PER_USER)
+        ])
+        conn.execute(Investment.__table__.insert(), [
+            {
+                "user_id": u,
+                "goal_id": (u - 1) * GOALS_PER_USER + rng.randint(1, GOALS_PER_USER) if rng.random() < 0.5 else None,
+                "name": f"Fund {i}",
+                "type": rng.choice(TYPES),
+                "amount": rng.uniform(1_000, 100_000),
+                "is_tax_saving": rng.random() < 0.2,
+            }
+            for u in range(1, N_USERS + 1) for i in range(INVESTMENTS_PER_USER)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+def _sql(engine, statement) -> str:
+    return str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _plan(conn, sql: str) -> str:
+    return " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def _time_ms(conn, sql: str) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        conn.exec_driver_sql(sql).fetchall()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main() -> int:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        Base.metadata.create_all(bind=engine)
+        _seed(engine)
+
+        with engine.connect() as conn:
+            n_rows = conn.execute(text("SELECT COUNT(*) FROM investments")).scalar()
+            print(f"Seeded {N_USERS:,} users, {N_USERS * GOALS_PER_USER:,} goals, {n_rows:,} investments.\n")
+
+            results = []
+            for label, statement, expected_index in QUERIES:
+                sql = _sql(engine, statement)
+                plan = _plan(conn, sql)
+                uses_index = "USING" in plan and not plan.startswith("SCAN")
+                if not uses_index or (expected_index and expected_index not in plan):
+                    failures.append((label, plan))
+                results.append((label, sql, plan, _time_ms(conn, sql)))
+
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.commit()
+            unindexed = [_time_ms(conn, sql) for _, sql, _, _ in results]
+
+        engine.dispose()
+
+    print(f"{'query':>32} {'indexed (ms)':>13} {'no index (ms)':>14}  plan")
+    for (label, _, plan, indexed_ms), scan_ms in zip(results, unindexed):
+        print(f"{label:>32} {indexed_ms:>13.3f} {scan_ms:>14.3f}  {plan}")
+
+    if failures:
+        print("\nQueries not using the expected index:")
+        for label, plan in failures:
+            print(f"  {label}: {plan}")
+        return 1
+    print("\nAll per-user queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Measure: size of the chatbot system prompt and the investment recommendations
+prompt (backend/app/ai/chatbot.py) for synthetic portfolios of 10 / 100 / 1,000
+holdings, rendered verbatim (one line per investment, the old behaviour) vs
+with the token-budgeted renderer.
+
+Token counts use the same estimate as the app (app/ai/tokens.py). The budget
+defaults to CHAT_CONTEXT_TOKEN_BUDGET; pass another as the first argument.
+
+Run from the repo root:
+    python scripts/measure_prompt_tokens.py [budget]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.ai import chatbot  # noqa: E402
+from app.ai.tokens import estimate_tokens  # noqa: E402
+
+PORTFOLIO_SIZES = [10, 100, 1000]
+UNBOUNDED = 10 ** 9
+
+TYPES = [
+    ("Stocks", "One-time", 12), ("Mutual Fund", "Monthly", 11), ("ETF", "One-time", 10),
+    ("FD", "One-time", 7), ("PPF", "Yearly", 7.1), ("Gold", "One-time", 8),
+]
+
+
+def synthetic_context(n_holdings: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    investments = []
+    for i in range(n_holdings):
+        inv_type, frequency, expected_return = rng.choice(TYPES)
+        investments.append({
+            "name": f"{inv_type} Holding {i:04d}",
+            "type": inv_type,
+            # Heavy-tailed amounts, like a real broker sync: a few large positions, many small ones
+            "amount": round(rng.paretovariate(1.2) * 5_000, 2),
+            "frequency": frequency,
+            "expected_return": expected_return,
+        })
+    return {
+        "profile": {"full_name": "Synthetic User", "age": 35, "monthly_income": 200_000, "monthly_expenses": 90_000},
+        "investments": investments,
+        "goals": [
+            {"name": "Retirement", "target_amount": 5e7, "current_amount": 4e6, "priority": "High", "target_date": "2050-01-01"},
+            {"name": "House", "target_amount": 1.5e7, "current_amount": 2e6, "priority": "Medium", "target_date": "2032-06-01"},
+        ],
+    }
+
+
+def _table(build_prompt, budget: int) -> None:
+    print(f"{'holdings':>9} {'verbatim tokens':>16} {'budgeted tokens':>16} {'saved':>7} {'holdings section':>17}")
+    for n in PORTFOLIO_SIZES:
+        context = synthetic_context(n)
+        verbatim = estimate_tokens(build_prompt(context, UNBOUNDED))
+        budgeted = estimate_tokens(build_prompt(context, budget))
+        section = estimate_tokens(chatbot._render_investments(context["investments"], budget))
+        print(f"{n:>9} {verbatim:>16,} {budgeted:>16,} {(1 - budgeted / verbatim) * 100:6.1f}% {section:>17,}")
+
+
+def main():
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else chatbot.CHAT_CONTEXT_TOKEN_BUDGET
+    print(f"Context budget: {budget} tokens (investments + goals), top {chatbot.CHAT_TOP_HOLDINGS} positions\n")
+    print("Whole prompt; 'holdings section' is the budgeted investment lines alone.\n")
+    print("Chat system prompt:")
+    _table(lambda context, b: chatbot._build_system_prompt(context, context_token_budget=b), budget)
+    print("\nInvestment recommendations prompt:")
+    _table(
+        lambda context, b: chatbot._build_recommendations_prompt("Moderate", "Mutual Fund", context, context_token_budget=b),
+        budget,
+    )
+
+
+if __name__ == "__main__":
+    main()